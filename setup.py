@@ -19,6 +19,8 @@ setup(
             # We list it here for metadata, but it isn’t on PyPI.
             "pypff>=0.6.0",  # installation via conda or source required
         ],
+        # Vectorized MinHash for large dedupe batches
+        "dedupe": ["numpy"],
         "dev": [
             "pytest",
             "pytest-timeout>=2.0.0",
@@ -3,22 +3,32 @@
 
 # Imports
 import argparse
+import glob
 import json
 import logging
+import multiprocessing
 import os
+import queue
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor
-from typing import Iterable, List
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Dict, Iterable, List, Tuple
 
 from template import log_message
-from ..core.logging import setup_logging
+from ..core.logging import DEFAULT_QUEUE_SIZE as DEFAULT_LOG_QUEUE_SIZE, setup_logging, stop_logging
 from .. import __version__
 
+from ..core.config import load_config
 from ..core.extractor import SignatureExtractor
 from ..core.deduplicator import dedupe_signatures
-from ..core.metrics import MetricsCollector, MessageMetric
-from ..core.models import Message, Signature
+from ..core.metrics import MetricsCollector, ProgressReporter
+from ..core.parallel import DEFAULT_CHUNK_SIZE
+from ..core.pipeline import DEFAULT_QUEUE_SIZE, ExtractionPipeline
+from ..core.ruleset import Ruleset
+from ..core.sources import open_source, plan_work_units, skip_filtered
+from ..core.models import Signature
 from ..exporter import export_to_csv, export_to_json
 from ..index.indexer import add_batch
 from ..index.search_index import SQLiteFTSIndex
@@ -26,18 +36,41 @@ from ..index.search_index import SQLiteFTSIndex
 # Logging
 
 # Globals
+# Index setting holding the digest of the rules and extraction options the
+# index was extracted with (``SignatureExtractor.digest``)
+RULESET_SETTING = "ruleset_digest"
 
 # Classes/Functions
 
+def _timestamp(value: str) -> float:
+    """Parse an epoch timestamp or ISO date/time given on the command line."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid timestamp or ISO date: {value}")
+
+
 def _build_parser() -> argparse.ArgumentParser:
     """Return the top-level argument parser."""
     parser = argparse.ArgumentParser(description="Recover signatures from data")
-    parser.add_argument("--threads", "-t", type=int, default=1, help="Worker threads for extraction")
+    parser.add_argument(
+        "--threads", "-t", type=int, default=None, help="Worker threads for extraction (default: 1)"
+    )
     parser.add_argument("--batch-size", type=int, default=1000, help="Messages per commit")
     parser.add_argument("--min-confidence", type=float, default=0.0, help="Minimum confidence to keep a signature")
     parser.add_argument("--metrics", action="store_true", help="Print timing statistics")
     parser.add_argument("--dump-metrics", help="Write aggregated metrics to JSON file")
+    parser.add_argument("--config", help="JSON config file overriding the built-in defaults")
     parser.add_argument("-v", "--verbose", action="count", default=0, help="Increase logging verbosity")
+    parser.add_argument(
+        "--async-logging",
+        action="store_true",
+        help="Write log records from a background thread so workers never wait on log I/O",
+    )
     parser.add_argument(
         "--version",
         action="version",
@@ -46,9 +79,80 @@ def _build_parser() -> argparse.ArgumentParser:
     )
     sub = parser.add_subparsers(dest="command", required=True)
 
-    ex = sub.add_parser("extract", help="Index signatures from a PST file")
-    ex.add_argument("--input", required=True, help="Path to PST file")
-    ex.add_argument("--index", required=True, help="Path to SQLite FTS index")
+    ex = sub.add_parser("extract", help="Index signatures from PST, mbox, EML or maildir inputs")
+    ex.add_argument(
+        "--input",
+        required=True,
+        nargs="+",
+        help=(
+            "PST or mbox files, EML or maildir directories, or glob patterns; "
+            "the type is detected and several inputs are extracted in parallel"
+        ),
+    )
+    ex.add_argument("--index", help="Path to SQLite FTS index (required unless --scan-only)")
+    ex.add_argument("--folders", nargs="+", help="Only extract these folder names or paths")
+    ex.add_argument("--since", type=_timestamp, help="Skip messages before this epoch or ISO date")
+    ex.add_argument("--until", type=_timestamp, help="Skip messages after this epoch or ISO date")
+    ex.add_argument(
+        "--scan",
+        action="store_true",
+        help="Rebuild the PST manifest before extracting",
+    )
+    ex.add_argument(
+        "--scan-only",
+        action="store_true",
+        help="Build the PST manifest (folders, counts, date ranges) and exit",
+    )
+    ex.add_argument(
+        "--sharded",
+        action="store_true",
+        help="Split folders into message ranges and extract them in worker processes",
+    )
+    ex.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --sharded, --executor process or several inputs (default: CPU count)",
+    )
+    ex.add_argument("--unit-size", type=int, default=500, help="Messages per work unit for --sharded")
+    ex.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="Messages buffered between pipeline stages; bounds memory use",
+    )
+    ex.add_argument(
+        "--executor",
+        choices=["thread", "process"],
+        default=None,
+        help="Run extraction in --threads worker threads (default) or --workers processes",
+    )
+    ex.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Messages extracted per batch (and sent to a worker process at a time)",
+    )
+    ex.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip messages already processed into this index and unchanged since",
+    )
+    ex.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip messages already committed by a previous run on the same index",
+    )
+    ex.add_argument(
+        "--global-dedupe",
+        action="store_true",
+        help="Merge near-duplicates of signatures already in the index, across batches, runs and inputs",
+    )
+    ex.add_argument(
+        "--no-prefilter",
+        action="store_true",
+        help="Extract every message, including calendar items, reports and auto-replies",
+    )
     ex.set_defaults(func=handle_extract)
 
     q = sub.add_parser("query", help="Search an existing index")
@@ -71,14 +175,104 @@ def _build_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def _configure_logging(verbosity: int) -> None:
-    setup_logging(verbose=verbosity > 0)
+def _configure_logging(args: argparse.Namespace) -> None:
+    verbosity = args.verbose
+    options = load_config(args.config).get("logging", {})
+    setup_logging(
+        verbose=verbosity > 0,
+        queued=args.async_logging or bool(options.get("queued", False)),
+        queue_size=int(options.get("queue_size", DEFAULT_LOG_QUEUE_SIZE)),
+        sample=options.get("sample"),
+        rate_limit=options.get("rate_limit"),
+    )
     if verbosity > 1:
         logging.getLogger().setLevel(logging.DEBUG)
 
 
+def _expand_inputs(patterns: Iterable[str]) -> List[str]:
+    """Expand glob patterns and return input paths, largest file first.
+
+    Patterns that match nothing are kept as given so the missing file is
+    reported when it is opened.
+    """
+    paths: List[str] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else []
+        for path in matches or [pattern]:
+            if path not in paths:
+                paths.append(path)
+    return sorted(paths, key=lambda p: os.path.getsize(p) if os.path.isfile(p) else 0, reverse=True)
+
+
+class _BatchWriter:
+    """Collect signatures for one source and commit them in batches.
+
+    Each commit stores the source's checkpoint and processed-message entries in
+    the same transaction as the signatures. With ``--global-dedupe`` batches
+    are deduplicated against the index's clusters instead of on their own.
+    """
+
+    def __init__(self, indexer: SQLiteFTSIndex, source: str, args: argparse.Namespace) -> None:
+        self.indexer = indexer
+        self.source = source
+        self.batch_size = args.batch_size
+        self.min_confidence = args.min_confidence
+        self.clustered = args.global_dedupe
+        self.batch: List[Signature] = []
+        self.processed: List[Tuple[str, str, str]] = []
+        # (folder path, message index) of the last collected and committed message
+        self.position: Tuple[str, int] | None = None
+        self.committed: Tuple[str, int] | None = None
+        self.signatures = 0
+
+    def collect(
+        self,
+        sigs: Iterable[Signature | None],
+        entries: Iterable[Tuple[str, str, str]],
+        pos: Tuple[str, int] | None,
+    ) -> None:
+        for sig in sigs:
+            if sig and sig.confidence >= self.min_confidence:
+                self.batch.append(sig)
+        self.processed.extend(entries)
+        if pos is not None:
+            self.position = pos
+        if len(self.batch) >= self.batch_size or len(self.processed) >= self.batch_size:
+            self.commit()
+
+    def commit(self) -> None:
+        batch = list(self.batch) if self.clustered else dedupe_signatures(self.batch)
+        self.write(batch, self.processed, self.position)
+        self.batch.clear()
+        self.processed.clear()
+
+    def write(
+        self,
+        uniques: List[Signature],
+        processed: List[Tuple[str, str, str]],
+        position: Tuple[str, int] | None,
+    ) -> None:
+        """Store already deduplicated signatures with their checkpoint."""
+        checkpoint = (self.source, *position) if position else None
+        entries = [(self.source, *entry) for entry in processed]
+        added = add_batch(
+            self.indexer, uniques, checkpoint=checkpoint, processed=entries, clustered=self.clustered
+        )
+        self.committed = position
+        self.signatures += added
+        log_message(logging.INFO, f"Committed {added} signatures")
+
+    def flush(self) -> None:
+        if self.batch or self.processed or self.position != self.committed:
+            self.commit()
+
+
 def handle_extract(args: argparse.Namespace) -> int:
-    """Extract signatures from ``args.input`` and index them.
+    """Extract signatures from the ``args.input`` files and index them.
+
+    A single input is extracted in this process (or sharded across worker
+    processes with ``--sharded``). Several inputs are scheduled across a
+    process pool, largest file first.
 
     Returns
     -------
@@ -87,10 +281,12 @@ def handle_extract(args: argparse.Namespace) -> int:
     """
 
     metrics = MetricsCollector()
+    paths = _expand_inputs(args.input)
     try:
-        from ..core.pst_parser import PSTParser
-
-        parser = PSTParser(args.input)
+        for path in paths:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Input not found: {path}")
+        parser = open_source(paths[0], metrics=metrics) if len(paths) == 1 else None
     except ImportError as exc:
         log_message(logging.ERROR, str(exc))
         if args.dump_metrics:
@@ -101,45 +297,60 @@ def handle_extract(args: argparse.Namespace) -> int:
         log_message(logging.ERROR, str(exc))
         return 1
 
-    extractor = SignatureExtractor()
+    try:
+        return _extract_inputs(args, paths, parser, metrics)
+    finally:
+        # Also on errors, so no mbox, maildir or PST handle is left open
+        if parser is not None:
+            parser.close()
+
+
+def _extract_inputs(args, paths, parser, metrics) -> int:
+    """Run ``extract`` over ``paths``; ``parser`` is the open source of a single input."""
+    if len(paths) > 1 and (args.sharded or args.executor == "thread" or args.threads):
+        log_message(
+            logging.ERROR,
+            "--sharded, --executor thread and --threads only apply to a single input; "
+            "several inputs are extracted in --workers processes",
+        )
+        return 1
+
+    if args.scan_only:
+        for path in paths:
+            scanner = parser or open_source(path)
+            try:
+                _print_manifest(scanner.scan(refresh=True), scanner.manifest_path)
+            finally:
+                if scanner is not parser:
+                    scanner.close()
+        return 0
+    if not args.index:
+        log_message(logging.ERROR, "--index is required")
+        return 1
+
+    config = load_config(args.config)
+    if args.no_prefilter:
+        config = {**config, "extraction": {**config.get("extraction", {}), "prefilter": False}}
+    if config.get("extraction", {}).get("cache_persist", False) and (
+        len(paths) > 1 or args.sharded or args.executor == "process"
+    ):
+        log_message(
+            logging.WARNING,
+            "extraction.cache_persist only applies to the thread executor; "
+            "worker process caches are not saved",
+        )
     indexer = SQLiteFTSIndex(args.index)
+    ruleset = Ruleset.from_config(config)
+    digest = SignatureExtractor(config, ruleset=ruleset).digest
     start = time.time()
-    batch: List[Signature] = []
-
-    def worker(msg: Message) -> Signature | None:
-        start_ts = time.time()
-        try:
-            sig = extractor.extract_signature(msg.body, msg.msg_id, msg.timestamp)
-        except Exception as e:  # pragma: no cover - unexpected parse errors
-            log_message(logging.ERROR, f"Failed to process message {msg.msg_id}")
-            logging.exception("worker error")
-            metrics.record(MessageMetric(msg.msg_id, False, 0.0, 0.0))
-            return None
-        duration_ms = (time.time() - start_ts) * 1000
-        metrics.record(
-            MessageMetric(
-                msg.msg_id,
-                sig is not None,
-                sig.confidence if sig else 0.0,
-                duration_ms,
-            )
-        )
-        return sig
-
-    with ThreadPoolExecutor(max_workers=args.threads) as pool:
-        for sig in pool.map(worker, parser.iter_messages()):
-            if sig and sig.confidence >= args.min_confidence:
-                batch.append(sig)
-            if len(batch) >= args.batch_size:
-                uniques = dedupe_signatures(batch)
-                add_batch(indexer, uniques)
-                log_message(logging.INFO, f"Committed {len(uniques)} signatures")
-                batch.clear()
-
-    if batch:
-        uniques = dedupe_signatures(batch)
-        add_batch(indexer, uniques)
-        log_message(logging.INFO, f"Committed {len(uniques)} signatures")
+
+    if parser is not None:
+        known = _known_messages(args, indexer, digest, os.path.abspath(paths[0]))
+        code = _extract_inline(args, parser, paths[0], indexer, metrics, config, known, ruleset)
+    else:
+        code = _extract_pooled(args, paths, indexer, metrics, config, ruleset, digest)
+    if code == 0:
+        indexer.set_setting(RULESET_SETTING, digest)
 
     elapsed = time.time() - start
     summary = metrics.summarize()
@@ -152,12 +363,287 @@ def handle_extract(args: argparse.Namespace) -> int:
         print(
             f"Extracted {summary['signatures_extracted']} signatures ({sig_rate:.0f} sig/sec), avg conf {summary['average_confidence']:.2f}"
         )
+        counters = summary["counters"]
+        if counters.get("extract.tail_window"):
+            print(
+                f"Tail window used for {counters['extract.tail_window']} messages, "
+                f"{counters.get('extract.tail_fallback', 0)} fell back to the full body"
+            )
+        lookups = counters.get("extract.cache_hits", 0) + counters.get("extract.cache_misses", 0)
+        if lookups:
+            print(
+                f"Signature cache: {counters.get('extract.cache_hits', 0)} hits of {lookups} lookups "
+                f"({counters.get('extract.cache_hits', 0) / lookups:.0%})"
+            )
+        skipped = {
+            name.split(".", 1)[1]: n for name, n in counters.items() if name.startswith("prefilter.")
+        }
+        if skipped:
+            reasons = ", ".join(f"{n} {reason}" for reason, n in sorted(skipped.items()))
+            print(f"Pre-filter skipped {sum(skipped.values())} messages ({reasons})")
+        for name, h in summary["heuristics"].items():
+            latency = h["latency"] or {}
+            print(
+                f"{name}: {h['calls']} calls, {h['hits']} boundaries, {h['errors']} errors, "
+                f"{latency.get('total_ms', 0):.1f} ms total, p50 {latency.get('p50_ms', 0):.3f} ms, "
+                f"p95 {latency.get('p95_ms', 0):.3f} ms"
+            )
+        for path, f in summary["files"].items():
+            print(f"{path}: {f['messages']} messages, {f['signatures']} signatures in {f['elapsed_s']:.2f} seconds")
+        for name, t in summary["timings"].items():
+            print(f"{name}: {t['count']} calls, {t['total_ms']:.1f} ms total, {t['avg_ms']:.3f} ms avg")
     if args.dump_metrics:
         metrics.dump(args.dump_metrics)
         log_message(logging.INFO, f"Metrics written to {args.dump_metrics}")
+    return code
+
+
+def _known_messages(
+    args: argparse.Namespace, indexer: SQLiteFTSIndex, digest: str, source: str
+) -> Dict[str, Tuple[str, str]]:
+    """Return the processed messages of ``source`` if ``--incremental`` is set.
+
+    None are returned if the extraction ``digest`` changed since; indexes
+    written before the digest was recorded are trusted.
+    """
+    if not args.incremental:
+        return {}
+    known = indexer.known_messages(source)
+    stored = indexer.get_setting(RULESET_SETTING)
+    if known and stored is not None and stored != digest:
+        log_message(
+            logging.INFO,
+            f"Extraction rules or options changed since the last run; re-extracting {len(known)} processed messages",
+        )
+        return {}
+    if known:
+        log_message(logging.INFO, f"Loaded {len(known)} previously processed messages")
+    return known
+
+
+def _resume_point(args: argparse.Namespace, indexer: SQLiteFTSIndex, source: str):
+    """Return the checkpoint to resume ``source`` from, if ``--resume`` is set."""
+    resume_after = indexer.get_checkpoint(source) if args.resume else None
+    if resume_after:
+        log_message(
+            logging.INFO,
+            f"Resuming {source} after message {resume_after[1]} in folder {resume_after[0]}",
+        )
+    return resume_after
+
+
+def _extract_inline(args, parser, path, indexer, metrics, config, known, ruleset) -> int:
+    """Extract one input through the streaming pipeline, or worker processes if sharded."""
+    if args.scan:
+        parser.scan(refresh=True)
+    elif parser.load_manifest() is not None:
+        log_message(logging.INFO, f"Using manifest {parser.manifest_path}")
+
+    source = os.path.abspath(path)
+    resume_after = _resume_point(args, indexer, source)
+    writer = _BatchWriter(indexer, source, args)
+    started = time.time()
+    workers = (args.workers or os.cpu_count() or 1) if args.sharded else 0
+    units = plan_work_units(
+        parser.list_folders(),
+        args.unit_size,
+        resume_after,
+        include=args.folders,
+        start=args.since,
+        end=args.until,
+        workers=workers,
+    )
+    progress = ProgressReporter(sum(u.stop - u.start for u in units), "Extract")
+
+    if args.sharded:
+        from ..core.parallel import extract_unit, init_worker
+
+        log_message(logging.INFO, f"Planned {len(units)} work units")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(config, known, ruleset),
+        ) as pool:
+            job = partial(
+                extract_unit, path, start=args.since, end=args.until, chunk_size=args.chunk_size
+            )
+            for unit, result in zip(units, pool.map(job, units)):
+                progress.update(unit.stop - unit.start)
+                for m in result.metrics:
+                    metrics.record(m)
+                metrics.merge_stats(result.stats)
+                pos = (unit.folder_path, unit.stop - 1)
+                writer.collect(result.signatures, result.processed, pos)
+        writer.flush()
+    else:
+        messages = parser.iter_messages(
+            folders=args.folders,
+            start=args.since,
+            end=args.until,
+            resume_after=resume_after,
+            known=known,
+            lazy=True,
+        )
+        messages = skip_filtered(messages, units, progress)
+        options = dict(
+            known=known,
+            queue_size=args.queue_size,
+            batch_size=args.batch_size,
+            min_confidence=args.min_confidence,
+            metrics=metrics,
+            progress=progress,
+            chunk_size=args.chunk_size,
+            dedupe=None if args.global_dedupe else dedupe_signatures,
+        )
+        if args.executor == "process":
+            from ..core.parallel import init_worker
+
+            workers = args.workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=init_worker,
+                initargs=(config, known, ruleset),
+            ) as pool:
+                # Two chunks per process keep workers busy while results return
+                pipeline = ExtractionPipeline(
+                    None,
+                    writer.write,
+                    workers=2 * workers,
+                    pool=pool,
+                    **options,
+                )
+                pipeline.run(messages)
+        else:
+            extractor = SignatureExtractor(config, metrics=metrics, ruleset=ruleset)
+            persist = config.get("extraction", {}).get("cache_persist", False)
+            if persist:
+                extractor.cache.load(indexer.load_signature_cache())
+            pipeline = ExtractionPipeline(
+                extractor,
+                writer.write,
+                workers=args.threads or 1,
+                **options,
+            )
+            pipeline.run(messages)
+            if persist:
+                indexer.save_signature_cache(extractor.cache.items())
+
+    metrics.record_file(
+        path,
+        {
+            "messages": progress.done,
+            "signatures": writer.signatures,
+            "elapsed_s": time.time() - started,
+        },
+    )
     return 0
 
 
+def _extract_pooled(args, paths, indexer, metrics, config, ruleset, digest) -> int:
+    """Extract several inputs in worker processes, largest file first.
+
+    Workers send each chunk's results back through a queue bounded to
+    ``--queue-size`` messages, and each file is committed in batches with its
+    checkpoint while it is still being read.
+
+    Returns ``1`` if any file failed, else ``0``.
+    """
+    from ..core.parallel import extract_file, init_worker
+
+    workers = min(len(paths), args.workers or os.cpu_count() or 1)
+    log_message(logging.INFO, f"Extracting {len(paths)} files with {workers} workers")
+    writers = {path: _BatchWriter(indexer, os.path.abspath(path), args) for path in paths}
+    failed = 0
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(config, None, ruleset),
+    ) as pool:
+        results = manager.Queue(max(1, args.queue_size // max(1, args.chunk_size)))
+        futures = {}
+        # ``paths`` is sorted largest first, so the biggest files start first
+        for path in paths:
+            source = os.path.abspath(path)
+            resume_after = _resume_point(args, indexer, source)
+            known = _known_messages(args, indexer, digest, source)
+            future = pool.submit(
+                extract_file,
+                path,
+                args.folders,
+                args.since,
+                args.until,
+                resume_after,
+                known,
+                args.chunk_size,
+                results,
+            )
+            futures[future] = path
+        pending = set(futures)
+        done = 0
+        ended = set()
+
+        def receive(item) -> None:
+            path, part, position = item
+            if part is None:
+                ended.add(path)
+                return
+            for m in part.metrics:
+                metrics.record(m)
+            writers[path].collect(part.signatures, part.processed, position)
+
+        while pending:
+            try:
+                receive(results.get(timeout=0.1))
+            except queue.Empty:
+                pass
+            for future in [f for f in pending if f.done()]:
+                path = futures[future]
+                # The end marker is queued before the worker returns, so read
+                # up to it; a worker that died without one left what it sent
+                while path not in ended:
+                    try:
+                        receive(results.get_nowait())
+                    except queue.Empty:
+                        break
+                pending.discard(future)
+                done += 1
+                writer = writers[path]
+                # Chunks committed before a failure keep their checkpoint
+                writer.flush()
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    log_message(logging.ERROR, f"Failed to extract {path}: {exc}")
+                    failed += 1
+                    continue
+                metrics.merge_stats(result.stats)
+                metrics.record_file(
+                    path,
+                    {
+                        "messages": result.messages,
+                        "signatures": writer.signatures,
+                        "elapsed_s": result.elapsed_s,
+                    },
+                )
+                log_message(
+                    logging.INFO,
+                    f"Finished {path} ({done}/{len(paths)}): {result.messages} messages, "
+                    f"{writer.signatures} signatures in {result.elapsed_s:.1f}s",
+                )
+    return 1 if failed else 0
+
+
+def _print_manifest(folders, path: str) -> None:
+    """Print a scanned folder manifest."""
+    for f in folders:
+        first = datetime.fromtimestamp(f.min_time).isoformat() if f.min_time else "-"
+        last = datetime.fromtimestamp(f.max_time).isoformat() if f.max_time else "-"
+        print(f"{f.path}\t{f.message_count}\t{first}\t{last}")
+    total = sum(f.message_count for f in folders)
+    saved = f"; manifest written to {path}" if path else ""
+    print(f"{len(folders)} folders, {total} messages{saved}")
+
+
 def handle_query(args: argparse.Namespace) -> int:
     """Query the index and print matching signatures.
 
@@ -225,13 +711,14 @@ def main(argv: Iterable[str] | None = None) -> None:
         args = parser.parse_args(argv)
     except SystemExit as exc:  # argparse errors
         sys.exit(1 if exc.code != 0 else 0)
-    _configure_logging(args.verbose)
+    _configure_logging(args)
     try:
         code = args.func(args)
     except Exception as exc:  # pragma: no cover - defensive
         log_message(logging.ERROR, str(exc))
         logging.exception("cli error")
         code = 2
+    stop_logging()
     sys.exit(code)
 
 
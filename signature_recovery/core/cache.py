@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Bounded LRU cache of extracted signatures.
+
+Signatures repeat across thousands of messages from the same sender. The
+extractor keys each result by a hash of the raw end of the body, from its
+last sign-off line on, so every later message ending the same way gets the
+boundary, text, metadata and confidence back without normalization,
+boundary detection or parsing.
+"""
+
+# Imports
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from .models import SignatureMetadata
+
+# Globals
+DEFAULT_CACHE_SIZE = 4096
+
+# Classes/Functions
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    """Boundary line, text, parsed metadata and final confidence of one signature."""
+
+    boundary: int
+    text: str
+    metadata: SignatureMetadata
+    confidence: float
+
+
+class SignatureCache:
+    """Thread-safe LRU mapping of region keys to :class:`CachedResult`.
+
+    ``max_entries`` of ``0`` disables the cache.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Return the entry for ``key`` and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedResult) -> None:
+        """Store ``entry``, evicting the least recently used one if full."""
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def load(self, items: Iterable[Tuple[str, CachedResult]]) -> None:
+        """Add persisted ``(key, entry)`` pairs, oldest first."""
+        for key, entry in items:
+            self.put(key, entry)
+
+    def items(self) -> List[Tuple[str, CachedResult]]:
+        """Return ``(key, entry)`` pairs from least to most recently used."""
+        with self._lock:
+            return list(self._entries.items())
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
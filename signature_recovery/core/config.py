@@ -13,6 +13,26 @@ logger = logging.getLogger("config")
 DEFAULT_CONFIG: Dict[str, Any] = {
     "extraction": {
         "max_fallback_lines": 5,
+        # Scan only the last N KB / N lines of long bodies first (0 = off)
+        "tail_window_kb": 0,
+        "tail_window_lines": 0,
+        # LRU entries of tail-keyed extraction results (0 = off); with
+        # cache_persist the cache is saved in the index between runs of the
+        # thread executor (worker processes keep caches of their own)
+        "cache_size": 4096,
+        "cache_persist": False,
+        # Search only the newest part of replies; mine_quoted also extracts
+        # the signatures of the quoted earlier messages
+        "skip_quoted": True,
+        "mine_quoted": False,
+        # Reuse a sender's high-confidence signature when a message ends with it
+        "sender_templates": True,
+        "template_min_confidence": 0.9,
+        "template_max_senders": 10000,
+        # Skip calendar items, delivery reports, auto-replies and near-empty
+        # bodies before extraction (turn off to audit everything)
+        "prefilter": True,
+        "prefilter_min_body_chars": 16,
         "signoff_patterns": [
             r"--\s*$",
             r"thanks",
@@ -21,6 +41,14 @@ DEFAULT_CONFIG: Dict[str, Any] = {
             r"sincerely",
         ],
     },
+    "logging": {
+        # Write log records from a background thread through a bounded queue
+        "queued": False,
+        "queue_size": 10000,
+        # Per-component fraction of INFO/DEBUG records to keep, and records/second
+        "sample": {},
+        "rate_limit": {},
+    },
     "parser": {
         "phone_patterns": [
             r"\(\d{3}\)\s*\d{3}-\d{4}",
@@ -28,7 +56,9 @@ DEFAULT_CONFIG: Dict[str, Any] = {
             r"\d{3}-\d{3}-\d{4}",
             r"\d{3}\.\d{3}\.\d{4}",
             r"\+?\d[\d\s-]{7,}\d",
-        ]
+        ],
+        "title_keywords": ["Manager", "Engineer", "Director", "Officer", "Consultant"],
+        "company_suffixes": ["Inc", "Inc.", "LLC", "Ltd", "Corp", "Co", "Company"],
     },
 }
 
@@ -48,7 +78,11 @@ def load_config(path: str | None = None) -> Dict[str, Any]:
         cfg = json.load(f)
 
     merged = DEFAULT_CONFIG.copy()
-    merged.update(cfg or {})
+    for key, value in (cfg or {}).items():
+        # Sections are merged so a file can override single options
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = {**merged[key], **value}
+        merged[key] = value
     return merged
 
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Canonical contact keys for exact lookups and dedupe blocking.
+
+Parsed phone numbers, emails and URLs keep their original spelling, so
+``(555) 123-4567`` and ``+1 555.123.4567`` never compare equal. The keys
+built here do: phones become E.164-style digits, emails are lower-cased and
+both email and URL hosts reduce to their registrable domain
+(``mail.acme.co.uk`` -> ``acme.co.uk``).
+"""
+
+# Imports
+import re
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from .models import SignatureMetadata
+
+# Globals
+# Country code assumed for national numbers without one
+DEFAULT_COUNTRY_CODE = "1"
+# Two-label public suffixes; any other suffix is taken to be one label
+MULTI_LABEL_SUFFIXES = frozenset(
+    {
+        "co.uk", "org.uk", "ac.uk", "gov.uk", "ltd.uk", "plc.uk", "me.uk",
+        "com.au", "net.au", "org.au", "edu.au", "gov.au",
+        "co.nz", "org.nz", "co.jp", "ne.jp", "or.jp", "co.in", "org.in",
+        "co.za", "com.br", "com.mx", "com.cn", "com.sg", "com.hk", "co.kr",
+    }
+)
+_NON_DIGIT_RE = re.compile(r"\D")
+_EXTENSION_RE = re.compile(r"\s*(?:x|ext\.?|extension)\s*\d+\s*$", re.IGNORECASE)
+
+# Classes/Functions
+
+
+class ContactKeys(NamedTuple):
+    """Canonical ``phone``, ``email`` and registrable ``domain`` of a signature."""
+
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    domain: Optional[str] = None
+
+
+def phone_key(phone: Optional[str]) -> Optional[str]:
+    """Return ``phone`` as ``+<country code><number>`` digits.
+
+    A leading ``+`` or ``00`` keeps the given country code, ten-digit national
+    numbers get :data:`DEFAULT_COUNTRY_CODE` and extensions are dropped.
+    Numbers with fewer than seven digits give ``None``.
+    """
+    if not phone:
+        return None
+    phone = _EXTENSION_RE.sub("", phone.strip())
+    digits = _NON_DIGIT_RE.sub("", phone)
+    if len(digits) < 7:
+        return None
+    if phone.startswith("+"):
+        return "+" + digits
+    if digits.startswith("00"):
+        return "+" + digits[2:]
+    if len(digits) == 10:
+        return "+" + DEFAULT_COUNTRY_CODE + digits
+    return "+" + digits
+
+
+def email_key(email: Optional[str]) -> Optional[str]:
+    """Return ``email`` lower-cased, without whitespace or a ``mailto:`` prefix."""
+    if not email:
+        return None
+    email = email.strip().lower()
+    if email.startswith("mailto:"):
+        email = email[len("mailto:") :]
+    return email if "@" in email else None
+
+
+def registrable_domain(host: Optional[str]) -> Optional[str]:
+    """Return the registrable domain of ``host``: its public suffix plus one label."""
+    if not host:
+        return None
+    labels = [p for p in host.strip().strip(".").lower().split(".") if p]
+    if len(labels) < 2:
+        return None
+    size = 3 if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES else 2
+    return ".".join(labels[-size:])
+
+
+def url_domain(url: Optional[str]) -> Optional[str]:
+    """Return the registrable domain of ``url``, with or without a scheme."""
+    if not url:
+        return None
+    url = url.strip()
+    if "://" not in url:
+        url = "//" + url
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return None
+    return registrable_domain(host)
+
+
+def contact_keys(meta: SignatureMetadata) -> ContactKeys:
+    """Return the canonical keys of ``meta``.
+
+    The domain comes from the email address, falling back to the URL.
+    """
+    email = email_key(meta.email)
+    domain = registrable_domain(email.rpartition("@")[2]) if email else None
+    return ContactKeys(phone_key(meta.phone), email, domain or url_domain(meta.url))
+
+
+# main
+if __name__ == "__main__":  # pragma: no cover - manual run
+    print(contact_keys(SignatureMetadata(phone="(555) 123-4567", email="John@Mail.ACME.co.uk")))
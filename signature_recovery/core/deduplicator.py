@@ -1,18 +1,53 @@
 #!/usr/bin/env python3
-"""Signature deduplication utilities."""
+"""Signature deduplication utilities.
 
+Small batches compare every signature with every unique kept so far. Larger
+ones only compare it with the uniques sharing a locality-sensitive hash
+band: each normalized text is cut into character shingles, summarized by a
+MinHash signature of ``NUM_HASHES`` values and split into bands of
+``BAND_ROWS`` values, so near-duplicates very likely share at least one band.
+Candidates are still verified with the same similarity ratio and
+``threshold``. NumPy, when installed, computes the MinHash values of a whole
+batch at once; the values are the same without it.
+"""
+
+import hashlib
 import logging
 import re
 import string
+from array import array
+from collections import Counter
 from difflib import SequenceMatcher
-from typing import Iterable, List
+from functools import lru_cache
+from hashlib import blake2b, shake_128
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from dataclasses import fields
 from .models import Signature, SignatureMetadata
+
+try:  # optional: vectorized MinHash
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
 logger = logging.getLogger(__name__)
 
+# Characters per shingle
+SHINGLE_SIZE = 4
+# 16-bit MinHash values per signature
+NUM_HASHES = 60
+# MinHash values per LSH band; NUM_HASHES // BAND_ROWS bands. Two rows (30
+# bands) keep pairs above a 0.85 ratio with a few character edits, whose
+# shingle overlap can be well under one half, as candidates
+BAND_ROWS = 2
+# Batches larger than this use MinHash candidates instead of comparing all pairs
+MINHASH_MIN_BATCH = 256
+ENGINES = ("auto", "exhaustive", "minhash")
+# Characters of normalized text counted apart when bounding similarity ratios
+COUNTED_CHARS = string.ascii_lowercase + string.digits + " "
 
-def _normalize(text: str) -> str:
+
+def normalize_text(text: str) -> str:
     """Normalize text for fuzzy comparison."""
     collapsed = re.sub(r"\s+", " ", text)
     stripped = collapsed.translate(str.maketrans('', '', string.punctuation))
@@ -24,56 +59,204 @@ def _similar(a: str, b: str) -> float:
     return SequenceMatcher(None, a, b).ratio()
 
 
+def shingles(norm: str) -> List[str]:
+    """Return the distinct ``SHINGLE_SIZE``-character shingles of ``norm``.
+
+    Spaces are dropped first, so texts differing only in spacing (such as
+    ``|``-separated and line-separated signatures) have the same shingles.
+    """
+    norm = norm.replace(" ", "")
+    if len(norm) <= SHINGLE_SIZE:
+        return [norm]
+    return list(dict.fromkeys(norm[i : i + SHINGLE_SIZE] for i in range(len(norm) - SHINGLE_SIZE + 1)))
+
+
+@lru_cache(maxsize=1 << 16)
+def _shingle_hashes(shingle: str) -> bytes:
+    # NUM_HASHES independent 16-bit hash values of one shingle
+    return shake_128(shingle.encode("utf-8")).digest(NUM_HASHES * 2)
+
+
+def minhash(norm: str) -> Tuple[int, ...]:
+    """Return the MinHash signature of normalized text ``norm``."""
+    rows = [array("H", _shingle_hashes(s)) for s in shingles(norm)]
+    return tuple(map(min, zip(*rows)))
+
+
+def minhash_batch(norms: Sequence[str]) -> List[Tuple[int, ...]]:
+    """Return :func:`minhash` of every text in ``norms``, vectorized when NumPy is available."""
+    if np is None or not norms:
+        return [minhash(norm) for norm in norms]
+    offsets = []
+    digests = []
+    for norm in norms:
+        offsets.append(len(digests))
+        digests.extend(_shingle_hashes(s) for s in shingles(norm))
+    matrix = np.frombuffer(b"".join(digests), dtype=np.uint16).reshape(-1, NUM_HASHES)
+    mins = np.minimum.reduceat(matrix, np.asarray(offsets), axis=0)
+    return [tuple(row) for row in mins.tolist()]
+
+
+def fingerprint(text: str) -> Tuple[str, str, Tuple[int, ...]]:
+    """Return the normalized ``text``, its SHA-1 hex digest and its MinHash signature."""
+    norm = normalize_text(text)
+    return norm, hashlib.sha1(norm.encode("utf-8")).hexdigest(), minhash(norm)
+
+
+def band_keys(signature: Sequence[int]) -> List[int]:
+    """Return one integer key per LSH band of MinHash ``signature``.
+
+    A key is the band number in the top bits and a 56-bit hash of the
+    band's values below it, so keys of different bands never collide, all
+    bands can share one lookup table and every key fits a SQLite integer.
+    """
+    keys = []
+    for band in range(len(signature) // BAND_ROWS):
+        values = array("H", signature[band * BAND_ROWS : (band + 1) * BAND_ROWS]).tobytes()
+        digest = blake2b(values, digest_size=7).digest()
+        keys.append((band << 56) | int.from_bytes(digest, "big"))
+    return keys
+
+
+def merge_into(unique: Signature, sig: Signature) -> None:
+    """Merge duplicate ``sig`` into ``unique``.
+
+    ``unique`` keeps the earliest timestamp, the highest confidence and its
+    own metadata, with missing fields filled from ``sig``.
+    """
+    if sig.timestamp and (not unique.timestamp or sig.timestamp < unique.timestamp):
+        unique.timestamp = sig.timestamp
+    for f in fields(SignatureMetadata):
+        if getattr(unique.metadata, f.name) is None:
+            val = getattr(sig.metadata, f.name)
+            if val is not None:
+                setattr(unique.metadata, f.name, val)
+    if sig.confidence > unique.confidence:
+        unique.confidence = sig.confidence
+
+
+def _ratio(sig: Signature, a: str, b: str) -> float:
+    try:
+        return _similar(a, b)
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.error(
+            "dedupe error: %s",
+            exc,
+            extra={"component": "deduplicator", "msg_id": sig.source_msg_id},
+        )
+        return 0.0
+
+
+def _length_bound(a: str, b: str) -> float:
+    """Upper bound of the similarity ratio of ``a`` and ``b`` from their lengths."""
+    total = len(a) + len(b)
+    return 2.0 * min(len(a), len(b)) / total if total else 1.0
+
+
+@lru_cache(maxsize=1 << 16)
+def _char_counts(norm: str) -> Tuple[int, ...]:
+    # count of each COUNTED_CHARS character in ``norm``, then of all others
+    counts = Counter(norm)
+    known = tuple(counts.get(c, 0) for c in COUNTED_CHARS)
+    return known + (len(norm) - sum(known),)
+
+
+def _count_bound(a: str, b: str) -> float:
+    """Upper bound of the similarity ratio of ``a`` and ``b`` from their character counts.
+
+    Like ``SequenceMatcher.quick_ratio``, except that characters outside
+    ``COUNTED_CHARS`` are counted together, which only loosens the bound.
+    """
+    matches = sum(map(min, _char_counts(a), _char_counts(b)))
+    return 2.0 * matches / (len(a) + len(b))
+
+
+def first_match(
+    sig: Signature,
+    sig_norm: str,
+    candidates: Iterable[Tuple[Any, str]],
+    threshold: float,
+    quick: bool = True,
+) -> Optional[Tuple[Any, float]]:
+    """Return ``(key, ratio)`` of the first ``(key, norm)`` candidate similar to ``sig_norm``.
+
+    With ``quick``, identical texts match without computing the ratio and
+    texts whose lengths or character counts alone rule out ``threshold`` are
+    skipped.
+    """
+    for key, norm in candidates:
+        if quick and norm == sig_norm:
+            return key, 1.0
+        if quick and _length_bound(sig_norm, norm) < threshold:
+            continue
+        if quick and _count_bound(sig_norm, norm) < threshold:
+            continue
+        ratio = _ratio(sig, sig_norm, norm)
+        if ratio >= threshold:
+            return key, ratio
+    return None
+
+
 def dedupe_signatures(
-    signatures: Iterable[Signature], threshold: float = 0.85
+    signatures: Iterable[Signature], threshold: float = 0.85, engine: str = "auto"
 ) -> List[Signature]:
-    """Collapse near-duplicate signatures based on a similarity threshold."""
+    """Collapse near-duplicate signatures based on a similarity threshold.
+
+    Each signature is merged (see :func:`merge_into`) into the first unique
+    whose normalized text is at least ``threshold`` similar, else it becomes
+    a unique itself. ``engine`` is ``"exhaustive"`` (compare with every
+    unique), ``"minhash"`` (compare with uniques sharing an LSH band) or
+    ``"auto"``, which uses MinHash above ``MINHASH_MIN_BATCH`` signatures.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown dedupe engine: {engine}")
     sig_list = list(signatures)
+    if engine == "auto":
+        engine = "minhash" if len(sig_list) > MINHASH_MIN_BATCH else "exhaustive"
+    use_lsh = engine == "minhash"
+    log_merges = logger.isEnabledFor(logging.INFO)
     uniques: List[Signature] = []
     norms: List[str] = []
-    for sig in sig_list:
-        sig_norm = _normalize(sig.text)
-        merged = False
-        for idx, u in enumerate(uniques):
-            try:
-                ratio = _similar(sig_norm, norms[idx])
-            except Exception as exc:  # pragma: no cover - defensive
-                logger.error(
-                    "dedupe error: %s",
-                    exc,
-                    extra={
-                        "component": "deduplicator",
-                        "msg_id": sig.source_msg_id,
-                    },
-                )
-                ratio = 0.0
-            if ratio >= threshold:
-                if sig.timestamp and (
-                    not u.timestamp or sig.timestamp < u.timestamp
-                ):
-                    u.timestamp = sig.timestamp
-                for f in fields(SignatureMetadata):
-                    if getattr(u.metadata, f.name) is None:
-                        val = getattr(sig.metadata, f.name)
-                        if val is not None:
-                            setattr(u.metadata, f.name, val)
-                if sig.confidence > u.confidence:
-                    u.confidence = sig.confidence
+    sig_norms = [normalize_text(sig.text) for sig in sig_list]
+    # band key -> indexes of the uniques with that band
+    buckets: Dict[int, List[int]] = {}
+    keys_of: Dict[str, List[int]] = {}
+    if use_lsh:
+        distinct = list(dict.fromkeys(sig_norms))
+        keys_of = {n: band_keys(mh) for n, mh in zip(distinct, minhash_batch(distinct))}
+    for sig, sig_norm in zip(sig_list, sig_norms):
+        if use_lsh:
+            keys = keys_of[sig_norm]
+            found = set()
+            for key in keys:
+                found.update(buckets.get(key, ()))
+            candidates = ((idx, norms[idx]) for idx in sorted(found))
+        else:
+            candidates = enumerate(norms)
+        match = first_match(sig, sig_norm, candidates, threshold, quick=use_lsh)
+        if match is not None:
+            idx, ratio = match
+            u = uniques[idx]
+            merge_into(u, sig)
+            if log_merges:
                 logger.info(
                     "Merged signature %s into %s (ratio=%.2f)",
                     sig.source_msg_id,
                     u.source_msg_id,
                     ratio,
+                    extra={"component": "deduplicator", "msg_id": sig.source_msg_id},
                 )
-                merged = True
-                break
-        if not merged:
-            uniques.append(sig)
-            norms.append(sig_norm)
+            continue
+        if use_lsh:
+            for key in keys:
+                buckets.setdefault(key, []).append(len(uniques))
+        uniques.append(sig)
+        norms.append(sig_norm)
     logger.info(
         "Reduced %d \u2192 %d signatures",
         len(sig_list),
         len(uniques),
+        extra={"component": "deduplicator"},
     )
     return uniques
 
@@ -1,27 +1,41 @@
 #!/usr/bin/env python3
 """Signature extraction logic."""
 
+import hashlib
+import json
 import logging
 import re
 import time
-from typing import List, Optional, Tuple, Iterable, Dict, Any
+from dataclasses import replace
+from typing import List, Optional, Sequence, Tuple, Iterable, Dict, Any
 
-from html import unescape
-
-from .models import Signature
+from .cache import DEFAULT_CACHE_SIZE, CachedResult, SignatureCache
+from .matching import PatternMatcher
+from .models import Message, Signature
+from .normalizer import NormalizedLines, is_html, normalize_body, tail_start
 from .parser import SignatureParser
+from .prefilter import PreFilter
+from .quotes import QUOTE_HINT_RE, quote_start, quoted_blocks
+from .ruleset import Ruleset
+from .templates import DEFAULT_MAX_SENDERS, DEFAULT_MIN_CONFIDENCE, SenderTemplate, TemplateStore
 from .config import load_config
 
 logger = logging.getLogger(__name__)
 
 
 MAX_SIGNATURE_LINES = 10
+# Raw lines at the end of a body searched for the sign-off keying the cache
+CACHE_SCAN_LINES = 2 * MAX_SIGNATURE_LINES
 
 
 
 
 class Heuristic:
-    """Boundary detection heuristic interface."""
+    """Boundary detection heuristic interface.
+
+    ``lines`` is the :class:`NormalizedLines` of the message, so heuristics can
+    use its annotations instead of re-reading ``raw_body``.
+    """
 
     confidence: float = 0.0
 
@@ -30,16 +44,22 @@ class Heuristic:
 
 
 class RegexSignOffHeuristic(Heuristic):
-    """Detects signature boundary via regex sign-off patterns."""
+    """Detects signature boundary via regex sign-off patterns.
 
-    def __init__(self, patterns: Iterable[str]) -> None:
-        self.patterns = [re.compile(p, re.IGNORECASE) for p in patterns]
+    The patterns are compiled into one ``PatternMatcher``, so each line costs
+    a single search however many sign-offs are configured. An already built
+    ``matcher`` (e.g. ``Ruleset.signoff``) is used as is.
+    """
+
+    def __init__(self, patterns: Iterable[str], matcher: Optional[PatternMatcher] = None) -> None:
+        self.matcher = matcher if matcher is not None else PatternMatcher(patterns)
         self.confidence = 0.9
 
     def detect_boundary(self, lines: List[str], raw_body: str) -> Optional[Tuple[int, float]]:
-        for i, line in enumerate(reversed(lines)):
-            if any(p.search(line.strip()) for p in self.patterns):
-                return len(lines) - i - 1, self.confidence
+        search = self.matcher.search
+        for i in range(len(lines) - 1, -1, -1):
+            if search(lines[i].strip()):
+                return i, self.confidence
         return None
 
 
@@ -50,14 +70,11 @@ class HtmlDividerHeuristic(Heuristic):
         self.confidence = 0.7
 
     def detect_boundary(self, lines: List[str], raw_body: str) -> Optional[Tuple[int, float]]:
-        match = re.search(r'<hr\b|<div\s+class=\"signature\"', raw_body, re.IGNORECASE)
-        if not match:
+        if not isinstance(lines, NormalizedLines):
+            lines = normalize_body(raw_body)
+        if lines.divider_line is None:
             return None
-        before = raw_body[: match.start()]
-        normalized_before = SignatureExtractor()._normalize_body(before)
-        if not normalized_before:
-            return 0, self.confidence
-        return len(normalized_before.split("\n")), self.confidence
+        return lines.divider_line, self.confidence
 
 
 class TrailingLinesHeuristic(Heuristic):
@@ -76,99 +93,146 @@ class TrailingLinesHeuristic(Heuristic):
 
 
 class SignatureExtractor:
-    """Extracts signatures from message bodies."""
-
-    def __init__(self, config: Dict[str, Any] | None = None) -> None:
+    """Extracts signatures from message bodies.
+
+    Compiled rules come from ``ruleset``, by default the :class:`Ruleset` of
+    ``config`` shared by every extractor built from an equal config.
+
+    With ``extraction.tail_window_kb`` or ``extraction.tail_window_lines`` set,
+    only the end of a long body is normalized and scanned. The whole body is
+    used instead unless the sign-off or HTML divider heuristic finds a
+    boundary below the first line of the window, since a block starting
+    there may continue above it. When ``metrics`` is
+    given, the ``extract.tail_window`` and ``extract.tail_fallback`` counters
+    record how often each happened.
+
+    Signatures found by the sign-off heuristic are kept in ``cache``, a
+    :class:`SignatureCache` of ``extraction.cache_size`` entries. Before any
+    normalization, the last raw line of the final ``CACHE_SCAN_LINES`` lines
+    (within the tail window, if set) that the sign-off matcher accepts starts
+    the cache region; its hash is the key. A body ending like an earlier one
+    therefore skips normalization, boundary detection and parsing
+    (``extract.cache_hits`` / ``extract.cache_misses``). On a miss the
+    signature is found in the region alone, like in the tail window, and
+    cached; bodies whose region holds no signature take the normal path.
+
+    With ``extraction.skip_quoted`` (the default) only the newest part of a
+    reply is searched: lines from the first quote marker on are dropped
+    (``extract.quoted`` counts such messages) and the tail window is not used
+    for bodies that may hold quoted history. :meth:`extract_quoted` mines the
+    earlier messages of the thread instead, and ``extraction.mine_quoted``
+    makes the extraction workers call it for every message.
+
+    With ``extraction.sender_templates``, signatures that the sign-off
+    heuristic found at the very end of a message with at least
+    ``template_min_confidence`` become the sender's template in
+    ``templates``. A later message from that sender whose normalized tail
+    ends with the template lines returns it straight away
+    (``extract.template_hits`` / ``extract.template_misses``).
+
+    :meth:`skip_reason` applies the ``prefilter`` (see :class:`PreFilter`)
+    that the extraction workers run before extraction, counting skipped
+    messages under ``prefilter.<reason>``.
+
+    ``digest`` hashes the ruleset digest together with every option that
+    changes which signatures are found (``settings``), so ``extract
+    --incremental`` knows when earlier results are stale.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any] | None = None,
+        metrics: Any = None,
+        ruleset: Optional[Ruleset] = None,
+    ) -> None:
         self.config = config or load_config()
-        patterns = self.config.get("extraction", {}).get("signoff_patterns", [])
-        max_lines = self.config.get("extraction", {}).get("max_fallback_lines", 5)
+        self.metrics = metrics
+        self.ruleset = ruleset or Ruleset.from_config(self.config)
+        extraction = self.config.get("extraction", {})
+        max_lines = extraction.get("max_fallback_lines", 5)
+        self.tail_chars = int(extraction.get("tail_window_kb", 0) * 1024)
+        self.tail_lines = int(extraction.get("tail_window_lines", 0))
+        self.skip_quoted = bool(extraction.get("skip_quoted", True))
+        self.mine_quoted = bool(extraction.get("mine_quoted", False))
         self.heuristics: List[Heuristic] = [
-            RegexSignOffHeuristic(patterns),
+            RegexSignOffHeuristic(self.ruleset.signoff_patterns, self.ruleset.signoff),
             HtmlDividerHeuristic(),
             TrailingLinesHeuristic(max_lines),
         ]
+        self.cache = SignatureCache(int(extraction.get("cache_size", DEFAULT_CACHE_SIZE)))
+        # Entries are only valid for the rules that produced them
+        self._cache_salt = self.ruleset.digest
+        self.templates: Optional[TemplateStore] = None
+        if extraction.get("sender_templates", True):
+            self.templates = TemplateStore(
+                float(extraction.get("template_min_confidence", DEFAULT_MIN_CONFIDENCE)),
+                int(extraction.get("template_max_senders", DEFAULT_MAX_SENDERS)),
+            )
+        self.prefilter = PreFilter(extraction)
+        self.settings: Dict[str, Any] = {
+            "max_fallback_lines": max_lines,
+            "tail_chars": self.tail_chars,
+            "tail_lines": self.tail_lines,
+            "skip_quoted": self.skip_quoted,
+            "mine_quoted": self.mine_quoted,
+            "templates": (
+                [self.templates.min_confidence, self.templates.max_senders]
+                if self.templates is not None
+                else None
+            ),
+            # Pre-filtered messages are recorded as processed, so turning
+            # the filter off or changing its rules must re-audit them
+            "prefilter": self.prefilter.settings(),
+        }
+        data = json.dumps([self.ruleset.digest, self.settings], sort_keys=True)
+        self.digest = hashlib.sha1(data.encode("utf-8")).hexdigest()
 
     def _normalize_body(self, body: str) -> str:
         """Strip HTML tags and collapse whitespace into normalized plain text."""
-        from html.parser import HTMLParser
-
-        class _Stripper(HTMLParser):
-            def __init__(self):
-                super().__init__()
-                self._parts: List[str] = []
-                self._skip = False
-
-            def handle_starttag(self, tag: str, attrs):
-                t = tag.lower()
-                if t in {"br", "p", "div", "li", "tr"}:
-                    self._parts.append("\n")
-                if t in {"style", "script"}:
-                    self._skip = True
-
-            def handle_startendtag(self, tag: str, attrs):
-                self.handle_starttag(tag, attrs)
-
-            def handle_endtag(self, tag: str) -> None:
-                t = tag.lower()
-                if t in {"style", "script"}:
-                    self._skip = False
-                if t in {"p", "div", "li", "tr"}:
-                    self._parts.append("\n")
-
-            def handle_data(self, data: str):
-                if not self._skip:
-                    self._parts.append(data)
-
-            def handle_entityref(self, name: str) -> None:
-                self._parts.append(unescape(f"&{name};"))
-
-            def handle_charref(self, name: str) -> None:
-                self._parts.append(unescape(f"&#{name};"))
-
-            def get_data(self) -> str:
-                return "".join(self._parts)
-
-        try:
-            if '<html' in body.lower() or '<body' in body.lower():
-                stripper = _Stripper()
-                stripper.feed(body)
-                text = stripper.get_data()
-            else:
-                text = body
-        except Exception as exc:  # pragma: no cover - defensive
-            logger.warning(
-                "html parse error: %s",
-                exc,
-                extra={"component": "extractor"},
-            )
-            text = body
-
-        collapsed = re.sub(r'[ \t]+', ' ', text)
-        collapsed = re.sub(r'\r\n?', '\n', collapsed)
-        collapsed = re.sub(r'\n+', '\n', collapsed).strip()
-        return '\n'.join(line.strip() for line in collapsed.splitlines() if line.strip())
-
-
-
-    def extract_from_body(self, body: str) -> Optional[Signature]:
-        """Convenience wrapper when message metadata is not needed."""
-        return self.extract_signature(body, "")
-
-    def extract_signature(
-        self, body: str, message_id: str, timestamp: Optional[str] = None
-    ) -> Optional[Signature]:
-        """Return a signature if detected in ``body``."""
-        start_ts = time.time()
-        logger.debug("Extracting signature", extra={"component": "extractor"})
-        raw_body = body
-        clean_body = self._normalize_body(body)
-        lines = clean_body.split("\n") if clean_body else []
-        boundary: Optional[int] = None
-        base_conf = 0.0
-        for h in self.heuristics:
+        return normalize_body(body).text
+
+    def _count(self, name: str) -> None:
+        if self.metrics is not None:
+            self.metrics.incr(name)
+
+    def _count_n(self, name: str, n: int) -> None:
+        if self.metrics is not None and n:
+            self.metrics.incr(name, n)
+
+    def skip_reason(self, msg: Message) -> Optional[str]:
+        """Return why the pre-filter skips ``msg``, or ``None`` to extract it.
+
+        May read the body of lazily loaded messages, and raise if it cannot.
+        """
+        reason = self.prefilter.reason(msg)
+        if reason is not None:
+            self._count(f"prefilter.{reason}")
+        return reason
+
+    def _find_boundary(
+        self,
+        lines: NormalizedLines,
+        raw_body: str,
+        message_id: str,
+        heuristics: Optional[Sequence[Heuristic]] = None,
+    ) -> Optional[Tuple[int, float, Heuristic]]:
+        """Return the first heuristic's ``(boundary, confidence, heuristic)``, if any.
+
+        ``heuristics`` defaults to all of them. With ``metrics``, each
+        heuristic's calls, hits (boundaries found), errors and latency
+        histogram are recorded under ``heuristic.<name>``.
+        """
+        metrics = self.metrics
+        for h in self.heuristics if heuristics is None else heuristics:
+            name = f"heuristic.{h.__class__.__name__}"
+            t0 = time.perf_counter()
             try:
                 result = h.detect_boundary(lines, raw_body)
-            except Exception as exc:  # pragma: no cover - defensive
+            except Exception as exc:
+                if metrics is not None:
+                    metrics.incr(f"{name}.calls")
+                    metrics.incr(f"{name}.errors")
+                    metrics.histogram(name, (time.perf_counter() - t0) * 1000)
                 logger.warning(
                     "heuristic error: %s",
                     exc,
@@ -179,11 +243,270 @@ class SignatureExtractor:
                     },
                 )
                 continue
+            if metrics is not None:
+                metrics.histogram(name, (time.perf_counter() - t0) * 1000)
+                metrics.incr(f"{name}.calls")
+                if result is not None:
+                    metrics.incr(f"{name}.hits")
             if result is not None:
-                boundary, base_conf = result
-                break
-        if boundary is None:
+                return result[0], result[1], h
+        return None
+
+    def _cache_key(self, region: str, html: bool) -> str:
+        """Return the cache key of raw cache ``region``."""
+        data = f"{self._cache_salt}\n{int(html)}\n{region}"
+        return hashlib.sha1(data.encode("utf-8", "replace")).hexdigest()
+
+    def _cache_region(self, body: str, html: bool) -> int:
+        """Return where the cache region of ``body`` starts, or ``-1`` if it has none."""
+        max_lines = min(self.tail_lines, CACHE_SCAN_LINES) if self.tail_lines else CACHE_SCAN_LINES
+        start = tail_start(body, self.tail_chars, max_lines, html)
+        window = body[start:]
+        search = self.ruleset.signoff.search
+        offset = len(window)
+        for line in reversed(window.split("\n")):
+            offset -= len(line)
+            if search(line.strip()):
+                return start + offset
+            offset -= 1
+        return -1
+
+    def extract_from_body(self, body: str) -> Optional[Signature]:
+        """Convenience wrapper when message metadata is not needed."""
+        return self.extract_signature(body, "")
+
+    def extract_signature(
+        self, body: str, message_id: str, timestamp: Optional[str] = None, sender: str = ""
+    ) -> Optional[Signature]:
+        """Return a signature if detected in ``body``.
+
+        ``sender`` is the normalized sender key (see ``Message.sender``) used
+        for the template fast path.
+        """
+        # Level guards keep per-message logging free when it is filtered out
+        log_info = logger.isEnabledFor(logging.INFO)
+        start_ts = time.time() if log_info else 0.0
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Extracting signature", extra={"component": "extractor"})
+        sig = self._extract(body, message_id, timestamp, SignatureParser(self.config, self.ruleset), sender)
+        if sig is None:
+            return None
+        if log_info:
+            logger.info(
+                "extracted signature",
+                extra={
+                    "component": "extractor",
+                    "msg_id": message_id,
+                    "duration_ms": round((time.time() - start_ts) * 1000, 2),
+                    "confidence": sig.confidence,
+                },
+            )
+        return sig
+
+    def extract_many(
+        self, messages: Sequence[Message], failed: Optional[List[int]] = None
+    ) -> List[Optional[Signature]]:
+        """Return the signature (or ``None``) of each of ``messages``, in order.
+
+        One ``SignatureParser`` serves the whole batch, and a single log record
+        summarizes it. With ``metrics``, the batch is recorded as one
+        ``extract.batch`` timing plus the ``extract.messages``,
+        ``extract.signatures`` and ``extract.errors`` counters. A message that
+        raises (e.g. an unreadable lazy body) is logged and yields ``None``;
+        its index is appended to ``failed`` when given.
+        """
+        start_ts = time.time()
+        parser = SignatureParser(self.config, self.ruleset)
+        results: List[Optional[Signature]] = []
+        errors = 0
+        for msg in messages:
+            try:
+                # Reading the sender may cost a PST property fetch, so only when used
+                sender = msg.sender if self.templates is not None else ""
+                results.append(self._extract(msg.body, msg.msg_id, msg.timestamp, parser, sender))
+            except Exception:
+                errors += 1
+                if failed is not None:
+                    failed.append(len(results))
+                results.append(None)
+                logger.exception(
+                    "extract error",
+                    extra={"component": "extractor", "msg_id": msg.msg_id},
+                )
+        duration_ms = (time.time() - start_ts) * 1000
+        found = [s.confidence for s in results if s is not None]
+        logger.info(
+            "extracted %d signatures from %d messages (%d errors)",
+            len(found),
+            len(results),
+            errors,
+            extra={
+                "component": "extractor",
+                "duration_ms": round(duration_ms, 2),
+                "confidence": sum(found) / len(found) if found else 0.0,
+            },
+        )
+        if self.metrics is not None:
+            self.metrics.observe("extract.batch", duration_ms)
+            self.metrics.incr("extract.messages", len(results))
+            self.metrics.incr("extract.signatures", len(found))
+            if errors:
+                self.metrics.incr("extract.errors", errors)
+        return results
+
+    def _extract(
+        self,
+        body: str,
+        message_id: str,
+        timestamp: Optional[str],
+        parser: SignatureParser,
+        sender: str = "",
+    ) -> Optional[Signature]:
+        """Find, collect and parse the signature block of ``body``."""
+        template = self.templates.get(sender) if sender and self.templates is not None else None
+        if template is not None:
+            sig = self._match_template(body, template, message_id, timestamp)
+            self._count("extract.template_hits" if sig is not None else "extract.template_misses")
+            if sig is not None:
+                return sig
+        found = None
+        # Cheap raw check; only bodies that may quote history are split
+        quoted = self.skip_quoted and QUOTE_HINT_RE.search(body) is not None
+        html = None
+        if self.cache.max_entries and not quoted:
+            html = is_html(body)
+            start = self._cache_region(body, html)
+            if start >= 0:
+                region = body[start:]
+                key = self._cache_key(region, html)
+                entry = self.cache.get(key)
+                self._count("extract.cache_hits" if entry is not None else "extract.cache_misses")
+                if entry is not None:
+                    return Signature(
+                        text=entry.text,
+                        source_msg_id=message_id,
+                        timestamp=timestamp,
+                        metadata=replace(entry.metadata),
+                        confidence=entry.confidence,
+                    )
+                lines = normalize_body(region, html=html)
+                found = self._find_boundary(lines, region, message_id, self.heuristics[:1])
+                if found is not None:
+                    sig = self._finish(lines, found, message_id, timestamp, parser, sender)
+                    if sig is not None:
+                        self.cache.put(
+                            key,
+                            CachedResult(found[0], sig.text, replace(sig.metadata), sig.confidence),
+                        )
+                    return sig
+        if (self.tail_chars or self.tail_lines) and not quoted:
+            if html is None:
+                html = is_html(body)
+            start = tail_start(body, self.tail_chars, self.tail_lines, html)
+            if start:
+                window = body[start:]
+                lines = normalize_body(window, html=html)
+                # The trailing-lines catch-all would accept any window
+                found = self._find_boundary(lines, window, message_id, self.heuristics[:-1])
+                if found is not None and not any(line.strip() for line in lines[: found[0]]):
+                    # A block starting the window may continue above it
+                    found = None
+                self._count("extract.tail_window")
+                if found is None:
+                    self._count("extract.tail_fallback")
+        if found is None:
+            lines = normalize_body(body)
+            if quoted:
+                lines = self._newest(lines)
+            found = self._find_boundary(lines, body, message_id)
+        if found is None:
+            return None
+        return self._finish(lines, found, message_id, timestamp, parser, sender)
+
+    def _finish(
+        self,
+        lines: NormalizedLines,
+        found: Tuple[int, float, Heuristic],
+        message_id: str,
+        timestamp: Optional[str],
+        parser: SignatureParser,
+        sender: str,
+    ) -> Optional[Signature]:
+        """Return the signature at ``found``, learning it as ``sender``'s template if it qualifies."""
+        sig = self._signature(lines, found, message_id, timestamp, parser)
+        if sig is not None and sender and self.templates is not None and found[2] is self.heuristics[0]:
+            sig_lines = sig.text.split("\n")
+            if lines[len(lines) - len(sig_lines) :] == sig_lines:
+                if self.templates.learn(sender, sig_lines, replace(sig.metadata), sig.confidence):
+                    self._count("extract.templates_learned")
+        return sig
+
+    def _match_template(
+        self, body: str, template: SenderTemplate, message_id: str, timestamp: Optional[str]
+    ) -> Optional[Signature]:
+        """Return ``template`` as the signature if ``body`` ends with it.
+
+        Only a window a little larger than the template is normalized.
+        """
+        html = is_html(body)
+        start = tail_start(body, 2 * len(template.text) + 256, 0, html)
+        lines = normalize_body(body[start:], html=html) if start else normalize_body(body)
+        if not template.matches(lines):
             return None
+        return Signature(
+            text=template.text,
+            source_msg_id=message_id,
+            timestamp=timestamp,
+            metadata=replace(template.metadata),
+            confidence=template.confidence,
+        )
+
+    def _newest(self, lines: NormalizedLines) -> NormalizedLines:
+        """Return ``lines`` without quoted history."""
+        start = quote_start(lines)
+        if start is None:
+            return lines
+        self._count("extract.quoted")
+        divider = lines.divider_line
+        return NormalizedLines(
+            lines[:start], lines.raw, divider if divider is not None and divider < start else None
+        )
+
+    def extract_quoted(
+        self,
+        body: str,
+        message_id: str,
+        timestamp: Optional[str] = None,
+        parser: Optional[SignatureParser] = None,
+    ) -> List[Signature]:
+        """Return the signatures of the earlier messages quoted in ``body``.
+
+        Each quoted message is dequoted and run through the heuristics on its
+        own; the signatures keep ``message_id`` as their source.
+        """
+        parser = parser or SignatureParser(self.config, self.ruleset)
+        found: List[Signature] = []
+        for block in quoted_blocks(normalize_body(body)):
+            lines = NormalizedLines(block)
+            boundary = self._find_boundary(lines, "", message_id)
+            if boundary is None:
+                continue
+            sig = self._signature(lines, boundary, message_id, timestamp, parser)
+            if sig is not None:
+                found.append(sig)
+        self._count_n("extract.quoted_signatures", len(found))
+        return found
+
+    def _signature(
+        self,
+        lines: List[str],
+        found: Tuple[int, float, Heuristic],
+        message_id: str,
+        timestamp: Optional[str],
+        parser: SignatureParser,
+    ) -> Optional[Signature]:
+        """Collect and parse the signature block starting at ``found``."""
+        boundary, base_conf, _ = found
 
         collected: List[str] = []
         for line in lines[boundary : boundary + MAX_SIGNATURE_LINES]:
@@ -193,7 +516,6 @@ class SignatureExtractor:
         if len([l for l in collected if l.strip()]) < 2:
             return None
         text = "\n".join(collected).strip()
-        parser = SignatureParser(self.config)
         meta = parser.parse(text)
         conf = base_conf
         if not (meta.email or meta.phone or meta.name):
@@ -204,23 +526,11 @@ class SignatureExtractor:
             conf += 0.05
         if meta.name:
             conf += 0.05
-        confidence = min(conf, 1.0)
-        sig = Signature(
+        conf = min(conf, 1.0)
+        return Signature(
             text=text,
             source_msg_id=message_id,
             timestamp=timestamp,
             metadata=meta,
-            confidence=confidence,
-        )
-        duration_ms = (time.time() - start_ts) * 1000
-        logger.info(
-            "extracted signature",
-            extra={
-                "component": "extractor",
-                "msg_id": message_id,
-                "duration_ms": round(duration_ms, 2),
-                "confidence": confidence,
-            },
+            confidence=conf,
         )
-        return sig
-
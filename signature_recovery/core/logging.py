@@ -1,13 +1,24 @@
 #!/usr/bin/env python3
-"""Logging utilities with JSON formatting and retry decorator."""
+"""Logging utilities with JSON formatting and retry decorator.
+
+``setup_logging(queued=True)`` moves formatting and log I/O off the calling
+threads: records go through a bounded queue to a background listener that
+writes them. When the queue is full, records below WARNING are dropped
+rather than waited on; warnings and errors wait for room. Records below
+WARNING can be sampled or rate-limited per component in either mode.
+"""
 
 # Imports
+import atexit
 import json
 import logging
+import os
+import queue
+import threading
 import time
 from functools import wraps
-from logging.handlers import TimedRotatingFileHandler
-from typing import Callable, Type
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import Callable, Dict, List, Mapping, Optional, Type
 
 # Logging
 
@@ -28,11 +39,120 @@ class JsonFormatter(logging.Formatter):
 
 # Globals
 DEFAULT_LOG_FILE = "recovery.log"
+DEFAULT_QUEUE_SIZE = 10000
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_sampler: Optional["ComponentSampler"] = None
+_fork_hook_installed = False
 
 # Classes/Functions
 
-def setup_logging(verbose: bool = False, log_file: str = DEFAULT_LOG_FILE) -> None:
-    """Configure root logger with console and rotating file handlers."""
+
+def record_component(record: logging.LogRecord) -> str:
+    """Return the ``component`` of ``record``, else the last part of its logger name."""
+    return getattr(record, "component", "") or record.name.rsplit(".", 1)[-1]
+
+
+class ComponentSampler(logging.Filter):
+    """Thin out records below WARNING per component.
+
+    ``sample`` maps a component to the fraction of its records to keep (every
+    ``round(1 / fraction)``-th one), ``rate_limit`` to the most records it may
+    log per second. Warnings and errors always pass. Suppressed records are
+    counted per component in ``suppressed``.
+    """
+
+    def __init__(
+        self,
+        sample: Optional[Mapping[str, float]] = None,
+        rate_limit: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        super().__init__()
+        self.every = {c: max(1, round(1 / f)) for c, f in (sample or {}).items() if f > 0}
+        self.drop_all = {c for c, f in (sample or {}).items() if f <= 0}
+        self.rate_limit = dict(rate_limit or {})
+        self.suppressed: Dict[str, int] = {}
+        self._seen: Dict[str, int] = {}
+        # component -> [window start, records logged in the window]
+        self._windows: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        component = record_component(record)
+        every = self.every.get(component)
+        limit = self.rate_limit.get(component)
+        if every is None and limit is None and component not in self.drop_all:
+            return True
+        # Each handler runs the filter; decide and count once per record
+        decided = getattr(record, "_sampler_keep", None)
+        if decided is not None:
+            return decided
+        with self._lock:
+            keep = component not in self.drop_all
+            if keep and every is not None:
+                seen = self._seen.get(component, 0)
+                self._seen[component] = seen + 1
+                keep = seen % every == 0
+            if keep and limit is not None:
+                now = time.monotonic()
+                window = self._windows.get(component)
+                if window is None or now - window[0] >= 1.0:
+                    window = self._windows[component] = [now, 0]
+                keep = window[1] < limit
+                if keep:
+                    window[1] += 1
+            if not keep:
+                self.suppressed[component] = self.suppressed.get(component, 0) + 1
+        record._sampler_keep = keep
+        return keep
+
+    def pop_suppressed(self) -> int:
+        """Return the number of suppressed records and reset the counts."""
+        with self._lock:
+            total = sum(self.suppressed.values())
+            self.suppressed.clear()
+            return total
+
+
+class DroppingQueueHandler(QueueHandler):
+    """``QueueHandler`` that drops records below WARNING when the queue is full.
+
+    Warnings and errors are never dropped: they wait for room instead.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record)
+            else:
+                self.dropped += 1
+
+
+def setup_logging(
+    verbose: bool = False,
+    log_file: str = DEFAULT_LOG_FILE,
+    queued: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    sample: Optional[Mapping[str, float]] = None,
+    rate_limit: Optional[Mapping[str, float]] = None,
+) -> None:
+    """Configure root logger with console and rotating file handlers.
+
+    With ``queued`` the root logger only gets a :class:`DroppingQueueHandler`
+    over a queue of ``queue_size`` records, and a background
+    ``QueueListener`` formats and writes them (see :func:`stop_logging`).
+    ``sample`` and ``rate_limit`` configure a :class:`ComponentSampler`.
+    """
+    global _listener, _queue_handler, _sampler
+    stop_logging()
     level = logging.DEBUG if verbose else logging.INFO
     root = logging.getLogger()
     root.setLevel(level)
@@ -41,11 +161,69 @@ def setup_logging(verbose: bool = False, log_file: str = DEFAULT_LOG_FILE) -> No
     formatter = JsonFormatter()
     file_handler = TimedRotatingFileHandler(log_file, when="midnight", backupCount=7)
     file_handler.setFormatter(formatter)
-    root.addHandler(file_handler)
     console = logging.StreamHandler()
     console.setLevel(level)
     console.setFormatter(formatter)
-    root.addHandler(console)
+    handlers: List[logging.Handler] = [file_handler, console]
+    _sampler = ComponentSampler(sample, rate_limit) if sample or rate_limit else None
+    if queued:
+        _queue_handler = DroppingQueueHandler(queue.Queue(queue_size))
+        _listener = QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _install_fork_hook()
+        handlers = [_queue_handler]
+    for handler in handlers:
+        if _sampler is not None:
+            handler.addFilter(_sampler)
+        root.addHandler(handler)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener started by :func:`setup_logging`.
+
+    In queued and direct mode alike, a final record reports how many records
+    were suppressed or dropped since the last report.
+    """
+    global _listener, _queue_handler
+    suppressed = _sampler.pop_suppressed() if _sampler is not None else 0
+    dropped = _queue_handler.dropped if _queue_handler is not None else 0
+    if suppressed or dropped:
+        logging.getLogger(__name__).warning(
+            "suppressed %d sampled or rate-limited log records, dropped %d on a full queue",
+            suppressed,
+            dropped,
+            extra={"component": "logging"},
+        )
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    if _queue_handler in root.handlers:
+        root.removeHandler(_queue_handler)
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
+
+
+def _install_fork_hook() -> None:
+    global _fork_hook_installed
+    if _fork_hook_installed:
+        return
+    _fork_hook_installed = True
+    atexit.register(stop_logging)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_restart_in_child)
+
+
+def _restart_in_child() -> None:
+    """Give a forked worker process its own queue and listener thread."""
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+    _queue_handler.queue = queue.Queue(_queue_handler.queue.maxsize)
+    _listener = QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
 
 
 def retry(
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Compiled matchers for large pattern and keyword sets.
+
+``trie_regex`` turns a list of literal phrases into one regex shaped like a
+trie, so the regex engine walks the phrases as a keyword automaton and the
+cost of a search stays flat as phrases are added. ``PatternMatcher`` combines
+such a trie for the literal entries of a pattern list with a single
+alternation of the remaining regexes. ``SuffixMatcher`` tests whether text
+ends with any of a large set of literal suffixes.
+"""
+
+# Imports
+import re
+from typing import Dict, Iterable, List, Pattern, Set
+
+# Globals
+_META_CHARS = set("\\.^$*+?{}[]|()")
+# Backreferences depend on group numbering and break when patterns are joined
+_BACKREF_RE = re.compile(r"\\[1-9]|\(\?P=")
+
+# Classes/Functions
+
+
+def is_literal(pattern: str) -> bool:
+    """Return whether ``pattern`` has no regex syntax and matches itself."""
+    return not any(ch in _META_CHARS for ch in pattern)
+
+
+def trie_regex(words: Iterable[str], ignore_case: bool = True) -> str:
+    """Return a regex source matching any of ``words``, structured as a trie.
+
+    With ``ignore_case`` ASCII letters are folded so that ``Thanks`` and
+    ``thanks`` share a branch; compile the result with ``re.IGNORECASE``.
+    """
+    root: Dict[str, dict] = {}
+    for word in words:
+        node = root
+        for ch in word:
+            if ignore_case and ch.isascii():
+                ch = ch.lower()
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    return _node_regex(root)
+
+
+def _node_regex(node: Dict[str, dict]) -> str:
+    branches = [re.escape(ch) + _node_regex(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    if len(branches) == 1 and "" not in node:
+        return branches[0]
+    group = "(?:" + "|".join(branches) + ")"
+    return group + "?" if "" in node else group
+
+
+class PatternMatcher:
+    """Match text against any of ``patterns`` with as few regex runs as possible.
+
+    Literal patterns go into one trie-shaped regex and the other patterns
+    are joined into the same alternation. Patterns that cannot be joined
+    (backreferences, global inline flags) are kept as separate regexes.
+    ``search`` is true exactly when ``re.search(p, text, flags)`` is for
+    some ``p``.
+    """
+
+    def __init__(self, patterns: Iterable[str], flags: int = re.IGNORECASE) -> None:
+        self.patterns: List[str] = list(patterns)
+        self._separate: List[Pattern[str]] = []
+        literals = [p for p in self.patterns if is_literal(p)]
+        parts = [trie_regex(literals, bool(flags & re.IGNORECASE))] if literals else []
+        for p in self.patterns:
+            if is_literal(p):
+                continue
+            compiled = re.compile(p, flags)  # invalid patterns fail here, as before
+            if _BACKREF_RE.search(p):
+                self._separate.append(compiled)
+                continue
+            try:
+                re.compile(f"(?:{p})", flags)
+            except re.error:
+                self._separate.append(compiled)
+                continue
+            parts.append(f"(?:{p})")
+        self._combined = re.compile("|".join(parts), flags) if parts else None
+
+    def search(self, text: str) -> bool:
+        """Return whether any pattern matches somewhere in ``text``."""
+        if self._combined is not None and self._combined.search(text):
+            return True
+        return any(p.search(text) for p in self._separate)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+
+class SuffixMatcher:
+    """Test whether text ends with any of ``suffixes`` (case-sensitive).
+
+    Suffixes are grouped by length, so a test costs one slice and set lookup
+    per distinct suffix length no longer than the text, whatever the number
+    of suffixes.
+    """
+
+    def __init__(self, suffixes: Iterable[str]) -> None:
+        self._by_length: Dict[int, Set[str]] = {}
+        for suffix in suffixes:
+            if suffix:
+                self._by_length.setdefault(len(suffix), set()).add(suffix)
+        self._lengths = sorted(self._by_length)
+        self._count = sum(len(s) for s in self._by_length.values())
+
+    def matches(self, text: str) -> bool:
+        """Return whether ``text`` ends with one of the suffixes."""
+        size = len(text)
+        for length in self._lengths:
+            if length > size:
+                break
+            if text[size - length :] in self._by_length[length]:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self._count
+
+
+# main
+if __name__ == "__main__":  # pragma: no cover - manual run
+    matcher = PatternMatcher(["thanks", "thank you", "regards", r"--\s*$", "mit freundlichen grüßen"])
+    for sample in ["Thank you!", "Mit freundlichen Grüßen", "-- ", "hello"]:
+        print(f"{sample!r}: {matcher.search(sample)}")
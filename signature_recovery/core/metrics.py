@@ -2,8 +2,9 @@
 """Runtime metrics collection utilities."""
 
 # Imports
+from bisect import bisect_left
 from dataclasses import dataclass, asdict
-from typing import List
+from typing import Any, Dict, List
 import time
 import threading
 from template import log_message
@@ -11,6 +12,8 @@ from template import log_message
 # Logging
 
 # Globals
+# Upper bounds (ms) of the latency histogram buckets; a last bucket takes the rest
+HISTOGRAM_BOUNDS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
 
 # Classes/Functions
 
@@ -25,12 +28,30 @@ class MessageMetric:
 
 
 class MetricsCollector:
-    """Thread-safe collector for per-message metrics and aggregates."""
+    """Thread-safe collector for per-message metrics and aggregates.
+
+    Besides per-message records it keeps named counters (``incr``) and named
+    timings (``observe``) for pipeline internals such as PST property fetches,
+    sampled gauges (``gauge``) such as queue depths and latency histograms
+    (``histogram``) over :data:`HISTOGRAM_BOUNDS_MS`.
+
+    Counters named ``heuristic.<name>.<calls|hits|errors>`` and the histogram
+    ``heuristic.<name>`` recorded by the extractor are also grouped per
+    heuristic under ``heuristics`` in :meth:`summarize`.
+    """
 
     def __init__(self) -> None:
         # Use reentrant lock to allow dump() to call summarize() safely
         self._lock = threading.RLock()
         self._metrics: List[MessageMetric] = []
+        self._counters: Dict[str, int] = {}
+        # name -> [count, total_ms, max_ms]
+        self._timings: Dict[str, List[float]] = {}
+        # name -> [samples, total, max]
+        self._gauges: Dict[str, List[float]] = {}
+        # name -> [count, total_ms, max_ms, bucket counts...]
+        self._histograms: Dict[str, List[float]] = {}
+        self._files: Dict[str, Dict[str, Any]] = {}
         self.start_time = time.time()
 
     def record(self, metric: MessageMetric) -> None:
@@ -38,6 +59,95 @@ class MetricsCollector:
         with self._lock:
             self._metrics.append(metric)
 
+    def incr(self, name: str, n: int = 1) -> None:
+        """Increase counter ``name`` by ``n``."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(self, name: str, ms: float) -> None:
+        """Record one ``ms`` duration for timing ``name``."""
+        with self._lock:
+            t = self._timings.get(name)
+            if t is None:
+                self._timings[name] = [1, ms, ms]
+            else:
+                t[0] += 1
+                t[1] += ms
+                if ms > t[2]:
+                    t[2] = ms
+
+    def gauge(self, name: str, value: float) -> None:
+        """Record one sample of gauge ``name``."""
+        with self._lock:
+            g = self._gauges.get(name)
+            if g is None:
+                self._gauges[name] = [1, value, value]
+            else:
+                g[0] += 1
+                g[1] += value
+                if value > g[2]:
+                    g[2] = value
+
+    def histogram(self, name: str, ms: float) -> None:
+        """Record one ``ms`` duration in latency histogram ``name``."""
+        with self._lock:
+            h = self._histograms.get(name)
+            if h is None:
+                h = self._histograms[name] = [0, 0.0, 0.0] + [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+            h[0] += 1
+            h[1] += ms
+            if ms > h[2]:
+                h[2] = ms
+            h[3 + bisect_left(HISTOGRAM_BOUNDS_MS, ms)] += 1
+
+    def record_file(self, path: str, summary: Dict[str, Any]) -> None:
+        """Store the per-file ``summary`` of a multi-input run under ``path``."""
+        with self._lock:
+            self._files[path] = dict(summary)
+
+    def export_stats(self, reset: bool = False) -> Dict[str, Any]:
+        """Return raw counters, timings, gauges and histograms for merging into another collector.
+
+        With ``reset`` the exported values are cleared.
+        """
+        with self._lock:
+            stats = {
+                "counters": dict(self._counters),
+                "timings": {k: list(v) for k, v in self._timings.items()},
+                "gauges": {k: list(v) for k, v in self._gauges.items()},
+                "histograms": {k: list(v) for k, v in self._histograms.items()},
+            }
+            if reset:
+                self._counters.clear()
+                self._timings.clear()
+                self._gauges.clear()
+                self._histograms.clear()
+            return stats
+
+    def merge_stats(self, stats: Dict[str, Any]) -> None:
+        """Merge counters, timings, gauges and histograms produced by :meth:`export_stats`."""
+        with self._lock:
+            for name, n in stats.get("counters", {}).items():
+                self._counters[name] = self._counters.get(name, 0) + n
+            for name, (count, total, peak) in stats.get("timings", {}).items():
+                t = self._timings.setdefault(name, [0, 0.0, 0.0])
+                t[0] += count
+                t[1] += total
+                t[2] = max(t[2], peak)
+            for name, (samples, total, peak) in stats.get("gauges", {}).items():
+                g = self._gauges.setdefault(name, [0, 0.0, 0.0])
+                g[0] += samples
+                g[1] += total
+                g[2] = max(g[2], peak)
+            for name, values in stats.get("histograms", {}).items():
+                h = self._histograms.get(name)
+                if h is None:
+                    self._histograms[name] = list(values)
+                    continue
+                h[2] = max(h[2], values[2])
+                for i in (0, 1, *range(3, len(h))):
+                    h[i] += values[i]
+
     def summarize(self) -> dict:
         """Return aggregate statistics for all recorded metrics."""
         with self._lock:
@@ -45,12 +155,47 @@ class MetricsCollector:
             extracted = sum(1 for m in self._metrics if m.extracted)
             avg_time = sum(m.time_ms for m in self._metrics) / total if total else 0
             avg_conf = sum(m.confidence for m in self._metrics) / total if total else 0
+            counters = dict(self._counters)
+            files = {k: dict(v) for k, v in self._files.items()}
+            timings = {
+                name: {
+                    "count": int(count),
+                    "total_ms": total_ms,
+                    "avg_ms": total_ms / count if count else 0,
+                    "max_ms": peak,
+                }
+                for name, (count, total_ms, peak) in sorted(self._timings.items())
+            }
+            gauges = {
+                name: {
+                    "samples": int(samples),
+                    "avg": total / samples if samples else 0,
+                    "max": peak,
+                }
+                for name, (samples, total, peak) in sorted(self._gauges.items())
+            }
+            histograms = {
+                name: _histogram_summary(values) for name, values in sorted(self._histograms.items())
+            }
+        heuristics: Dict[str, Dict[str, Any]] = {}
+        for name, n in sorted(counters.items()):
+            if name.startswith("heuristic."):
+                heuristic, _, field = name[len("heuristic.") :].rpartition(".")
+                heuristics.setdefault(heuristic, {"calls": 0, "hits": 0, "errors": 0})[field] = n
+        for heuristic, entry in heuristics.items():
+            entry["latency"] = histograms.get(f"heuristic.{heuristic}")
         return {
             "total_messages": total,
             "signatures_extracted": extracted,
             "average_time_ms": avg_time,
             "average_confidence": avg_conf,
             "duration_s": time.time() - self.start_time,
+            "counters": counters,
+            "timings": timings,
+            "gauges": gauges,
+            "histograms": histograms,
+            "heuristics": heuristics,
+            "files": files,
         }
 
     def dump(self, path: str) -> None:
@@ -65,6 +210,76 @@ class MetricsCollector:
         with open(path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
 
+def _histogram_summary(values: List[float]) -> Dict[str, Any]:
+    """Return the count, mean, max, buckets and estimated percentiles of a histogram."""
+    count, total_ms, peak = int(values[0]), values[1], values[2]
+    counts = [int(n) for n in values[3:]]
+    labels = [f"le_{bound:g}ms" for bound in HISTOGRAM_BOUNDS_MS] + [f"gt_{HISTOGRAM_BOUNDS_MS[-1]:g}ms"]
+    summary: Dict[str, Any] = {
+        "count": count,
+        "total_ms": total_ms,
+        "avg_ms": total_ms / count if count else 0,
+        "max_ms": peak,
+        "buckets": dict(zip(labels, counts)),
+    }
+    for q in (50, 95, 99):
+        # Upper bound of the bucket holding the q-th percentile, capped at the max
+        rank = q / 100 * count
+        seen = 0
+        estimate = peak
+        for bound, n in zip(HISTOGRAM_BOUNDS_MS, counts):
+            seen += n
+            if n and seen >= rank:
+                estimate = min(bound, peak)
+                break
+        summary[f"p{q}_ms"] = estimate if count else 0
+    return summary
+
+
+class ProgressReporter:
+    """Log progress and an ETA while working through a known message total."""
+
+    def __init__(self, total: int, label: str = "", interval_s: float = 5.0) -> None:
+        self.total = total
+        self.label = label
+        self.interval_s = interval_s
+        self.done = 0
+        self.start_time = time.time()
+        self._last_log = self.start_time
+        self._lock = threading.Lock()
+
+    def update(self, n: int = 1) -> None:
+        """Count ``n`` more messages and log if the interval has elapsed."""
+        with self._lock:
+            self.done += n
+            self._maybe_log()
+
+    def skip(self, n: int) -> None:
+        """Take ``n`` messages the source filtered out off the total."""
+        if n <= 0:
+            return
+        with self._lock:
+            self.total -= n
+            self._maybe_log()
+
+    def _maybe_log(self) -> None:
+        now = time.time()
+        if now - self._last_log >= self.interval_s or self.done == self.total:
+            self._last_log = now
+            log_message("info", self.status(now))
+
+    def status(self, now: float | None = None) -> str:
+        """Return a one-line progress summary."""
+        now = now or time.time()
+        elapsed = now - self.start_time
+        pct = 100.0 * self.done / self.total if self.total else 100.0
+        if self.done and self.total > self.done:
+            eta = time.strftime("%H:%M:%S", time.gmtime(elapsed / self.done * (self.total - self.done)))
+        else:
+            eta = "00:00:00"
+        prefix = f"{self.label}: " if self.label else ""
+        return f"{prefix}{self.done}/{self.total} messages ({pct:.1f}%), ETA {eta}"
+
 # main
 if __name__ == "__main__":  # pragma: no cover - manual run
     collector = MetricsCollector()
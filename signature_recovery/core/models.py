@@ -1,7 +1,8 @@
 """Data models for signature recovery."""
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Dict, Optional
+import hashlib
 import re
 
 
@@ -54,8 +55,34 @@ class Signature:
 
 @dataclass
 class Message:
-    """Represents one email message extracted from a PST."""
+    """Represents one email message extracted from a PST.
+
+    ``folder_path`` and ``msg_index`` record where the message was read from so
+    extraction progress can be checkpointed. ``fingerprint`` is a change stamp
+    read from the item's metadata, used to skip unchanged messages on re-runs.
+    ``sender_name`` and ``sender_email`` identify the author when the source
+    provides them. ``message_class`` (the MAPI class, e.g. ``IPM.Note``),
+    ``subject`` and ``headers`` (a few lower-case header names, see
+    ``prefilter.KEY_HEADERS``) let the pre-filter skip automated mail.
+    """
 
     body: str
     msg_id: str
     timestamp: float
+    folder_path: str = ""
+    msg_index: int = -1
+    fingerprint: str = ""
+    sender_name: str = ""
+    sender_email: str = ""
+    message_class: str = ""
+    subject: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def sender(self) -> str:
+        """Normalized sender key: the address if known, else the name."""
+        return (self.sender_email or self.sender_name).strip().lower()
+
+    def body_hash(self) -> str:
+        """Return a stable digest of ``body``."""
+        return hashlib.sha1(self.body.encode("utf-8", "replace")).hexdigest()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Single-pass message body normalization.
+
+``normalize_body`` strips HTML and collapses whitespace once per message and
+returns the clean lines annotated with what the heuristics need to know about
+the raw markup, so no heuristic has to parse the body again.
+"""
+
+# Imports
+import logging
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Globals
+DIVIDER_RE = re.compile(r'<hr\b|<div\s+class=\"signature\"', re.IGNORECASE)
+_BREAK_TAGS = {"br", "p", "div", "li", "tr"}
+_BLOCK_END_TAGS = {"p", "div", "li", "tr"}
+_SKIP_TAGS = {"style", "script"}
+_AMP_TAIL = re.compile(r"[\s;]")
+_SKIP_TAG_RE = re.compile(r"<(/?)(script|style)\b", re.IGNORECASE)
+
+# Classes/Functions
+
+
+class NormalizedLines(list):
+    """Clean, non-blank body lines plus annotations from the raw body.
+
+    Attributes
+    ----------
+    raw:
+        The body as received.
+    divider_line:
+        Number of clean lines before the first ``<hr>`` or
+        ``<div class="signature">`` marker, or ``None`` without a marker.
+    """
+
+    def __init__(self, lines: List[str], raw: str = "", divider_line: Optional[int] = None) -> None:
+        super().__init__(lines)
+        self.raw = raw
+        self.divider_line = divider_line
+
+    @property
+    def text(self) -> str:
+        """The lines joined with newlines."""
+        return "\n".join(self)
+
+
+class _Stripper(HTMLParser):
+    """Collect the text of an HTML body, noting where each piece came from."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.parts: List[str] = []
+        # (line, column) in the raw body and whether the part is text data
+        self.origins: List[Tuple[Tuple[int, int], bool]] = []
+        self._skip = False
+
+    def _add(self, part: str, data: bool = False) -> None:
+        self.parts.append(part)
+        self.origins.append((self.getpos(), data))
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        t = tag.lower()
+        if t in _BREAK_TAGS:
+            self._add("\n")
+        if t in _SKIP_TAGS:
+            self._skip = True
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        t = tag.lower()
+        if t in _SKIP_TAGS:
+            self._skip = False
+        if t in _BLOCK_END_TAGS:
+            self._add("\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip:
+            self._add(data, True)
+
+
+def is_html(body: str) -> bool:
+    """Return whether ``body`` is treated as HTML by :func:`normalize_body`."""
+    lowered = body.lower()
+    return "<html" in lowered or "<body" in lowered
+
+
+def tail_start(body: str, max_chars: int = 0, max_lines: int = 0, html: bool = False) -> int:
+    """Return where the last ``max_chars`` characters / ``max_lines`` lines begin.
+
+    With both limits the smaller window wins; ``0`` disables a limit and
+    ``0`` is returned when the window covers the whole body. The start is
+    moved forward to a line start, or for HTML past the end of a tag and out
+    of any ``script``/``style`` block, so the window normalizes cleanly.
+    """
+    start = 0
+    if max_chars and len(body) > max_chars:
+        start = len(body) - max_chars
+    if max_lines:
+        pos = len(body)
+        for _ in range(max_lines):
+            pos = body.rfind("\n", 0, pos)
+            if pos < 0:
+                break
+        if pos >= 0:
+            start = max(start, pos + 1)
+    if start == 0:
+        return 0
+    if html:
+        last = None
+        for last in _SKIP_TAG_RE.finditer(body, 0, start):
+            pass
+        if last is not None and not last.group(1):
+            close = re.compile(rf"</{last.group(2)}\b", re.IGNORECASE).search(body, start)
+            start = close.start() if close else len(body)
+        end = body.find(">", start)
+        return end + 1 if end >= 0 else len(body)
+    if body[start - 1] != "\n":
+        end = body.find("\n", start)
+        return end + 1 if end >= 0 else len(body)
+    return start
+
+
+def _clean_lines(text: str) -> List[str]:
+    """Split ``text`` into stripped, non-blank lines."""
+    collapsed = re.sub(r"[ \t]+", " ", text)
+    collapsed = re.sub(r"\r\n?", "\n", collapsed)
+    collapsed = re.sub(r"\n+", "\n", collapsed).strip()
+    return [line.strip() for line in collapsed.splitlines() if line.strip()]
+
+
+def _count_lines(text: str) -> int:
+    """Return ``len(_clean_lines(text))`` without building the lines."""
+    return sum(1 for line in text.splitlines() if line.strip())
+
+
+def _position(body: str, offset: int) -> Tuple[int, int]:
+    """Return the ``HTMLParser.getpos()`` style position of ``offset``."""
+    return body.count("\n", 0, offset) + 1, offset - (body.rfind("\n", 0, offset) + 1)
+
+
+def _html_prefix_text(body: str, stripper: _Stripper, end: int) -> str:
+    """Return the text the stripper would produce for ``body[:end]`` alone.
+
+    Parts are kept if they started before ``end``. Fed only the prefix,
+    ``HTMLParser`` holds back trailing text that might end in an unfinished
+    character reference, so that text is dropped here as well.
+    """
+    end_pos = _position(body, end)
+    count = 0
+    for pos, _ in stripper.origins:
+        if pos >= end_pos:
+            break
+        count += 1
+    if count and stripper.origins[count - 1][1]:
+        (line, col) = stripper.origins[count - 1][0]
+        start = end - (end_pos[1] - col) if line == end_pos[0] else _offset(body, line, col)
+        tail = body[start:end]
+        if "<" not in tail:
+            amp = body.rfind("&", max(start, end - 34), end)
+            if amp >= 0 and not _AMP_TAIL.search(body, amp, end):
+                count -= 1
+    return "".join(stripper.parts[:count])
+
+
+def _offset(body: str, line: int, col: int) -> int:
+    """Inverse of :func:`_position`."""
+    pos = 0
+    for _ in range(line - 1):
+        pos = body.index("\n", pos) + 1
+    return pos + col
+
+
+def normalize_body(body: str, html: Optional[bool] = None) -> NormalizedLines:
+    """Strip HTML and collapse whitespace into annotated clean lines.
+
+    Bodies containing ``<html`` or ``<body`` are run through an HTML stripper
+    that drops ``style``/``script`` content and breaks lines at block tags;
+    other bodies are only whitespace-normalized. ``html`` overrides that
+    check, e.g. for a slice of an HTML body. ``divider_line`` counts the
+    lines that the text before the first divider marker normalizes to.
+    """
+    text = body
+    stripper: Optional[_Stripper] = None
+    try:
+        if is_html(body) if html is None else html:
+            stripper = _Stripper()
+            stripper.feed(body)
+            text = "".join(stripper.parts)
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning(
+            "html parse error: %s",
+            exc,
+            extra={"component": "extractor"},
+        )
+        stripper = None
+        text = body
+
+    divider_line = None
+    match = DIVIDER_RE.search(body)
+    if match:
+        before = body[: match.start()]
+        if stripper is not None and (html or is_html(before)):
+            divider_line = _count_lines(_html_prefix_text(body, stripper, match.start()))
+        else:
+            divider_line = _count_lines(before)
+    return NormalizedLines(_clean_lines(text), body, divider_line)
+
+
+# main
+if __name__ == "__main__":  # pragma: no cover - manual run
+    sample = "<html><body><p>Hi</p><hr><p>John Doe<br>Engineer</p></body></html>"
+    result = normalize_body(sample)
+    print(result.text)
+    print(f"divider after line {result.divider_line}")
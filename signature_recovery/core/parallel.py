@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Message workers shared by threaded and process-pool extraction.
+
+Each worker process builds its own ``SignatureExtractor`` once, in
+``init_worker``. For sharded and multi-file PST extraction workers also open
+their own PST handles, so only work units, file paths and results cross the
+process boundary; ``extract_chunk`` instead receives chunks of messages read
+by the parent.
+"""
+
+# Imports
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .extractor import SignatureExtractor
+from .metrics import MessageMetric, MetricsCollector, ProgressReporter
+from .models import Message, Signature
+from .ruleset import Ruleset
+from .sources import open_source, plan_work_units, skip_filtered
+
+logger = logging.getLogger(__name__)
+
+# Globals
+# Messages handed to ``SignatureExtractor.extract_many`` at a time
+DEFAULT_CHUNK_SIZE = 64
+_extractor: Optional[SignatureExtractor] = None
+_known: Mapping[str, Tuple[str, str]] = {}
+_parsers: Dict[str, Any] = {}
+_metrics: Optional[MetricsCollector] = None
+
+# Classes/Functions
+
+@dataclass
+class UnitResult:
+    """Everything a worker sends back for one work unit."""
+
+    signatures: List[Signature] = field(default_factory=list)
+    metrics: List[MessageMetric] = field(default_factory=list)
+    processed: List[Tuple[str, str, str]] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class FileResult(UnitResult):
+    """Everything a worker sends back for one whole PST file."""
+
+    path: str = ""
+    position: Optional[Tuple[str, int]] = None
+    messages: int = 0
+    elapsed_s: float = 0.0
+
+
+def process_batch(
+    extractor: SignatureExtractor,
+    messages: Sequence[Message],
+    known: Optional[Mapping[str, Tuple[str, str]]] = None,
+) -> List[Tuple[List[Signature], Optional[MessageMetric], Optional[Tuple[str, str, str]]]]:
+    """Extract the signatures of ``messages`` with one ``extract_many`` call.
+
+    Returns, per message and in order, the signatures found (the message's
+    own first, then those of quoted history if ``extractor.mine_quoted``), a
+    ``MessageMetric`` and the ``(msg_id, fingerprint, body hash)`` entry to
+    record as processed. Messages the extractor's pre-filter rejects, and
+    those whose body is unchanged since an earlier run (per ``known``), are
+    skipped with a ``None`` metric. Messages whose body cannot be read or
+    whose extraction raises get a failed metric and a ``None`` entry, so a
+    later ``--incremental`` run retries them. Per-message times are the
+    batch average.
+    """
+    results: List[Any] = [None] * len(messages)
+    todo: List[Tuple[int, Message, Tuple[str, str, str]]] = []
+    for i, msg in enumerate(messages):
+        try:
+            # Lazily loaded PST bodies are read here and may fail on corrupt items
+            if extractor.skip_reason(msg) is not None:
+                results[i] = ([], None, (msg.msg_id, msg.fingerprint, ""))
+                continue
+            body_hash = msg.body_hash()
+        except Exception:
+            logger.exception(
+                "worker error",
+                extra={"component": "parallel", "msg_id": msg.msg_id},
+            )
+            results[i] = ([], MessageMetric(msg.msg_id, False, 0.0, 0.0), None)
+            continue
+        processed = (msg.msg_id, msg.fingerprint, body_hash)
+        if known and known.get(msg.msg_id, ("", ""))[1] == body_hash:
+            results[i] = ([], None, processed)
+        else:
+            todo.append((i, msg, processed))
+    if todo:
+        start_ts = time.time()
+        failed: List[int] = []
+        sigs = extractor.extract_many([msg for _, msg, _ in todo], failed)
+        avg_ms = (time.time() - start_ts) * 1000 / len(todo)
+        for k in failed:
+            i, msg, _ = todo[k]
+            todo[k] = (i, msg, None)
+        for (i, msg, processed), sig in zip(todo, sigs):
+            metric = MessageMetric(
+                msg.msg_id,
+                sig is not None,
+                sig.confidence if sig else 0.0,
+                avg_ms,
+            )
+            found = [sig] if sig is not None else []
+            if extractor.mine_quoted:
+                found.extend(extractor.extract_quoted(msg.body, msg.msg_id, msg.timestamp))
+            results[i] = (found, metric, processed)
+    return results
+
+
+def process_message(
+    extractor: SignatureExtractor,
+    msg: Message,
+    known: Optional[Mapping[str, Tuple[str, str]]] = None,
+) -> Tuple[List[Signature], Optional[MessageMetric], Optional[Tuple[str, str, str]]]:
+    """Extract the signature of ``msg``; see :func:`process_batch`."""
+    return process_batch(extractor, [msg], known)[0]
+
+
+def _collect(result: UnitResult, batch) -> None:
+    """Add the :func:`process_batch` results ``batch`` to ``result``."""
+    for sigs, metric, entry in batch:
+        if entry is not None:
+            result.processed.append(entry)
+        if metric is not None:
+            result.metrics.append(metric)
+        result.signatures.extend(sigs)
+
+
+def _chunks(messages: Iterable[Message], size: int) -> Iterator[List[Message]]:
+    chunk: List[Message] = []
+    for msg in messages:
+        chunk.append(msg)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def init_worker(
+    config: Dict[str, Any] | None = None,
+    known: Optional[Mapping[str, Tuple[str, str]]] = None,
+    ruleset: Optional[Ruleset] = None,
+) -> None:
+    """Build the per-process extractor. Used as the pool ``initializer``.
+
+    A pickled ``ruleset`` is compiled once here and shared by the process.
+    """
+    global _extractor, _known, _metrics
+    _metrics = MetricsCollector()
+    _extractor = SignatureExtractor(config, metrics=_metrics, ruleset=ruleset)
+    _known = known or {}
+    _parsers.clear()
+
+
+def _get_parser(pst_path: str):
+    """Return this process's message source for ``pst_path``, opening it once."""
+    parser = _parsers.get(pst_path)
+    if parser is None:
+        parser = open_source(pst_path, metrics=_metrics)
+        _parsers[pst_path] = parser
+    return parser
+
+
+def extract_chunk(
+    messages: List[Message],
+) -> Tuple[List[Tuple[List[Signature], Optional[MessageMetric], Optional[Tuple[str, str, str]]]], Dict[str, Any]]:
+    """Run :func:`process_message` over ``messages`` with this process's extractor.
+
+    Returns the per-message results and the counters/timings recorded meanwhile.
+    """
+    if _extractor is None:
+        init_worker()
+    results = process_batch(_extractor, messages, _known)
+    return results, _metrics.export_stats(reset=True)
+
+
+def extract_unit(
+    pst_path: str,
+    unit,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> UnitResult:
+    """Extract signatures from the messages of ``unit`` within ``start``/``end``.
+
+    The result holds the signatures found, one ``MessageMetric`` per extracted
+    message, the processed-message entries and the PST fetch timings recorded
+    while reading the unit.
+    """
+    if _extractor is None:
+        init_worker()
+    parser = _get_parser(pst_path)
+    result = UnitResult()
+    messages = parser.iter_unit(unit, known=_known, lazy=True, start=start, end=end)
+    for chunk in _chunks(messages, chunk_size):
+        _collect(result, process_batch(_extractor, chunk, _known))
+    result.stats = _metrics.export_stats(reset=True)
+    return result
+
+
+def extract_file(
+    pst_path: str,
+    folders: Optional[List[str]] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    resume_after: Optional[Tuple[str, int]] = None,
+    known: Optional[Mapping[str, Tuple[str, str]]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    results: Any = None,
+) -> FileResult:
+    """Extract signatures from a whole PST (or other message source) in this worker process.
+
+    ``known`` holds the file's previously processed messages, by default
+    those given to :func:`init_worker`. The result's ``position`` is the last
+    message read, for checkpointing.
+
+    With ``results``, a queue shared with the parent, the signatures,
+    metrics and processed entries of each chunk are put on it as
+    ``(pst_path, UnitResult, position)`` instead of being kept in the
+    returned result, so the parent can commit them while the file is still
+    being read. A bounded queue makes the worker wait for the parent. The
+    last item put, even when extraction fails, is ``(pst_path, None,
+    position)``: the end of the file's results.
+    """
+    if _extractor is None:
+        init_worker()
+    if known is None:
+        known = _known
+    started = time.time()
+    result = FileResult(path=pst_path)
+    parser = None
+    try:
+        parser = open_source(pst_path, metrics=_metrics)
+        parser.load_manifest()
+        units = plan_work_units(
+            parser.list_folders(), resume_after=resume_after, include=folders, start=start, end=end
+        )
+        progress = ProgressReporter(sum(u.stop - u.start for u in units), os.path.basename(pst_path))
+        messages = parser.iter_messages(
+            folders=folders,
+            start=start,
+            end=end,
+            resume_after=resume_after,
+            known=known,
+            lazy=True,
+        )
+        for chunk in _chunks(skip_filtered(messages, units, progress), chunk_size):
+            part = UnitResult() if results is not None else result
+            _collect(part, process_batch(_extractor, chunk, known))
+            result.position = (chunk[-1].folder_path, chunk[-1].msg_index)
+            result.messages += len(chunk)
+            if results is not None:
+                results.put((pst_path, part, result.position))
+            progress.update(len(chunk))
+    finally:
+        if parser is not None:
+            parser.close()
+        if results is not None:
+            results.put((pst_path, None, result.position))
+    result.stats = _metrics.export_stats(reset=True)
+    result.elapsed_s = time.time() - started
+    return result
@@ -3,10 +3,11 @@
 
 # Imports
 import re
-from typing import Dict, Any
+from typing import Any, Dict, NamedTuple, Optional
 
 from .models import SignatureMetadata
 from .config import load_config
+from .ruleset import COMPANY_SUFFIXES, TITLE_KEYWORDS, Ruleset  # noqa: F401 - re-exported
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,105 +18,121 @@ logger = logging.getLogger(__name__)
 NAME_RE = re.compile(r"^[A-Z][a-z]+(?: [A-Z][a-z]+)*$")
 EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
 URL_RE = re.compile(r"https?://\S+|www\.\S+")
-TITLE_KEYWORDS = ["Manager", "Engineer", "Director", "Officer", "Consultant"]
+ADDRESS_RE = re.compile(r"\d+\s+\w+")
+STREET_WORDS = ["St", "Ave", "Rd", "Road", "Blvd"]
+_DIGIT_RE = re.compile(r"\d")
+_STREET_RE = re.compile("|".join(re.escape(w) for w in STREET_WORDS))
+_FIELDS = ("email", "phone", "url", "name", "title", "company", "address")
+
 
 # Classes/Functions
+class LineClass(NamedTuple):
+    """What one signature line holds, as classified by :meth:`SignatureParser.classify`."""
+
+    email: Optional[str]
+    phone: Optional[str]
+    url: Optional[str]
+    name: Optional[str]
+    title: bool
+    company: bool
+    address: bool
+
+
 class SignatureParser:
-    """Parse a signature block into structured metadata."""
+    """Parse a signature block into structured metadata.
+
+    Phone patterns, title keywords and company suffixes come from
+    ``ruleset``, by default the shared :class:`Ruleset` of ``config``, so
+    creating a parser compiles nothing.
+    """
 
-    def __init__(self, config: Dict[str, Any] | None = None) -> None:
+    def __init__(
+        self, config: Dict[str, Any] | None = None, ruleset: Optional[Ruleset] = None
+    ) -> None:
         self.config = config or load_config()
+        self.ruleset = ruleset or Ruleset.from_config(self.config)
         self.last_score: float = 0.0
-        phone_patterns = self.config.get("parser", {}).get("phone_patterns", [])
-        if phone_patterns:
-            self.phone_res = [re.compile(p) for p in phone_patterns]
-        else:
-            self.phone_res = [re.compile(r"(\+?[\d(][\d\s\-\.\(\)]{7,}\d)")]
+        self.phone_res = self.ruleset.phone_res
+        self._title_re = self.ruleset.title_re
+        self._company_suffix = self.ruleset.company_suffix.matches
+
+    def classify(self, line: str) -> LineClass:
+        """Tokenize and classify ``line`` once for every metadata field.
+
+        ``email``, ``phone`` and ``url`` hold the first match (phone patterns
+        are tried in configured order, on lines with a digit), ``name`` the line if it can only be a
+        name, and ``title``, ``company`` and ``address`` whether the line
+        qualifies for that field.
+        """
+        # Literal pre-checks skip regex scans that cannot match
+        email = EMAIL_RE.search(line) if "@" in line else None
+        phone = None
+        has_digit = _DIGIT_RE.search(line) is not None
+        if has_digit:
+            for rx in self.phone_res:
+                phone = rx.search(line)
+                if phone:
+                    break
+        lower = line.lower()
+        url = URL_RE.search(line) if "www." in line or "http" in line else None
+        title = self._title_re.search(lower) is not None
+        company_like = self._company_suffix(line) or line.isupper()
+        company = company_like or "consulting" in lower
+        name = None
+        if not (email or phone or url or title or company_like or "consult" in lower):
+            m = NAME_RE.match(line)
+            name = m.group(0) if m else None
+        address = (
+            has_digit
+            and ADDRESS_RE.search(line) is not None
+            and ("," in line or _STREET_RE.search(line) is not None)
+        )
+        return LineClass(
+            email.group(0) if email else None,
+            phone.group(0) if phone else None,
+            url.group(0) if url else None,
+            name,
+            title,
+            company,
+            address,
+        )
 
     def parse(self, text: str) -> SignatureMetadata:
         """Return ``SignatureMetadata`` parsed from ``text``.
 
-        The parser runs several regexes in order of confidence: email, phone,
-        URL, name, title, company, and address. Fields not detected are left as
-        ``None``.
+        Each line (``|``-separated pieces count as lines) is classified once
+        by :meth:`classify`; every field takes the first line that qualifies
+        for it: email, phone, URL, name, title, company and address. Fields
+        not detected are left as ``None``.
         """
 
-        logger.debug("Parsing signature text")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Parsing signature text")
         self.last_score = 0.0
 
-        parts = []
+        meta = SignatureMetadata()
         for line in text.splitlines():
             for piece in line.split("|"):
                 piece = piece.strip()
-                if piece:
-                    parts.append(piece)
-
-        lines = parts
-        meta = SignatureMetadata()
-        fields_found = 0
-
-        # email
-        for line in lines:
-            m = EMAIL_RE.search(line)
-            if m:
-                meta.email = m.group(0)
-                fields_found += 1
-                break
-
-        # phone
-        for line in lines:
-            for rx in self.phone_res:
-                m = rx.search(line)
-                if m:
-                    meta.phone = m.group(0)
-                    fields_found += 1
-                    break
-            if meta.phone:
-                break
-
-        # url
-        for line in lines:
-            m = URL_RE.search(line)
-            if m:
-                meta.url = m.group(0)
-                fields_found += 1
-                break
-
-        # name
-        for line in lines:
-            if EMAIL_RE.search(line) or any(rx.search(line) for rx in self.phone_res) or URL_RE.search(line):
-                continue
-            if any(k.lower() in line.lower() for k in TITLE_KEYWORDS):
-                continue
-            if line.endswith(("Inc", "Inc.", "LLC", "Ltd", "Corp", "Co", "Company")) or line.isupper() or "consult" in line.lower():
-                continue
-            m = NAME_RE.match(line)
-            if m:
-                meta.name = m.group(0)
-                fields_found += 1
-                break
-
-        # title
-        for line in lines:
-            if any(k.lower() in line.lower() for k in TITLE_KEYWORDS):
-                meta.title = line
-                fields_found += 1
-                break
-
-        # company
-        for line in lines:
-            if line.endswith(("Inc", "Inc.", "LLC", "Ltd", "Corp", "Co", "Company")) or line.isupper() or "consulting" in line.lower():
-                meta.company = line.strip(",")
-                fields_found += 1
-                break
-
-        # address
-        for line in lines:
-            if re.search(r"\d+\s+\w+", line) and ("," in line or any(w in line for w in ["St", "Ave", "Rd", "Road", "Blvd"])):
-                meta.address = line
-                fields_found += 1
-                break
-
+                if not piece:
+                    continue
+                cls = self.classify(piece)
+                if meta.email is None:
+                    meta.email = cls.email
+                if meta.phone is None:
+                    meta.phone = cls.phone
+                if meta.url is None:
+                    meta.url = cls.url
+                if meta.name is None:
+                    meta.name = cls.name
+                if meta.title is None and cls.title:
+                    meta.title = piece
+                if meta.company is None and cls.company:
+                    meta.company = piece.strip(",")
+                if meta.address is None and cls.address:
+                    meta.address = piece
+
+        fields_found = sum(getattr(meta, f) is not None for f in _FIELDS)
         self.last_score = 0.1 * fields_found
         return meta
 
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""Bounded streaming pipeline for extracting signatures from a message stream.
+
+Messages flow through four stages connected by bounded queues::
+
+    read -> extract (N threads) -> dedupe/batch -> write
+
+The read stage groups messages into chunks, each extracted with one
+``SignatureExtractor.extract_many`` call. With a process pool the extract
+threads only ship chunks to the pool and wait for the results, so the
+GIL-bound heuristics run on every core. A full queue blocks the stage feeding
+it, so at most about ``queue_size`` messages are in flight whatever the size
+of the mailbox. Queue depths and the time each stage spends blocked on its
+queues are recorded in the ``MetricsCollector``.
+"""
+
+# Imports
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .deduplicator import dedupe_signatures
+from .extractor import SignatureExtractor
+from .metrics import MessageMetric, MetricsCollector, ProgressReporter
+from .models import Message, Signature
+from .parallel import extract_chunk, process_batch
+
+logger = logging.getLogger(__name__)
+
+# Globals
+DEFAULT_QUEUE_SIZE = 256
+_DONE = object()
+Sink = Callable[[List[Signature], List[Tuple[str, str, str]], Optional[Tuple[str, int]]], None]
+
+# Classes/Functions
+
+
+class _Stopped(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class _MeteredQueue(queue.Queue):
+    """``queue.Queue`` that records its depth and blocking time.
+
+    ``put`` waits are backpressure on the producing stage; ``get`` waits are
+    time the consuming stage sat idle.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        metrics: Optional[MetricsCollector],
+        stop: threading.Event,
+    ) -> None:
+        super().__init__(maxsize)
+        self.name = name
+        self.metrics = metrics
+        self.stop = stop
+
+    def put_item(self, item: Any) -> None:
+        start = time.perf_counter()
+        while True:
+            if self.stop.is_set():
+                raise _Stopped()
+            try:
+                self.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        if self.metrics is not None:
+            self.metrics.observe(f"pipeline.{self.name}.put_wait", (time.perf_counter() - start) * 1000)
+            self.metrics.gauge(f"pipeline.{self.name}.depth", self.qsize())
+
+    def get_item(self) -> Any:
+        start = time.perf_counter()
+        while True:
+            if self.stop.is_set():
+                raise _Stopped()
+            try:
+                item = self.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        if self.metrics is not None:
+            self.metrics.observe(f"pipeline.{self.name}.get_wait", (time.perf_counter() - start) * 1000)
+        return item
+
+
+class ExtractionPipeline:
+    """Stream messages through bounded read, extract, dedupe and write stages.
+
+    Parameters
+    ----------
+    extractor:
+        Shared ``SignatureExtractor`` used by the extract threads. Unused when
+        ``pool`` is given.
+    sink:
+        Called from the calling thread with ``(signatures, processed, position)``
+        for each deduplicated batch. ``position`` is the ``(folder_path,
+        msg_index)`` of the last message such that it and every message before
+        it have been extracted, i.e. a safe resume checkpoint.
+    pool:
+        Optional process pool whose workers were set up with
+        ``parallel.init_worker``. Each extract thread then keeps one chunk in
+        flight on the pool.
+    chunk_size:
+        Messages per ``extract_many`` batch.
+    dedupe:
+        Applied to each batch before ``sink``, by default
+        ``dedupe_signatures``; ``None`` passes batches on unchanged, e.g. when
+        the sink deduplicates against the whole index.
+    """
+
+    def __init__(
+        self,
+        extractor: Optional[SignatureExtractor],
+        sink: Sink,
+        *,
+        known: Optional[Mapping[str, Tuple[str, str]]] = None,
+        workers: int = 4,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = 1000,
+        min_confidence: float = 0.0,
+        metrics: Optional[MetricsCollector] = None,
+        progress: Optional[ProgressReporter] = None,
+        pool: Optional[Executor] = None,
+        chunk_size: int = 1,
+        dedupe: Optional[Callable[[List[Signature]], List[Signature]]] = dedupe_signatures,
+    ) -> None:
+        self.extractor = extractor
+        self.sink = sink
+        self.known = known or {}
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.batch_size = batch_size
+        self.min_confidence = min_confidence
+        self.metrics = metrics
+        self.progress = progress
+        self.pool = pool
+        self.chunk_size = max(1, chunk_size)
+        self.dedupe = dedupe or list
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def run(self, messages: Iterable[Message]) -> int:
+        """Process ``messages`` and return how many were read.
+
+        The first exception raised by any stage stops the pipeline and is
+        re-raised here.
+        """
+        self._stop.clear()
+        self._errors.clear()
+        chunks = max(1, self.queue_size // self.chunk_size)
+        read_q = _MeteredQueue("read", chunks, self.metrics, self._stop)
+        result_q = _MeteredQueue("extract", self.queue_size, self.metrics, self._stop)
+        # Only a couple of batches may wait for the writer
+        write_q = _MeteredQueue("dedupe", 2, self.metrics, self._stop)
+        counter = [0]
+        threads = [threading.Thread(target=self._guard, args=(self._read, messages, read_q, counter))]
+        threads += [
+            threading.Thread(target=self._guard, args=(self._extract, read_q, result_q))
+            for _ in range(self.workers)
+        ]
+        threads.append(threading.Thread(target=self._guard, args=(self._batch, result_q, write_q)))
+        for t in threads:
+            t.daemon = True
+            t.start()
+        try:
+            self._write(write_q)
+        except _Stopped:
+            pass
+        except BaseException as exc:
+            self._fail(exc)
+        for t in threads:
+            t.join()
+        if self._errors:
+            raise self._errors[0]
+        return counter[0]
+
+    def _guard(self, stage: Callable[..., None], *args: Any) -> None:
+        try:
+            stage(*args)
+        except _Stopped:
+            pass
+        except BaseException as exc:
+            self._fail(exc)
+
+    def _fail(self, exc: BaseException) -> None:
+        logger.error(
+            "pipeline stage failed: %s",
+            exc,
+            extra={"component": "pipeline"},
+        )
+        self._errors.append(exc)
+        self._stop.set()
+
+    def _read(self, messages: Iterable[Message], out: _MeteredQueue, counter: List[int]) -> None:
+        seq = 0
+        chunk: List[Tuple[int, Message]] = []
+        for msg in messages:
+            chunk.append((seq, msg))
+            seq += 1
+            if len(chunk) >= self.chunk_size:
+                out.put_item(chunk)
+                chunk = []
+        if chunk:
+            out.put_item(chunk)
+        counter[0] = seq
+        for _ in range(self.workers):
+            out.put_item(_DONE)
+
+    def _extract(self, inq: _MeteredQueue, out: _MeteredQueue) -> None:
+        while True:
+            item = inq.get_item()
+            if item is _DONE:
+                out.put_item(_DONE)
+                return
+            for (seq, msg), (sigs, metric, entry) in zip(item, self._extract_chunk(item)):
+                if metric is not None and self.metrics is not None:
+                    self.metrics.record(metric)
+                out.put_item((seq, sigs, entry, (msg.folder_path, msg.msg_index)))
+
+    def _extract_chunk(self, chunk: List[Tuple[int, Message]]) -> List[Tuple[Any, Any, Any]]:
+        if self.pool is None:
+            return process_batch(self.extractor, [msg for _, msg in chunk], self.known)
+        results: Dict[int, Tuple[Any, Any, Any]] = {}
+        ship: List[Message] = []
+        for i, (_, msg) in enumerate(chunk):
+            try:
+                # Lazy PST bodies are read here so they can be pickled
+                ship.append(
+                    Message(
+                        msg.body,
+                        msg.msg_id,
+                        msg.timestamp,
+                        msg.folder_path,
+                        msg.msg_index,
+                        msg.fingerprint,
+                        msg.sender_name,
+                        msg.sender_email,
+                        msg.message_class,
+                        msg.subject,
+                        msg.headers,
+                    )
+                )
+            except Exception:
+                # The same failed result, and log record, as process_batch gives
+                logger.exception(
+                    "worker error",
+                    extra={"component": "parallel", "msg_id": msg.msg_id},
+                )
+                results[i] = ([], MessageMetric(msg.msg_id, False, 0.0, 0.0), None)
+        shipped_results: List[Tuple[Any, Any, Any]] = []
+        if ship:
+            shipped_results, stats = self.pool.submit(extract_chunk, ship).result()
+            if self.metrics is not None:
+                self.metrics.merge_stats(stats)
+        shipped = iter(shipped_results)
+        return [results[i] if i in results else next(shipped) for i in range(len(chunk))]
+
+    def _batch(self, inq: _MeteredQueue, out: _MeteredQueue) -> None:
+        batch: List[Signature] = []
+        processed: List[Tuple[str, str, str]] = []
+        # Results arrive out of order; ``position`` only advances over the
+        # contiguous prefix of finished messages so it is safe to resume from.
+        pending: Dict[int, Tuple[str, int]] = {}
+        next_seq = 0
+        position: Optional[Tuple[str, int]] = None
+        flushed: Optional[Tuple[str, int]] = None
+        finished = 0
+        while finished < self.workers:
+            item = inq.get_item()
+            if item is _DONE:
+                finished += 1
+                continue
+            seq, sigs, entry, pos = item
+            if self.progress is not None:
+                self.progress.update()
+            batch.extend(s for s in sigs if s.confidence >= self.min_confidence)
+            if entry is not None:
+                processed.append(entry)
+            pending[seq] = pos
+            while next_seq in pending:
+                position = pending.pop(next_seq)
+                next_seq += 1
+            if len(batch) >= self.batch_size or len(processed) >= self.batch_size:
+                out.put_item((self.dedupe(batch), processed, position))
+                batch, processed, flushed = [], [], position
+        if batch or processed or position != flushed:
+            out.put_item((self.dedupe(batch), processed, position))
+        out.put_item(_DONE)
+
+    def _write(self, inq: _MeteredQueue) -> None:
+        while True:
+            item = inq.get_item()
+            if item is _DONE:
+                return
+            self.sink(*item)
+
+
+# main
+if __name__ == "__main__":  # pragma: no cover - manual run
+    def _print(sigs, processed, position):
+        print(f"{len(sigs)} signatures from {len(processed)} messages, checkpoint {position}")
+
+    demo = [
+        Message(body=f"Hi\n--\nUser {i}\nuser{i}@example.com", msg_id=str(i), timestamp=str(i))
+        for i in range(10)
+    ]
+    ExtractionPipeline(SignatureExtractor(), _print, batch_size=4).run(demo)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Cheap checks that drop messages which cannot carry a personal signature.
+
+Calendar items, delivery reports, read receipts, auto-replies and system
+notifications are recognised from their message class, subject and a few
+headers, and bodies too short to hold a signature from their length, so
+they never reach normalization or the heuristics.
+"""
+
+# Imports
+import re
+from email.message import Message as EmailMessage
+from email.parser import HeaderParser
+from typing import Any, Dict, Mapping, Optional
+
+# Globals
+# Headers kept on messages for the pre-filter, by lower-case name
+KEY_HEADERS = (
+    "auto-submitted",
+    "precedence",
+    "x-autoreply",
+    "x-autorespond",
+    "x-failed-recipients",
+    "content-type",
+)
+DEFAULT_SKIP_CLASSES = [
+    "IPM.Schedule.Meeting",
+    "IPM.Appointment",
+    "IPM.Task",
+    "IPM.Note.Rules.OofTemplate",
+    "IPM.Outlook.Recall",
+    "IPM.Recall",
+    "REPORT.",
+]
+DEFAULT_SKIP_SUBJECTS = [
+    r"^(?:automatic reply|auto(?:matic)?[- ]?reply|out of (?:the )?office)\b",
+    r"^(?:undeliverable|undelivered mail|delivery status notification|"
+    r"mail delivery (?:failed|failure|system)|returned mail)\b",
+    r"^(?:read|not read|accepted|declined|tentative|canceled|cancelled):",
+]
+DEFAULT_MIN_BODY_CHARS = 16
+_AUTO_PRECEDENCE = {"bulk", "junk", "auto_reply"}
+
+# Classes/Functions
+
+
+def key_headers(headers: Any) -> Dict[str, str]:
+    """Return the :data:`KEY_HEADERS` of ``headers`` with lower-case names.
+
+    ``headers`` is a parsed email message or raw header text (e.g. PST
+    transport headers).
+    """
+    if not headers:
+        return {}
+    if not isinstance(headers, EmailMessage):
+        headers = HeaderParser().parsestr(str(headers), headersonly=True)
+    found = {}
+    for name in KEY_HEADERS:
+        value = headers.get(name)
+        if value is not None:
+            found[name] = str(value).strip()
+    return found
+
+
+def message_class_for(headers: Mapping[str, str]) -> str:
+    """Return the MAPI message class an RFC 822 message would have in a PST."""
+    content_type = headers.get("content-type", "").lower()
+    if "report-type=delivery-status" in content_type:
+        return "REPORT.IPM.Note.NDR"
+    if "report-type=disposition-notification" in content_type:
+        return "REPORT.IPM.Note.IPNRN"
+    if content_type.startswith("text/calendar") or "method=request" in content_type:
+        return "IPM.Schedule.Meeting.Request"
+    return "IPM.Note"
+
+
+class PreFilter:
+    """Decide, from cheap message properties, whether to skip extraction.
+
+    Configured from the ``extraction`` config section: ``prefilter`` turns
+    it on or off, ``prefilter_classes`` lists message class prefixes,
+    ``prefilter_subjects`` subject regexes and ``prefilter_min_body_chars``
+    the shortest body worth extracting. The body is only read for the
+    length check, after every property check has passed.
+    """
+
+    def __init__(self, extraction: Mapping[str, Any]) -> None:
+        self.enabled = bool(extraction.get("prefilter", True))
+        self.classes = tuple(
+            c.lower() for c in extraction.get("prefilter_classes", DEFAULT_SKIP_CLASSES)
+        )
+        subjects = self.subjects = tuple(
+            extraction.get("prefilter_subjects", DEFAULT_SKIP_SUBJECTS)
+        )
+        self.subject_re = (
+            re.compile("|".join(f"(?:{s})" for s in subjects), re.IGNORECASE) if subjects else None
+        )
+        self.min_body_chars = int(
+            extraction.get("prefilter_min_body_chars", DEFAULT_MIN_BODY_CHARS)
+        )
+
+    def settings(self) -> Optional[Dict[str, Any]]:
+        """Return the rules in effect, or ``None`` when the filter is off."""
+        if not self.enabled:
+            return None
+        return {
+            "classes": list(self.classes),
+            "subjects": list(self.subjects),
+            "min_body_chars": self.min_body_chars,
+        }
+
+    def reason(self, msg: Any) -> Optional[str]:
+        """Return why ``msg`` should be skipped, or ``None`` to extract it.
+
+        Reasons are ``message_class``, ``auto_header``, ``subject`` and
+        ``short_body``.
+        """
+        if not self.enabled:
+            return None
+        message_class = (getattr(msg, "message_class", "") or "").lower()
+        if message_class and message_class.startswith(self.classes):
+            return "message_class"
+        headers = getattr(msg, "headers", None) or {}
+        if _auto_generated(headers):
+            return "auto_header"
+        subject = getattr(msg, "subject", "") or ""
+        if subject and self.subject_re is not None and self.subject_re.search(subject.strip()):
+            return "subject"
+        if self.min_body_chars and len(msg.body.strip()) < self.min_body_chars:
+            return "short_body"
+        return None
+
+
+def _auto_generated(headers: Mapping[str, str]) -> bool:
+    auto = headers.get("auto-submitted", "").lower()
+    if auto and auto != "no":
+        return True
+    if headers.get("precedence", "").lower() in _AUTO_PRECEDENCE:
+        return True
+    return any(name in headers for name in ("x-autoreply", "x-autorespond", "x-failed-recipients"))
+
+
+# main
+if __name__ == "__main__":  # pragma: no cover - manual run
+    from .models import Message
+
+    pf = PreFilter({})
+    print(pf.reason(Message("Hi", "1", 0.0, subject="Automatic reply: away")))
@@ -7,23 +7,154 @@ Message objects with body, msg_id, and timestamp.
 """
 
 import os
+import re
+import json
 import logging
+import threading
 import time
-from typing import Iterator, List, Optional
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
 
 import pypff  # raises ImportError if dependency missing
 
 from signature_recovery.core.models import Message
 from .logging import retry
+from .metrics import MetricsCollector
+from .prefilter import key_headers
+from .sources import (  # noqa: F401 - re-exported for existing callers
+    DEFAULT_UNIT_SIZE,
+    FolderInfo,
+    MessageSource,
+    WorkUnit,
+    plan_work_units,
+)
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_VERSION = 1
+_FROM_ADDRESS = re.compile(r"^From:[^\n]*?<?([^\s<>\"]+@[^\s<>\"]+)>?", re.IGNORECASE | re.MULTILINE)
 
-class PSTParser:
-    """Abstraction over a PST file. Yields Message instances."""
 
-    def __init__(self, pst_path: str) -> None:
+class PSTMessage(Message):
+    """``Message`` whose body is read from its PST item on first access.
+
+    The change-stamp ``fingerprint``, sender name and address, message class,
+    subject and key headers are read lazily too; the transport headers are fetched
+    at most once. Pickling
+    produces a plain ``Message`` with everything loaded, so instances can be
+    shipped to worker processes.
+    """
+
+    def __init__(
+        self,
+        parser: "PSTParser",
+        item: Any,
+        msg_id: str,
+        timestamp: float,
+        folder_path: str = "",
+        msg_index: int = -1,
+        submit_time: Optional[float] = None,
+    ) -> None:
+        self._parser = parser
+        self._item = item
+        self._submit_time = submit_time
+        self._fingerprint: Optional[str] = None
+        self._sender_name: Optional[str] = None
+        self._body: Optional[str] = None
+        self._transport: Optional[str] = None
+        self._message_class: Optional[str] = None
+        self._subject: Optional[str] = None
+        self._headers: Optional[Dict[str, str]] = None
+        self.msg_id = msg_id
+        self.timestamp = timestamp
+        self.folder_path = folder_path
+        self.msg_index = msg_index
+
+    @property
+    def body(self) -> str:
+        if self._body is None:
+            self._body = self._parser._read_body(self._item)
+        return self._body
+
+    @property
+    def fingerprint(self) -> str:
+        """Submit and modification times, the latter read on first access."""
+        if self._fingerprint is None:
+            modified = _to_epoch(self._parser._fetch(self._item, "modification_time"))
+            self._fingerprint = f"{self._submit_time}:{modified}"
+        return self._fingerprint
+
+    @property
+    def sender_name(self) -> str:
+        """Sender display name, read on first access (only sender templates use it)."""
+        if self._sender_name is None:
+            self._sender_name = _to_text(self._parser._fetch(self._item, "sender_name"))
+        return self._sender_name
+
+    @property
+    def _transport_headers(self) -> str:
+        if self._transport is None:
+            self._transport = _to_text(self._parser._fetch(self._item, "transport_headers"))
+        return self._transport
+
+    @property
+    def sender_email(self) -> str:
+        """Sender address from the transport headers, read on first access."""
+        match = _FROM_ADDRESS.search(self._transport_headers)
+        return match.group(1) if match else ""
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Pre-filter headers from the transport headers, read on first access."""
+        if self._headers is None:
+            self._headers = key_headers(self._transport_headers)
+        return self._headers
+
+    @property
+    def message_class(self) -> str:
+        if self._message_class is None:
+            self._message_class = _to_text(self._parser._fetch(self._item, "message_class"))
+        return self._message_class
+
+    @property
+    def subject(self) -> str:
+        if self._subject is None:
+            self._subject = _to_text(self._parser._fetch(self._item, "subject"))
+        return self._subject
+
+    def __reduce__(self):
+        return (
+            Message,
+            (
+                self.body,
+                self.msg_id,
+                self.timestamp,
+                self.folder_path,
+                self.msg_index,
+                self.fingerprint,
+                self.sender_name,
+                self.sender_email,
+                self.message_class,
+                self.subject,
+                self.headers,
+            ),
+        )
+
+
+class PSTParser(MessageSource):
+    """Abstraction over a PST file. Yields Message instances.
+
+    When ``metrics`` is given, the time spent fetching each pypff property is
+    recorded under ``pst_fetch.<property>``.
+    """
+
+    def __init__(self, pst_path: str, metrics: Optional[MetricsCollector] = None) -> None:
         """Initialize with path to the PST file."""
+        self._metrics = metrics
+        # pypff handles are not safe for concurrent use; lazy bodies may be
+        # loaded from worker threads while the iterator is still running.
+        self._lock = threading.Lock()
         if not os.path.isfile(pst_path):
             logger.error("PST file not found: %s", pst_path)
             raise FileNotFoundError(f"PST file not found: {pst_path}")
@@ -33,8 +164,17 @@ class PSTParser:
         else:
             self._pst = pypff.file()
             self._open(pst_path)
+        self._path = pst_path
+        self.manifest: Optional[List[FolderInfo]] = None
         logger.info("Opened PST file: %s", pst_path)
 
+    def close(self) -> None:
+        """Close the pypff file; the parser cannot be used afterwards."""
+        with self._lock:
+            if self._pst is not None:
+                self._pst.close()
+                self._pst = None
+
     @retry(Exception, tries=3, delay=0.5)
     def _open(self, path: str) -> None:
         """Open PST file with retries."""
@@ -53,6 +193,9 @@ class PSTParser:
         folders: Optional[List[str]] = None,
         start: Optional[float] = None,
         end: Optional[float] = None,
+        resume_after: Optional[Tuple[str, int]] = None,
+        known: Optional[Mapping[str, Tuple[str, str]]] = None,
+        lazy: bool = False,
     ) -> Iterator[Message]:
         """Traverse folders and yield ``Message`` objects.
 
@@ -65,45 +208,271 @@ class PSTParser:
             Optional epoch timestamp; messages older than this are skipped.
         end:
             Optional epoch timestamp; messages newer than this are skipped.
+        resume_after:
+            Optional ``(folder path, message index)`` checkpoint. Every message
+            up to and including it in traversal order is skipped.
+        known:
+            Optional mapping of ``msg_id`` to ``(fingerprint, body hash)`` for
+            messages processed by an earlier run. Messages whose fingerprint is
+            unchanged are skipped before their body is read.
+        lazy:
+            If ``True``, bodies are only read from the PST when ``body`` is
+            first accessed. Otherwise they are read here and messages whose
+            body cannot be read are skipped.
         """
+        resume_after = self._check_resume(resume_after)
+        scanned = {f.path: f for f in self.manifest or []}
         root = self._pst.get_root_folder()
-        for folder in self._walk_folders(root):
-            if folders and folder.name not in folders:
+        for folder, path, _ in self._walk_folder_paths(root, "", ()):
+            first = 0
+            if resume_after is not None:
+                if path != resume_after[0]:
+                    continue
+                first = resume_after[1] + 1
+                resume_after = None
+            if folders and folder.name not in folders and path not in folders:
+                continue
+            info = scanned.get(path)
+            if info is not None and not info.overlaps(start, end):
+                logger.debug("Skipping folder %s outside date range", path)
                 continue
-            for i in range(folder.get_number_of_sub_messages()):
+            yield from self._read_messages(
+                folder,
+                path,
+                first,
+                folder.get_number_of_sub_messages(),
+                start,
+                end,
+                known,
+                lazy,
+            )
+
+    def list_folders(self) -> List[FolderInfo]:
+        """Return every folder in traversal order with its message count.
+
+        The scan manifest is returned instead when one is attached.
+        """
+        if self.manifest is not None:
+            return list(self.manifest)
+        result: List[FolderInfo] = []
+        root = self._pst.get_root_folder()
+        for folder, path, position in self._walk_folder_paths(root, "", ()):
+            result.append(
+                FolderInfo(path, position, folder.get_number_of_sub_messages())
+            )
+        return result
+
+    @property
+    def manifest_path(self) -> str:
+        """Path of the cached scan manifest next to the PST."""
+        return f"{self._path}.manifest.json"
+
+    def scan(self, refresh: bool = False) -> List[FolderInfo]:
+        """Build (or load) the folder manifest and attach it to this parser.
+
+        The manifest lists every folder with its message count and the min/max
+        submit time of its messages. It is cached next to the PST and reused
+        while the PST's size and modification time are unchanged.
+        """
+        if not refresh and self.load_manifest() is not None:
+            return self.manifest
+        folders: List[FolderInfo] = []
+        root = self._pst.get_root_folder()
+        for folder, path, position in self._walk_folder_paths(root, "", ()):
+            count = folder.get_number_of_sub_messages()
+            times: List[float] = []
+            undated = 0
+            for i in range(count):
                 try:
-                    item = folder.get_sub_message(i)
-                    timestamp = getattr(item, "client_submit_time", None) or time.time()
-                    if start and timestamp < start:
-                        continue
-                    if end and timestamp > end:
-                        continue
-                    body = item.plain_text_body or item.html_body or ""
-                    msg_id = (
-                        item.identifier.hex()
-                        if hasattr(item, "identifier")
-                        else str(time.time())
-                    )
-                    yield Message(body=body, msg_id=msg_id, timestamp=timestamp)
+                    with self._lock:
+                        item = folder.get_sub_message(i)
+                    ts = _to_epoch(self._fetch(item, "client_submit_time"))
                 except Exception as e:
                     logger.warning(
-                        "Failed to read message #%s in folder %s: %s",
+                        "Failed to scan message #%s in folder %s: %s",
                         i,
-                        folder.name,
+                        path,
                         e,
-                        extra={
-                            "component": "pst_parser",
-                            "msg_id": f"{folder.name}/{i}",
-                        },
+                        extra={"component": "pst_parser", "msg_id": f"{path}/{i}"},
                     )
+                    ts = None
+                if ts:
+                    times.append(ts)
+                else:
+                    undated += 1
+            folders.append(
+                FolderInfo(
+                    path,
+                    position,
+                    count,
+                    min(times) if times else None,
+                    max(times) if times else None,
+                    undated,
+                )
+            )
+        self.manifest = folders
+        self._save_manifest()
+        return folders
+
+    def load_manifest(self) -> Optional[List[FolderInfo]]:
+        """Attach the cached manifest if it is still valid for this PST."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        st = os.stat(self._path)
+        if (
+            data.get("version") != MANIFEST_VERSION
+            or data.get("size") != st.st_size
+            or data.get("mtime") != st.st_mtime
+        ):
+            logger.info("Ignoring stale manifest %s", self.manifest_path)
+            return None
+        self.manifest = [
+            FolderInfo(**{**f, "position": tuple(f["position"])})
+            for f in data.get("folders", [])
+        ]
+        return self.manifest
+
+    def _save_manifest(self) -> None:
+        st = os.stat(self._path)
+        data = {
+            "version": MANIFEST_VERSION,
+            "size": st.st_size,
+            "mtime": st.st_mtime,
+            "folders": [asdict(f) for f in self.manifest or []],
+        }
+        try:
+            with open(self.manifest_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError as exc:
+            logger.warning(
+                "Could not write manifest %s: %s",
+                self.manifest_path,
+                exc,
+                extra={"component": "pst_parser"},
+            )
+
+    def iter_unit(
+        self,
+        unit: WorkUnit,
+        known: Optional[Mapping[str, Tuple[str, str]]] = None,
+        lazy: bool = False,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Iterator[Message]:
+        """Yield the messages covered by ``unit``.
+
+        Unchanged ``known`` messages and messages outside ``start``/``end``
+        are skipped.
+        """
+        folder = self._pst.get_root_folder()
+        for i in unit.position:
+            folder = folder.get_sub_folder(i)
+        yield from self._read_messages(
+            folder, unit.folder_path, unit.start, unit.stop, start, end, known, lazy
+        )
+
+    def _read_messages(
+        self,
+        folder,
+        folder_path: str,
+        first: int,
+        stop: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        known: Optional[Mapping[str, Tuple[str, str]]] = None,
+        lazy: bool = False,
+    ) -> Iterator[Message]:
+        """Yield messages ``first``..``stop - 1`` of ``folder``.
+
+        Properties are fetched cheapest first: the submit time for the date
+        filter, then the identifier, and the modification time for the
+        fingerprint only when there is a ``known`` check.
+        """
+        for i in range(first, stop):
+            try:
+                with self._lock:
+                    item = folder.get_sub_message(i)
+                submit_time = _to_epoch(self._fetch(item, "client_submit_time"))
+                timestamp = submit_time or time.time()
+                if start and timestamp < start:
                     continue
+                if end and timestamp > end:
+                    continue
+                msg_id = _to_msg_id(self._fetch(item, "identifier"))
+                msg = PSTMessage(self, item, msg_id, timestamp, folder_path, i, submit_time)
+                if known and known.get(msg_id, ("",))[0] == msg.fingerprint:
+                    continue
+                if not lazy:
+                    msg.body  # read now so unreadable bodies are skipped here
+                yield msg
+            except Exception as e:
+                logger.warning(
+                    "Failed to read message #%s in folder %s: %s",
+                    i,
+                    folder.name,
+                    e,
+                    extra={
+                        "component": "pst_parser",
+                        "msg_id": f"{folder.name}/{i}",
+                    },
+                )
+                continue
+
+    def _fetch(self, item: Any, name: str) -> Any:
+        """Read property ``name`` of ``item``, recording how long it took."""
+        with self._lock:
+            t0 = time.perf_counter()
+            try:
+                return getattr(item, name, None)
+            finally:
+                if self._metrics is not None:
+                    self._metrics.observe(
+                        f"pst_fetch.{name}", (time.perf_counter() - t0) * 1000
+                    )
+
+    def _read_body(self, item: Any) -> str:
+        """Return the plain text body of ``item``, falling back to HTML."""
+        body = self._fetch(item, "plain_text_body")
+        if not body:
+            body = self._fetch(item, "html_body")
+        return _to_text(body)
 
-    def _walk_folders(self, folder) -> Iterator:
-        """Recursively walk subfolders."""
-        yield folder
+    def _walk_folder_paths(self, folder, parent: str, position: Tuple[int, ...]) -> Iterator:
+        """Recursively walk subfolders, tracking their path and position."""
+        name = folder.name or ""
+        path = f"{parent}/{name}" if parent else name
+        yield folder, path, position
         for i in range(folder.get_number_of_sub_folders()):
             sub = folder.get_sub_folder(i)
-            yield from self._walk_folders(sub)
+            yield from self._walk_folder_paths(sub, path, position + (i,))
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    """Return ``value`` as epoch seconds; pypff reports ``datetime`` objects."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+def _to_msg_id(identifier: Any) -> str:
+    """Return a string message id for a pypff ``identifier``."""
+    if identifier is None:
+        return str(time.time())
+    if isinstance(identifier, int):
+        return format(identifier, "x")
+    return identifier.hex()
+
+
+def _to_text(value: Any) -> str:
+    """Decode pypff body bytes to text."""
+    if not value:
+        return ""
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return value
 
 
 def main() -> None:
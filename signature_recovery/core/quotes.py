@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Detection of quoted reply history in normalized message lines.
+
+Replies carry the earlier messages of the thread below the new text, marked
+by ``>`` prefixes, an "On ... wrote:" attribution, an "-----Original
+Message-----" separator or an Outlook ``From:``/``Sent:`` header block.
+``quote_start`` finds where that history begins so extraction can stay in
+the newest part; ``quoted_blocks`` splits the history into the earlier
+messages for callers that want their signatures too.
+"""
+
+# Imports
+import re
+from typing import List, Optional, Sequence, Tuple
+
+# Globals
+_ATTRIBUTION_END = r"(?:wrote|schrieb|a écrit|escribió|schreef|ha scritto)\s*:$"
+_ATTRIBUTION_RE = re.compile(rf"^(?:on|am|le|el|op|il)\s.*{_ATTRIBUTION_END}", re.IGNORECASE)
+_ATTRIBUTION_START_RE = re.compile(r"^(?:on|am|le|el|op|il)\s", re.IGNORECASE)
+_ATTRIBUTION_END_RE = re.compile(_ATTRIBUTION_END, re.IGNORECASE)
+_SEPARATOR_RE = re.compile(
+    r"^-{2,}\s*(?:original message|forwarded message)\s*-{2,}$|^begin forwarded message:$",
+    re.IGNORECASE,
+)
+_HEADER_RE = re.compile(r"^(?:from|sent|date|to|cc|subject)\s*:", re.IGNORECASE)
+_FROM_RE = re.compile(r"^from\s*:\s*\S", re.IGNORECASE)
+_SENT_RE = re.compile(r"^(?:sent|date)\s*:", re.IGNORECASE)
+# Raw-body hint that quoted history may be present, checked before any
+# normalization; false positives only cost the fast path
+QUOTE_HINT_RE = re.compile(
+    r"^\s*>|[>;]\s*>|&gt;|&#62;|(?:original|forwarded)(?:\s|&nbsp;)+message|"
+    r"wrote|schrieb|crit\s*:|escribi|schreef|scritto|from(?:\s|<[^>]*>)*:",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Header lines searched after ``From:`` for the ``Sent:`` of an Outlook block
+_HEADER_WINDOW = 4
+
+# Classes/Functions
+
+
+def dequote(line: str) -> Tuple[int, str]:
+    """Return the ``>`` quote depth of ``line`` and its text without the prefix."""
+    depth = 0
+    text = line.lstrip()
+    while text.startswith(">"):
+        depth += 1
+        text = text[1:].lstrip()
+    return depth, text
+
+
+def _marker_length(texts: Sequence[str], i: int) -> int:
+    """Return how many lines from ``texts[i]`` form a quote marker (0 if none)."""
+    text = texts[i]
+    if _SEPARATOR_RE.match(text):
+        length = 1
+    elif _ATTRIBUTION_RE.match(text):
+        return 1
+    elif (
+        _ATTRIBUTION_START_RE.match(text)
+        and i + 1 < len(texts)
+        and _ATTRIBUTION_END_RE.search(texts[i + 1])
+    ):
+        # Attributions are often wrapped after the sender's address
+        return 2
+    elif _FROM_RE.match(text) and any(
+        _SENT_RE.match(t) for t in texts[i + 1 : i + 1 + _HEADER_WINDOW]
+    ):
+        length = 0
+    else:
+        return 0
+    while i + length < len(texts) and _HEADER_RE.match(texts[i + length]):
+        length += 1
+    return length
+
+
+def quote_start(lines: Sequence[str]) -> Optional[int]:
+    """Return the index of the first line of quoted history, or ``None``."""
+    texts = [dequote(line)[1] for line in lines]
+    for i, line in enumerate(lines):
+        if line.lstrip().startswith(">") or _marker_length(texts, i):
+            return i
+    return None
+
+
+def quoted_blocks(lines: Sequence[str], start: Optional[int] = None) -> List[List[str]]:
+    """Split the quoted history of ``lines`` into earlier messages.
+
+    Each block holds the dequoted, non-blank lines of one earlier message,
+    without its attribution or header lines. A new block starts at every
+    marker and wherever the quote depth changes.
+    """
+    if start is None:
+        start = quote_start(lines)
+        if start is None:
+            return []
+    quoted = [dequote(line) for line in lines[start:]]
+    texts = [text for _, text in quoted]
+    blocks: List[List[str]] = []
+    current: List[str] = []
+    depth = None
+    i = 0
+    while i < len(quoted):
+        marker = _marker_length(texts, i)
+        if marker or quoted[i][0] != depth:
+            if current:
+                blocks.append(current)
+            current = []
+            depth = quoted[i][0]
+        if marker:
+            i += marker
+            continue
+        if texts[i]:
+            current.append(texts[i])
+        i += 1
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+# main
+if __name__ == "__main__":  # pragma: no cover - manual run
+    sample = [
+        "Sounds good.",
+        "Best regards,",
+        "Jane",
+        "On Mon, Jan 1, 2024 at 9:00 AM John Doe <john@example.com> wrote:",
+        "> Can we meet?",
+        "> Thanks,",
+        "> John Doe",
+    ]
+    print(quote_start(sample))
+    print(quoted_blocks(sample))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Compiled extraction and parsing rules shared by extractors and parsers.
+
+A :class:`Ruleset` is built once from the config: it holds the sign-off and
+phone patterns, the title keywords and company suffixes, their compiled
+matchers and a content hash. It is immutable, so threads share one instance,
+and it pickles to its pattern sources, so process workers rebuild it once.
+The hash changes whenever a rule changes, which tells the signature cache and
+incremental runs that earlier results may be stale.
+
+Title keywords and company suffixes can number in the tens of thousands
+(``parser.title_keywords_file`` / ``parser.company_suffixes_file``): titles
+are compiled into a trie-shaped regex and suffixes into a
+:class:`SuffixMatcher`, so matching a line does not slow down as the
+dictionaries grow.
+"""
+
+# Imports
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Pattern, Tuple
+
+from .config import load_config
+from .matching import PatternMatcher, SuffixMatcher, trie_regex
+
+# Globals
+# Bump when the meaning of a rule changes without its sources changing
+RULESET_VERSION = 1
+TITLE_KEYWORDS = ("Manager", "Engineer", "Director", "Officer", "Consultant")
+COMPANY_SUFFIXES = ("Inc", "Inc.", "LLC", "Ltd", "Corp", "Co", "Company")
+DEFAULT_PHONE_PATTERN = r"(\+?[\d(][\d\s\-\.\(\)]{7,}\d)"
+_shared: Dict[str, "Ruleset"] = {}
+_shared_lock = threading.Lock()
+
+# Classes/Functions
+
+
+@dataclass(frozen=True)
+class Ruleset:
+    """Immutable rule sources with their compiled matchers.
+
+    ``signoff`` is the :class:`PatternMatcher` of ``signoff_patterns``,
+    ``phone_res`` the compiled ``phone_patterns`` in order, ``title_re``
+    matches any title keyword in a lower-cased line, ``company_suffix``
+    tests whether a line ends with a company suffix and ``digest`` is a
+    stable hash of the sources.
+    """
+
+    signoff_patterns: Tuple[str, ...] = ()
+    phone_patterns: Tuple[str, ...] = ()
+    title_keywords: Tuple[str, ...] = TITLE_KEYWORDS
+    company_suffixes: Tuple[str, ...] = COMPANY_SUFFIXES
+    signoff: PatternMatcher = field(init=False, repr=False, compare=False)
+    phone_res: Tuple[Pattern[str], ...] = field(init=False, repr=False, compare=False)
+    title_re: Pattern[str] = field(init=False, repr=False, compare=False)
+    company_suffix: SuffixMatcher = field(init=False, repr=False, compare=False)
+    digest: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        for name in ("signoff_patterns", "phone_patterns", "title_keywords", "company_suffixes"):
+            object.__setattr__(self, name, tuple(getattr(self, name)))
+        phones = self.phone_patterns or (DEFAULT_PHONE_PATTERN,)
+        titles = trie_regex({k.lower() for k in self.title_keywords if k}, ignore_case=False)
+        object.__setattr__(self, "signoff", PatternMatcher(self.signoff_patterns))
+        object.__setattr__(self, "phone_res", tuple(re.compile(p) for p in phones))
+        # An empty keyword list must match nothing rather than every line
+        object.__setattr__(self, "title_re", re.compile(titles or r"(?!)"))
+        object.__setattr__(self, "company_suffix", SuffixMatcher(self.company_suffixes))
+        object.__setattr__(self, "digest", _digest(self.sources()))
+
+    @classmethod
+    def from_config(cls, config: Optional[Mapping[str, Any]] = None) -> "Ruleset":
+        """Return the ruleset of ``config``, shared with every equal config.
+
+        Entries of ``parser.title_keywords_file`` and
+        ``parser.company_suffixes_file`` (one per line, ``#`` comments) are
+        added to the inline lists. Files are only read when the config, or a
+        file's size or modification time, was not seen before.
+        """
+        config = config or load_config()
+        extraction = config.get("extraction", {})
+        parser = config.get("parser", {})
+        sources = {
+            "signoff_patterns": tuple(extraction.get("signoff_patterns", ())),
+            "phone_patterns": tuple(parser.get("phone_patterns", ())),
+            "title_keywords": tuple(parser.get("title_keywords", TITLE_KEYWORDS)),
+            "company_suffixes": tuple(parser.get("company_suffixes", COMPANY_SUFFIXES)),
+        }
+        files = {
+            name: parser.get(f"{name}_file") for name in ("title_keywords", "company_suffixes")
+        }
+        stamps = {
+            name: (path, *_file_stamp(path)) for name, path in files.items() if path
+        }
+        key = _digest({**sources, **{f"{n}_file": s for n, s in stamps.items()}})
+        with _shared_lock:
+            ruleset = _shared.get(key)
+            if ruleset is None:
+                for name in stamps:
+                    sources[name] += load_entries(files[name])
+                ruleset = _shared[key] = cls(**sources)
+            return ruleset
+
+    def sources(self) -> Dict[str, Tuple[str, ...]]:
+        """Return the rule sources the ruleset was built from."""
+        return {
+            "signoff_patterns": self.signoff_patterns,
+            "phone_patterns": self.phone_patterns,
+            "title_keywords": self.title_keywords,
+            "company_suffixes": self.company_suffixes,
+        }
+
+    def __reduce__(self):
+        # Compiled matchers are rebuilt on unpickling
+        return (
+            Ruleset,
+            (self.signoff_patterns, self.phone_patterns, self.title_keywords, self.company_suffixes),
+        )
+
+
+def load_entries(path: str) -> Tuple[str, ...]:
+    """Return the non-blank, non-comment lines of dictionary file ``path``."""
+    with open(path, encoding="utf-8") as f:
+        stripped = (line.strip() for line in f)
+        return tuple(line for line in stripped if line and not line.startswith("#"))
+
+
+def _file_stamp(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _digest(sources: Mapping[str, Any]) -> str:
+    data = json.dumps({"version": RULESET_VERSION, **sources}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+# main
+if __name__ == "__main__":  # pragma: no cover - manual run
+    rules = Ruleset.from_config()
+    print(rules.digest, len(rules.signoff), len(rules.phone_res))
@@ -0,0 +1,703 @@
+#!/usr/bin/env python3
+"""
+sources.py
+----------
+Message sources that ``extract`` can read from. ``MessageSource`` is the
+common interface; ``PSTParser`` implements it for PST files and this module
+adds mbox files and directories of EML files or maildirs, none of which need
+``pypff``. ``open_source`` picks the right one for a path.
+"""
+
+# Imports
+import logging
+import mmap
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from email import policy
+from email.header import decode_header, make_header
+from email.parser import BytesHeaderParser, BytesParser
+from email.utils import parseaddr, parsedate_to_datetime
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .models import Message
+from .prefilter import key_headers, message_class_for
+
+logger = logging.getLogger(__name__)
+
+# Globals
+DEFAULT_UNIT_SIZE = 500
+DEFAULT_WALK_WORKERS = 8
+# Files whose headers are read ahead by the directory walkers at a time
+WALK_WINDOW = 64
+MBOX_EXTENSIONS = (".mbox", ".mbx")
+_HEADER_END = re.compile(rb"\r?\n\r?\n")
+_MBOXRD_FROM = re.compile(rb"^>(>*From )", re.MULTILINE)
+
+# Classes/Functions
+
+@dataclass(frozen=True)
+class FolderInfo:
+    """A folder discovered by :meth:`MessageSource.list_folders`.
+
+    Attributes
+    ----------
+    path:
+        Slash-separated folder names from the root, e.g. ``"root/Inbox"``.
+    position:
+        Sub-folder indices leading from the root to this folder.
+    message_count:
+        Number of messages in the folder.
+    min_time, max_time:
+        Earliest and latest message time in the folder. Only known after
+        :meth:`MessageSource.scan`.
+    undated:
+        Number of messages without a time, or ``-1`` if not scanned.
+    """
+
+    path: str
+    position: Tuple[int, ...]
+    message_count: int
+    min_time: Optional[float] = None
+    max_time: Optional[float] = None
+    undated: int = -1
+
+    def selected(self, folders: Optional[List[str]]) -> bool:
+        """Return whether ``folders`` (names or paths) includes this folder."""
+        if not folders:
+            return True
+        return self.path in folders or self.path.rsplit("/", 1)[-1] in folders
+
+    def overlaps(self, start: Optional[float], end: Optional[float]) -> bool:
+        """Return ``False`` only if a scan proved no message is in range."""
+        if self.undated != 0 or self.min_time is None:
+            return True
+        if start and self.max_time < start:
+            return False
+        if end and self.min_time > end:
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """A contiguous message index range ``[start, stop)`` within one folder."""
+
+    folder_path: str
+    position: Tuple[int, ...]
+    start: int
+    stop: int
+
+
+
+
+class LazyMessage(Message):
+    """``Message`` whose body is produced by ``loader`` on first access.
+
+    Like ``PSTMessage`` it pickles to a plain ``Message`` with the body
+    loaded. ``timestamp`` is ``None`` until the source fills in a default for
+    undated messages.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], str],
+        msg_id: str,
+        timestamp: Optional[float],
+        folder_path: str = "",
+        msg_index: int = -1,
+        fingerprint: str = "",
+        sender_name: str = "",
+        sender_email: str = "",
+        message_class: str = "",
+        subject: str = "",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self._loader: Optional[Callable[[], str]] = loader
+        self._body: Optional[str] = None
+        self.msg_id = msg_id
+        self.timestamp = timestamp
+        self.folder_path = folder_path
+        self.msg_index = msg_index
+        self.fingerprint = fingerprint
+        self.sender_name = sender_name
+        self.sender_email = sender_email
+        self.message_class = message_class
+        self.subject = subject
+        self.headers = headers or {}
+
+    @property
+    def body(self) -> str:
+        if self._body is None:
+            self._body = self._loader()
+            self._loader = None
+        return self._body
+
+    def __reduce__(self):
+        return (
+            Message,
+            (
+                self.body,
+                self.msg_id,
+                self.timestamp,
+                self.folder_path,
+                self.msg_index,
+                self.fingerprint,
+                self.sender_name,
+                self.sender_email,
+                self.message_class,
+                self.subject,
+                self.headers,
+            ),
+        )
+
+
+class MessageSource:
+    """Interface shared by everything ``extract`` reads messages from.
+
+    Subclasses implement ``list_folders`` and ``_read_folder``; the folder,
+    date, resume and ``known`` filters of ``iter_messages`` are applied here
+    the same way ``PSTParser`` applies them.
+    """
+
+    manifest: Optional[List[FolderInfo]] = None
+
+    @property
+    def manifest_path(self) -> str:
+        """Where :meth:`scan` caches its manifest, or ``""`` if it does not."""
+        return ""
+
+    def list_folders(self) -> List[FolderInfo]:
+        """Return every folder in traversal order with its message count."""
+        raise NotImplementedError
+
+    def load_manifest(self) -> Optional[List[FolderInfo]]:
+        """Attach a cached manifest if there is a valid one."""
+        return None
+
+    def scan(self, refresh: bool = False) -> List[FolderInfo]:
+        """Attach a manifest with each folder's min/max message time."""
+        self.manifest = None
+        folders: List[FolderInfo] = []
+        for info in self.list_folders():
+            times = [m.timestamp for m in self._read_folder(info, 0) if m.timestamp]
+            folders.append(
+                replace(
+                    info,
+                    min_time=min(times) if times else None,
+                    max_time=max(times) if times else None,
+                    undated=info.message_count - len(times),
+                )
+            )
+        self.manifest = folders
+        return folders
+
+    def iter_messages(
+        self,
+        folders: Optional[List[str]] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        resume_after: Optional[Tuple[str, int]] = None,
+        known: Optional[Mapping[str, Tuple[str, str]]] = None,
+        lazy: bool = False,
+    ) -> Iterator[Message]:
+        """Yield ``Message`` objects; see :meth:`PSTParser.iter_messages`."""
+        resume_after = self._check_resume(resume_after)
+        for info in self.list_folders():
+            first = 0
+            if resume_after is not None:
+                if info.path != resume_after[0]:
+                    continue
+                first = resume_after[1] + 1
+                resume_after = None
+            if not info.selected(folders) or not info.overlaps(start, end):
+                continue
+            yield from self._filter(self._read_folder(info, first), start, end, known, lazy)
+
+    def iter_unit(
+        self,
+        unit: WorkUnit,
+        known: Optional[Mapping[str, Tuple[str, str]]] = None,
+        lazy: bool = False,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Iterator[Message]:
+        """Yield the messages covered by ``unit``."""
+        for info in self.list_folders():
+            if info.path == unit.folder_path:
+                messages = self._read_folder(info, unit.start, unit.stop)
+                yield from self._filter(messages, start, end, known, lazy)
+                return
+
+    def close(self) -> None:
+        """Release any open file handles."""
+
+    def _read_folder(
+        self, info: FolderInfo, first: int, stop: Optional[int] = None
+    ) -> Iterator[LazyMessage]:
+        """Yield messages ``first``..``stop - 1`` of folder ``info``.
+
+        Only headers are read; bodies load lazily. Unreadable messages are
+        logged and skipped.
+        """
+        raise NotImplementedError
+
+    def _filter(
+        self,
+        messages: Iterator[LazyMessage],
+        start: Optional[float],
+        end: Optional[float],
+        known: Optional[Mapping[str, Tuple[str, str]]],
+        lazy: bool,
+    ) -> Iterator[Message]:
+        for msg in messages:
+            if msg.timestamp is None:
+                msg.timestamp = time.time()
+            if start and msg.timestamp < start:
+                continue
+            if end and msg.timestamp > end:
+                continue
+            if known and known.get(msg.msg_id, ("",))[0] == msg.fingerprint:
+                continue
+            if not lazy:
+                try:
+                    msg.body  # read now so unreadable bodies are skipped here
+                except Exception as e:
+                    _log_unreadable(msg.msg_index, msg.folder_path, e)
+                    continue
+            yield msg
+
+    def _check_resume(
+        self, resume_after: Optional[Tuple[str, int]]
+    ) -> Optional[Tuple[str, int]]:
+        """Return ``resume_after`` if its folder still exists, else ``None``."""
+        if resume_after is None:
+            return None
+        if any(f.path == resume_after[0] for f in self.list_folders()):
+            return resume_after
+        logger.warning(
+            "Checkpoint folder %s not found; starting from the beginning",
+            resume_after[0],
+            extra={"component": "sources"},
+        )
+        return None
+
+
+class MboxSource(MessageSource):
+    """Messages of an mbox file, found by scanning a memory map for ``From `` lines.
+
+    The file is never read into memory as a whole; each message is sliced out
+    of the map when its headers or body are needed.
+    """
+
+    def __init__(self, path: str) -> None:
+        if not os.path.isfile(path):
+            logger.error("mbox file not found: %s", path)
+            raise FileNotFoundError(f"mbox file not found: {path}")
+        self._path = path
+        self._file = open(path, "rb")
+        if os.path.getsize(path):
+            self._map: Any = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = b""
+        self._offsets: Optional[List[int]] = None
+        self.manifest = None
+        logger.info("Opened mbox file: %s", path)
+
+    def list_folders(self) -> List[FolderInfo]:
+        if self.manifest is not None:
+            return list(self.manifest)
+        name = os.path.basename(self._path)
+        return [FolderInfo(name, (), len(self._message_offsets()))]
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def _message_offsets(self) -> List[int]:
+        """Return the offset of every ``From `` separator line."""
+        if self._offsets is None:
+            data = self._map
+            offsets: List[int] = [0] if data[:5] == b"From " else []
+            pos = data.find(b"\nFrom ")
+            while pos >= 0:
+                offsets.append(pos + 1)
+                pos = data.find(b"\nFrom ", pos + 1)
+            self._offsets = offsets
+        return self._offsets
+
+    def _read_folder(
+        self, info: FolderInfo, first: int, stop: Optional[int] = None
+    ) -> Iterator[LazyMessage]:
+        offsets = self._message_offsets()
+        size = len(self._map)
+        stop = len(offsets) if stop is None else min(stop, len(offsets))
+        for i in range(first, stop):
+            try:
+                sep = offsets[i]
+                end = offsets[i + 1] if i + 1 < len(offsets) else size
+                # The message starts after the ``From `` separator line
+                begin = self._map.find(b"\n", sep, end) + 1 or end
+                match = _HEADER_END.search(self._map[begin:min(end, begin + 65536)])
+                head = self._map[begin:begin + match.end()] if match else self._map[begin:end]
+                msg_id, timestamp, sender, extra = _header_fields(head, f"{info.path}:{sep}")
+                yield LazyMessage(
+                    partial(self._load, begin, end),
+                    msg_id,
+                    timestamp,
+                    info.path,
+                    i,
+                    f"{sep}:{end - sep}",
+                    *sender,
+                    *extra,
+                )
+            except Exception as e:
+                _log_unreadable(i, info.path, e)
+
+    def _load(self, begin: int, end: int) -> str:
+        return _message_text(_MBOXRD_FROM.sub(rb"\1", self._map[begin:end]))
+
+
+class _FileTreeSource(MessageSource):
+    """Base for sources with one message per file under a directory tree.
+
+    Directory listings and header reads run on a thread pool of ``workers``
+    threads; bodies are read lazily.
+    """
+
+    def __init__(self, root: str, workers: int = DEFAULT_WALK_WORKERS) -> None:
+        if not os.path.exists(root):
+            logger.error("Message directory not found: %s", root)
+            raise FileNotFoundError(f"Message directory not found: {root}")
+        self._root = root
+        self._name = os.path.basename(os.path.normpath(root))
+        self._workers = max(1, workers)
+        self._files: Optional[Dict[str, List[str]]] = None
+        self.manifest = None
+
+    def list_folders(self) -> List[FolderInfo]:
+        if self.manifest is not None:
+            return list(self.manifest)
+        return [FolderInfo(path, (), len(files)) for path, files in self._listing().items()]
+
+    def _listing(self) -> Dict[str, List[str]]:
+        """Return folder path -> message file paths, in traversal order."""
+        if self._files is None:
+            with ThreadPoolExecutor(max_workers=self._workers) as pool:
+                self._files = self._walk(pool)
+        return self._files
+
+    def _walk(self, pool: ThreadPoolExecutor) -> Dict[str, List[str]]:
+        raise NotImplementedError
+
+    def _read_folder(
+        self, info: FolderInfo, first: int, stop: Optional[int] = None
+    ) -> Iterator[LazyMessage]:
+        files = self._listing().get(info.path, [])
+        stop = len(files) if stop is None else min(stop, len(files))
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            # Read headers a window at a time so memory stays bounded
+            for begin in range(first, stop, WALK_WINDOW):
+                window = range(begin, min(begin + WALK_WINDOW, stop))
+                opened = pool.map(
+                    partial(self._open_message, info.path),
+                    window,
+                    [files[i] for i in window],
+                )
+                for msg in opened:
+                    if msg is not None:
+                        yield msg
+
+    def _open_message(self, folder_path: str, index: int, path: str) -> Optional[LazyMessage]:
+        try:
+            st = os.stat(path)
+            with open(path, "rb") as f:
+                head = f.read(65536)
+            match = _HEADER_END.search(head)
+            if match:
+                head = head[:match.end()]
+            fallback = os.path.relpath(path, self._root) if os.path.isdir(self._root) else path
+            msg_id, timestamp, sender, extra = _header_fields(head, self._fallback_id(fallback))
+            return LazyMessage(
+                partial(_read_file_text, path),
+                msg_id,
+                timestamp,
+                folder_path,
+                index,
+                f"{st.st_mtime}:{st.st_size}",
+                *sender,
+                *extra,
+            )
+        except Exception as e:
+            _log_unreadable(index, folder_path, e)
+            return None
+
+    def _fallback_id(self, relpath: str) -> str:
+        """Message id to use when a message has no ``Message-ID`` header."""
+        return relpath
+
+
+class EmlDirectorySource(_FileTreeSource):
+    """``.eml`` files in a directory tree (or a single ``.eml`` file).
+
+    Each directory holding ``.eml`` files is a folder named by its path from
+    ``root``, e.g. ``"export/Inbox"``.
+    """
+
+    def _walk(self, pool: ThreadPoolExecutor) -> Dict[str, List[str]]:
+        if os.path.isfile(self._root):
+            parent = os.path.basename(os.path.dirname(os.path.abspath(self._root)))
+            return {parent: [self._root]}
+        result: Dict[str, List[str]] = {}
+        level = [(self._root, self._name)]
+        while level:
+            deeper: List[Tuple[str, str]] = []
+            for (directory, path), (dirs, files) in zip(
+                level, pool.map(_list_dir, [d for d, _ in level])
+            ):
+                emls = sorted(f for f in files if f.lower().endswith(".eml"))
+                if emls:
+                    result[path] = [os.path.join(directory, f) for f in emls]
+                deeper.extend((os.path.join(directory, d), f"{path}/{d}") for d in sorted(dirs))
+            level = deeper
+        return result
+
+
+class MaildirSource(_FileTreeSource):
+    """A maildir and its subfolders.
+
+    Both Maildir++ (``.Sent``, ``.Archive.2023``) and plain nested maildir
+    subdirectories are read, at any depth, e.g. ``Projects/Alpha`` as
+    ``"Maildir/Projects/Alpha"``. Messages from ``new`` and ``cur`` are
+    ordered by their unique name, which does not change when flags are added.
+    """
+
+    def _walk(self, pool: ThreadPoolExecutor) -> Dict[str, List[str]]:
+        folders: List[Tuple[str, str]] = []
+        level = [(self._root, self._name)]
+        while level:
+            deeper: List[Tuple[str, str]] = []
+            for (directory, path), (dirs, _) in zip(
+                level, pool.map(_list_dir, [d for d, _ in level])
+            ):
+                skip: Tuple[str, ...] = ()
+                if "cur" in dirs and "new" in dirs:
+                    folders.append((directory, path))
+                    skip = ("cur", "new", "tmp")
+                for name in sorted(dirs):
+                    if name not in skip:
+                        folder = f"{path}/{name.lstrip('.').replace('.', '/')}"
+                        deeper.append((os.path.join(directory, name), folder))
+            level = deeper
+        result: Dict[str, List[str]] = {}
+        for (_, path), files in zip(folders, pool.map(_list_maildir, [d for d, _ in folders])):
+            result[path] = files
+        return result
+
+    def _fallback_id(self, relpath: str) -> str:
+        return os.path.basename(relpath).split(":", 1)[0]
+
+
+def plan_work_units(
+    folders: List[FolderInfo],
+    unit_size: int = DEFAULT_UNIT_SIZE,
+    resume_after: Optional[Tuple[str, int]] = None,
+    include: Optional[List[str]] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    workers: int = 0,
+) -> List[WorkUnit]:
+    """Split ``folders`` into work units of at most ``unit_size`` messages.
+
+    When ``resume_after`` names a ``(folder path, message index)`` checkpoint,
+    units only cover the messages that follow it in traversal order. Folders
+    not in ``include`` or (per a scan) entirely outside ``start``/``end`` are
+    left out. Given ``workers``, units are shrunk so each worker gets about
+    four of them, which keeps the pool evenly loaded.
+    """
+    if resume_after is not None and not any(f.path == resume_after[0] for f in folders):
+        resume_after = None
+    selected: List[Tuple[FolderInfo, int]] = []
+    for info in folders:
+        begin = 0
+        if resume_after is not None:
+            if info.path != resume_after[0]:
+                continue
+            begin = resume_after[1] + 1
+            resume_after = None
+        if info.selected(include) and info.overlaps(start, end):
+            selected.append((info, begin))
+    if workers > 0:
+        total = sum(info.message_count - begin for info, begin in selected)
+        unit_size = min(unit_size, -(-total // (workers * 4)))
+    unit_size = max(1, unit_size)
+    units: List[WorkUnit] = []
+    for info, begin in selected:
+        for first in range(begin, info.message_count, unit_size):
+            stop = min(first + unit_size, info.message_count)
+            units.append(WorkUnit(info.path, info.position, first, stop))
+    return units
+
+
+def skip_filtered(messages: Iterable[Message], units: List[WorkUnit], progress) -> Iterator[Message]:
+    """Yield ``messages`` read over ``units``, taking skipped ones off ``progress``.
+
+    Sources drop messages outside the date range, already processed or
+    unreadable ones without a trace; the gaps they leave in
+    ``(folder_path, msg_index)`` tell how many, so the progress total ends at
+    the number of messages actually extracted.
+    """
+    # folder path -> ordinal of its message 0 within all units
+    base: Dict[str, int] = {}
+    total = 0
+    for unit in units:
+        base.setdefault(unit.folder_path, total - unit.start)
+        total += unit.stop - unit.start
+    expected = 0
+    for msg in messages:
+        offset = base.get(msg.folder_path)
+        if offset is not None:
+            ordinal = offset + msg.msg_index
+            progress.skip(ordinal - expected)
+            expected = max(expected, ordinal + 1)
+        yield msg
+    progress.skip(total - expected)
+
+
+def _list_dir(path: str) -> Tuple[List[str], List[str]]:
+    """Return the sub-directory and file names in ``path``."""
+    dirs: List[str] = []
+    files: List[str] = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                dirs.append(entry.name)
+            elif entry.is_file():
+                files.append(entry.name)
+    return dirs, files
+
+
+def _list_maildir(path: str) -> List[str]:
+    """Return the message files in ``new`` and ``cur`` of maildir ``path``."""
+    names: List[Tuple[str, str]] = []
+    for sub in ("new", "cur"):
+        for name in _list_dir(os.path.join(path, sub))[1]:
+            if not name.startswith("."):
+                names.append((name.split(":", 1)[0], os.path.join(path, sub, name)))
+    return [p for _, p in sorted(names)]
+
+
+def _is_maildir(path: str) -> bool:
+    return os.path.isdir(os.path.join(path, "cur")) and os.path.isdir(os.path.join(path, "new"))
+
+
+def _header_fields(
+    head: bytes, fallback_id: str
+) -> Tuple[str, Optional[float], Tuple[str, str], Tuple[str, str, Dict[str, str]]]:
+    """Return the message id, date (epoch seconds), sender ``(name, address)``
+    and pre-filter fields ``(message class, subject, key headers)`` from raw headers.
+    """
+    headers = BytesHeaderParser(policy=policy.compat32).parsebytes(head)
+    msg_id = str(headers.get("Message-ID") or "").strip().strip("<>") or fallback_id
+    timestamp = None
+    date = headers.get("Date")
+    if date:
+        try:
+            timestamp = parsedate_to_datetime(str(date)).timestamp()
+        except (TypeError, ValueError):
+            timestamp = None
+    found = key_headers(headers)
+    subject = _decoded(str(headers.get("Subject") or ""))
+    extra = (message_class_for(found), subject.strip(), found)
+    return msg_id, timestamp, _sender(headers.get("From")), extra
+
+
+def _sender(value: Any) -> Tuple[str, str]:
+    """Return the decoded display name and address of a ``From`` header."""
+    if not value:
+        return "", ""
+    name, address = parseaddr(str(value))
+    return _decoded(name).strip(), address.strip()
+
+
+def _decoded(value: str) -> str:
+    """Decode RFC 2047 encoded words in a header value."""
+    try:
+        return str(make_header(decode_header(value)))
+    except (LookupError, UnicodeError, ValueError):
+        return value
+
+
+def _message_text(raw: bytes) -> str:
+    """Return the plain text body of RFC 822 ``raw``, falling back to HTML."""
+    msg = BytesParser(policy=policy.default).parsebytes(raw)
+    part = msg.get_body(preferencelist=("plain", "html"))
+    if part is None:
+        return ""
+    try:
+        return part.get_content()
+    except (LookupError, UnicodeError):
+        payload = part.get_payload(decode=True) or b""
+        return payload.decode("utf-8", "replace")
+
+
+def _read_file_text(path: str) -> str:
+    with open(path, "rb") as f:
+        return _message_text(f.read())
+
+
+def _log_unreadable(index: int, folder_path: str, exc: Exception) -> None:
+    logger.warning(
+        "Failed to read message #%s in folder %s: %s",
+        index,
+        folder_path,
+        exc,
+        extra={"component": "sources", "msg_id": f"{folder_path}/{index}"},
+    )
+
+
+def open_source(path: str, metrics: Any = None) -> MessageSource:
+    """Return the message source for ``path``, detected from its type.
+
+    Directories are read as a maildir if they (or a sub-directory) contain
+    ``cur`` and ``new``, otherwise as a tree of ``.eml`` files. Files ending
+    in ``.eml`` are read as one message, ``.mbox``/``.mbx`` files and files
+    starting with a ``From `` line as mbox, and anything else as a PST.
+    """
+    if os.path.isdir(path):
+        if _is_maildir(path) or any(_is_maildir(os.path.join(path, d)) for d in _list_dir(path)[0]):
+            return MaildirSource(path)
+        return EmlDirectorySource(path)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".eml":
+        return EmlDirectorySource(path)
+    if ext in MBOX_EXTENSIONS or _starts_with_from(path):
+        return MboxSource(path)
+    from .pst_parser import PSTParser
+
+    return PSTParser(path, metrics=metrics)
+
+
+def _starts_with_from(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(5) == b"From "
+    except OSError:
+        return False
+
+
+# main
+if __name__ == "__main__":  # pragma: no cover - manual run
+    import sys
+
+    source = open_source(sys.argv[1])
+    for folder in source.list_folders():
+        print(f"{folder.path}\t{folder.message_count}")
+    for count, message in enumerate(source.iter_messages(lazy=True)):
+        print(f"{message.msg_id} @ {message.timestamp}")
+        if count >= 4:
+            break
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Per-sender signature templates for the extraction fast path.
+
+Most messages in a mailbox come from a few senders whose signature never
+changes. Once a sender's signature has been extracted with high confidence
+it is kept as a template, and later messages from that sender that end with
+the same lines reuse it without running the heuristics or the parser.
+"""
+
+# Imports
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .models import SignatureMetadata
+
+# Globals
+DEFAULT_MIN_CONFIDENCE = 0.9
+DEFAULT_MAX_SENDERS = 10000
+
+# Classes/Functions
+
+
+@dataclass(frozen=True)
+class SenderTemplate:
+    """The signature lines of one sender with their parsed metadata."""
+
+    lines: Tuple[str, ...]
+    metadata: SignatureMetadata
+    confidence: float
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def matches(self, lines: Sequence[str]) -> bool:
+        """Return whether ``lines`` end with the template lines."""
+        n = len(self.lines)
+        return len(lines) >= n and tuple(lines[len(lines) - n :]) == self.lines
+
+
+class TemplateStore:
+    """Thread-safe map of sender keys to :class:`SenderTemplate`.
+
+    Signatures below ``min_confidence`` are not learned, a higher-confidence
+    signature replaces a sender's template, and no new senders are added once
+    ``max_senders`` are known.
+    """
+
+    def __init__(
+        self,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+        max_senders: int = DEFAULT_MAX_SENDERS,
+    ) -> None:
+        self.min_confidence = min_confidence
+        self.max_senders = max_senders
+        self._templates: Dict[str, SenderTemplate] = {}
+        self._lock = threading.Lock()
+
+    def get(self, sender: str) -> Optional[SenderTemplate]:
+        return self._templates.get(sender)
+
+    def learn(
+        self, sender: str, lines: List[str], metadata: SignatureMetadata, confidence: float
+    ) -> bool:
+        """Keep ``lines`` as the template of ``sender`` if it qualifies."""
+        if not sender or confidence < self.min_confidence:
+            return False
+        with self._lock:
+            current = self._templates.get(sender)
+            if current is None and len(self._templates) >= self.max_senders:
+                return False
+            if current is not None and current.confidence >= confidence:
+                return False
+            self._templates[sender] = SenderTemplate(tuple(lines), metadata, confidence)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._templates)
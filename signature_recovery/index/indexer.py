@@ -2,35 +2,85 @@
 """Indexing helpers for signature recovery."""
 
 import logging
-from typing import Iterable
+from typing import Iterable, List, Optional, Sequence, Tuple
 
 from ..core.extractor import SignatureExtractor
-from ..core.models import Signature
+from ..core.models import Message, Signature
+from ..core.parallel import DEFAULT_CHUNK_SIZE
 from .search_index import SearchIndex
 
 logger = logging.getLogger(__name__)
 
 
-def add_batch(index: SearchIndex, signatures: Iterable[Signature]) -> None:
-    """Add a batch of signatures to the index."""
-    index.add_batch(signatures)
+def add_batch(
+    index: SearchIndex,
+    signatures: Iterable[Signature],
+    checkpoint: Optional[Tuple[str, str, int]] = None,
+    processed: Sequence[Tuple[str, str, str, str]] = (),
+    clustered: bool = False,
+) -> int:
+    """Add a batch of signatures to the index and return how many were stored.
 
+    ``checkpoint`` and the ``processed`` message entries are committed in the
+    same transaction as the signatures. With ``clustered`` near-duplicates of
+    already indexed signatures are merged into them (``index.add_clustered``)
+    instead of stored.
+    """
+    signatures = list(signatures)
+    if clustered:
+        return index.add_clustered(signatures, checkpoint=checkpoint, processed=processed)
+    if checkpoint is None and not processed:
+        index.add_batch(signatures)
+    else:
+        index.add_batch(signatures, checkpoint=checkpoint, processed=processed)
+    return len(signatures)
 
-def index_pst(pst_path: str, index: SearchIndex) -> None:
-    """Extract signatures from ``pst_path`` and add them to ``index``."""
+
+def index_pst(pst_path: str, index: SearchIndex, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Extract signatures from ``pst_path`` and add them to ``index``.
+
+    Messages are extracted ``chunk_size`` at a time with
+    ``SignatureExtractor.extract_many``.
+    """
     logger.info("Indexing %s", pst_path)
     from ..core.pst_parser import PSTParser
 
     parser = PSTParser(pst_path)
     extractor = SignatureExtractor()
-    for msg in parser.iter_messages():
+    chunk: List[Message] = []
+    for msg in parser.iter_messages(lazy=True):
+        chunk.append(msg)
+        if len(chunk) >= chunk_size:
+            _index_chunk(extractor, chunk, index)
+            chunk = []
+    if chunk:
+        _index_chunk(extractor, chunk, index)
+
+
+def _index_chunk(extractor: SignatureExtractor, chunk: List[Message], index: SearchIndex) -> None:
+    chunk = [msg for msg in chunk if not _skipped(extractor, msg)]
+    found: List[Signature] = []
+    for msg, sig in zip(chunk, extractor.extract_many(chunk)):
+        if sig is not None:
+            found.append(sig)
+        if extractor.mine_quoted:
+            try:
+                found.extend(extractor.extract_quoted(msg.body, msg.msg_id, msg.timestamp))
+            except Exception:
+                continue  # unreadable body, already logged by extract_many
+    for sig in found:
         try:
-            sig = extractor.extract_signature(msg.body, msg.msg_id, msg.timestamp)
-            if sig:
-                index.add(sig)
+            index.add(sig)
         except Exception as exc:  # pragma: no cover - defensive
             logger.error(
                 "indexing failed: %s",
                 exc,
-                extra={"component": "indexer", "msg_id": msg.msg_id},
+                extra={"component": "indexer", "msg_id": sig.source_msg_id},
             )
+
+
+def _skipped(extractor: SignatureExtractor, msg: Message) -> bool:
+    try:
+        return extractor.skip_reason(msg) is not None
+    except Exception:
+        return False  # unreadable body, logged by extract_many
@@ -1,15 +1,47 @@
 #!/usr/bin/env python3
-"""Search index interface and SQLite implementation."""
+"""Search index interface and SQLite implementation.
+
+Besides the FTS5 ``signatures`` table, :class:`SQLiteFTSIndex` keeps the
+canonical contact keys of each signature (see :mod:`..core.contacts`) in the
+B-tree indexed ``signature_contacts`` table: FTS5 columns cannot carry a
+regular index, so exact phone, email and domain lookups go through it.
+
+With :meth:`SQLiteFTSIndex.add_clustered` every stored signature is also the
+representative of a row of the ``clusters`` table (normalized-text hash and
+MinHash signature), whose LSH band keys are indexed in ``cluster_bands`` and
+whose member message ids are rows of ``cluster_members``. New signatures are
+matched against the clusters of earlier batches, runs and inputs by index
+lookups, so memory use does not grow with the index. Band keys are rebuilt
+when the MinHash layout changes.
+"""
 
 import logging
 import sqlite3
 import json
-from typing import Iterable, List
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from ..core.cache import CachedResult
+from ..core.contacts import ContactKeys, contact_keys, email_key, phone_key, registrable_domain
+from ..core.deduplicator import (
+    BAND_ROWS,
+    NUM_HASHES,
+    SHINGLE_SIZE,
+    band_keys,
+    fingerprint,
+    first_match,
+    merge_into,
+    normalize_text,
+)
 from ..core.models import Signature, SignatureMetadata
 from ..core.logging import retry
 logger = logging.getLogger(__name__)
 
+# Rows read at a time when keys or clusters are added to an existing index
+BACKFILL_BATCH = 1000
+# index_settings key of the MinHash layout the cluster band keys were built with
+BAND_LAYOUT_SETTING = "cluster_band_layout"
+
 
 class SearchIndex:
     """Abstract search index."""
@@ -17,14 +49,81 @@ class SearchIndex:
     def add(self, signature: Signature) -> None:
         raise NotImplementedError
 
-    def add_batch(self, signatures: Iterable[Signature]) -> None:
-        """Add multiple signatures at once."""
+    def add_batch(
+        self,
+        signatures: Iterable[Signature],
+        checkpoint: Optional[Tuple[str, str, int]] = None,
+        processed: Iterable[Tuple[str, str, str, str]] = (),
+    ) -> None:
+        """Add multiple signatures at once.
+
+        ``checkpoint`` is an optional ``(source, folder path, message index)``
+        progress marker saved together with the batch. ``processed`` lists
+        ``(source, msg_id, fingerprint, body hash)`` for every message the
+        batch covers; message ids are only unique within one source.
+        """
         for sig in signatures:
             self.add(sig)
+        if checkpoint is not None:
+            self.save_checkpoint(*checkpoint)
+        processed = list(processed)
+        if processed:
+            self.mark_processed(processed)
+
+    def save_checkpoint(self, source: str, folder_path: str, msg_index: int) -> None:
+        raise NotImplementedError
+
+    def get_checkpoint(self, source: str) -> Optional[Tuple[str, int]]:
+        """Return the last committed ``(folder path, message index)`` for ``source``."""
+        return None
+
+    def mark_processed(self, entries: Iterable[Tuple[str, str, str, str]]) -> None:
+        raise NotImplementedError
+
+    def known_messages(self, source: str) -> Dict[str, Tuple[str, str]]:
+        """Return ``msg_id -> (fingerprint, body hash)`` for processed messages of ``source``."""
+        return {}
+
+    def load_signature_cache(self) -> List[Tuple[str, CachedResult]]:
+        """Return the persisted extraction cache, least recently used first."""
+        return []
+
+    def save_signature_cache(self, items: Iterable[Tuple[str, CachedResult]]) -> None:
+        """Replace the persisted extraction cache with ``items``."""
+
+    def get_setting(self, key: str) -> Optional[str]:
+        """Return the stored index setting ``key``, e.g. the ruleset digest."""
+        return None
+
+    def set_setting(self, key: str, value: str) -> None:
+        """Store index setting ``key``."""
+
+    def add_clustered(
+        self,
+        signatures: Iterable[Signature],
+        threshold: float = 0.85,
+        checkpoint: Optional[Tuple[str, str, int]] = None,
+        processed: Iterable[Tuple[str, str, str, str]] = (),
+    ) -> int:
+        """Add signatures, merging near-duplicates of already indexed ones.
+
+        Returns how many signatures were added rather than merged.
+        """
+        raise NotImplementedError
 
     def query(self, q: str | None = None, *, min_confidence: float = 0.0) -> List[Signature]:
         raise NotImplementedError
 
+    def find_by_contact(
+        self,
+        *,
+        phone: Optional[str] = None,
+        email: Optional[str] = None,
+        domain: Optional[str] = None,
+    ) -> List[Signature]:
+        """Return signatures whose canonical contact keys equal every given one."""
+        raise NotImplementedError
+
 
 class SQLiteFTSIndex(SearchIndex):
     """SQLite full-text search implementation."""
@@ -37,6 +136,26 @@ class SQLiteFTSIndex(SearchIndex):
     def _commit(self):
         self.conn.commit()
 
+    def _ensure_processed_table(self, cur) -> None:
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS processed_messages ("
+            "source TEXT NOT NULL DEFAULT '', msg_id TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL, body_hash TEXT NOT NULL,"
+            " PRIMARY KEY (source, msg_id)"
+            ")"
+        )
+        cur.execute("PRAGMA table_info(processed_messages)")
+        if "source" not in {row[1] for row in cur.fetchall()}:
+            # Rows of indexes keyed by msg_id alone keep an empty source,
+            # which known_messages() treats as matching every source
+            cur.execute("ALTER TABLE processed_messages RENAME TO processed_messages_old")
+            self._ensure_processed_table(cur)
+            cur.execute(
+                "INSERT INTO processed_messages (source, msg_id, fingerprint, body_hash)"
+                " SELECT '', msg_id, fingerprint, body_hash FROM processed_messages_old"
+            )
+            cur.execute("DROP TABLE processed_messages_old")
+
     def _ensure_schema(self) -> None:
         cur = self.conn.cursor()
         cur.execute(
@@ -45,39 +164,446 @@ class SQLiteFTSIndex(SearchIndex):
             "source_msg_id, timestamp, text, confidence UNINDEXED, metadata UNINDEXED"
             ")"
         )
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "source TEXT PRIMARY KEY, folder_path TEXT NOT NULL, msg_index INTEGER NOT NULL"
+            ")"
+        )
+        self._ensure_processed_table(cur)
+        cur.execute("PRAGMA table_info(signature_cache)")
+        columns = {row[1] for row in cur.fetchall()}
+        if columns and "text" not in columns:
+            # Entries keyed by signature block; they can never match again
+            cur.execute("DROP TABLE signature_cache")
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS signature_cache ("
+            "key TEXT PRIMARY KEY, position INTEGER NOT NULL, boundary INTEGER NOT NULL,"
+            " text TEXT NOT NULL, metadata TEXT NOT NULL, confidence REAL NOT NULL"
+            ")"
+        )
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS index_settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        # rowid matches the signatures rowid; every signature has a row
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS signature_contacts ("
+            "rowid INTEGER PRIMARY KEY, phone_key TEXT, email_key TEXT, domain_key TEXT"
+            ")"
+        )
+        for column in ("phone_key", "email_key", "domain_key"):
+            cur.execute(
+                f"CREATE INDEX IF NOT EXISTS signature_contacts_{column}"
+                f" ON signature_contacts ({column})"
+            )
+        self._backfill_contacts(cur)
+        cur.execute("PRAGMA table_info(clusters)")
+        legacy = "members" in {row[1] for row in cur.fetchall()}
+        if legacy:
+            cur.execute("DROP INDEX IF EXISTS clusters_norm_hash")
+            cur.execute("ALTER TABLE clusters RENAME TO clusters_old")
+        # One row per stored signature added by add_clustered
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS clusters ("
+            "id INTEGER PRIMARY KEY, signature_rowid INTEGER NOT NULL UNIQUE,"
+            " text TEXT NOT NULL, norm_hash TEXT NOT NULL, minhash BLOB NOT NULL"
+            ")"
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS clusters_norm_hash ON clusters (norm_hash)")
+        # Message ids merged into each cluster, in merge order
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS cluster_members ("
+            "cluster_id INTEGER NOT NULL, signature_id TEXT NOT NULL,"
+            " UNIQUE (cluster_id, signature_id)"
+            ")"
+        )
+        if legacy:
+            self._migrate_cluster_members(cur)
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS cluster_bands ("
+            "band_key INTEGER NOT NULL, cluster_id INTEGER NOT NULL,"
+            " PRIMARY KEY (band_key, cluster_id)"
+            ") WITHOUT ROWID"
+        )
+        self._clusters_ready = False
         self.conn.commit()
 
     def add(self, signature: Signature) -> None:
         logger.debug("Indexing signature")
-        cur = self.conn.cursor()
-        cur.execute(
-            "INSERT INTO signatures (source_msg_id, timestamp, text, confidence, metadata)"
-            " VALUES (?,?,?,?,?)",
-            (
-                signature.source_msg_id,
-                signature.timestamp or "",
-                signature.text,
-                signature.confidence,
-                json.dumps(signature.metadata.__dict__),
-            ),
-        )
+        self._insert(self.conn.cursor(), [signature])
         self._commit()
 
-    def add_batch(self, signatures: Iterable[Signature]) -> None:
+    def add_batch(
+        self,
+        signatures: Iterable[Signature],
+        checkpoint: Optional[Tuple[str, str, int]] = None,
+        processed: Iterable[Tuple[str, str, str, str]] = (),
+    ) -> None:
         logger.debug("Indexing batch of signatures")
         cur = self.conn.cursor()
-        cur.executemany(
-            "INSERT INTO signatures (source_msg_id, timestamp, text, confidence, metadata)"
-            " VALUES (?,?,?,?,?)",
-            [
+        self._insert(cur, signatures)
+        if checkpoint is not None:
+            self._write_checkpoint(cur, *checkpoint)
+        self._write_processed(cur, processed)
+        self._commit()
+
+    def _insert(self, cur, signatures: Iterable[Signature]) -> int:
+        """Insert ``signatures`` and return the rowid of the first one."""
+        # Explicit rowids tie each signature to its contact keys row
+        cur.execute("SELECT COALESCE(MAX(rowid), 0) FROM signatures")
+        first = cur.fetchone()[0] + 1
+        rows = []
+        contacts = []
+        for rowid, sig in enumerate(signatures, first):
+            rows.append(
                 (
+                    rowid,
                     sig.source_msg_id,
                     sig.timestamp or "",
                     sig.text,
                     sig.confidence,
                     json.dumps(sig.metadata.__dict__),
                 )
-                for sig in signatures
+            )
+            contacts.append((rowid, *contact_keys(sig.metadata)))
+        cur.executemany(
+            "INSERT INTO signatures (rowid, source_msg_id, timestamp, text, confidence, metadata)"
+            " VALUES (?,?,?,?,?,?)",
+            rows,
+        )
+        cur.executemany(
+            "INSERT OR REPLACE INTO signature_contacts (rowid, phone_key, email_key, domain_key)"
+            " VALUES (?,?,?,?)",
+            contacts,
+        )
+        return first
+
+    def _backfill_contacts(self, cur) -> None:
+        """Add contact keys for signatures indexed before the keys existed."""
+        cur.execute("SELECT COALESCE(MAX(rowid), 0) FROM signature_contacts")
+        last = cur.fetchone()[0]
+        added = 0
+        while True:
+            cur.execute(
+                "SELECT rowid, metadata FROM signatures WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last, BACKFILL_BATCH),
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+            cur.executemany(
+                "INSERT OR REPLACE INTO signature_contacts"
+                " (rowid, phone_key, email_key, domain_key) VALUES (?,?,?,?)",
+                [(rowid, *contact_keys(_metadata(raw))) for rowid, raw in rows],
+            )
+            last = rows[-1][0]
+            added += len(rows)
+        if added:
+            logger.info("Added contact keys for %d indexed signatures", added)
+
+    def add_clustered(
+        self,
+        signatures: Iterable[Signature],
+        threshold: float = 0.85,
+        checkpoint: Optional[Tuple[str, str, int]] = None,
+        processed: Iterable[Tuple[str, str, str, str]] = (),
+    ) -> int:
+        """Add signatures, merging near-duplicates of already indexed ones.
+
+        Each signature is compared, in cluster order, with the clusters that
+        have the same normalized text, share an LSH band with it or whose
+        stored signature has the same canonical phone or email key, using
+        the ``dedupe_signatures`` similarity and ``threshold``. A match is
+        merged into the cluster's stored signature with the same rules
+        (earliest timestamp, missing metadata filled, highest confidence)
+        and its message id added to the members; otherwise the signature is
+        stored and starts a cluster. Signatures within the batch are matched
+        the same way. Everything is committed in one transaction with
+        ``checkpoint`` and ``processed``. Returns how many signatures were
+        stored rather than merged.
+        """
+        logger.debug("Indexing clustered batch of signatures")
+        cur = self.conn.cursor()
+        if not self._clusters_ready:
+            self._prepare_clusters(cur)
+            self._clusters_ready = True
+        added = 0
+        for sig in signatures:
+            norm, norm_hash, signature = fingerprint(sig.text)
+            keys = band_keys(signature)
+            candidates = self._cluster_candidates(cur, norm_hash, keys, contact_keys(sig.metadata))
+            match = first_match(sig, norm, candidates, threshold)
+            if match is not None:
+                self._merge_cluster(cur, match[0], sig)
+                continue
+            rowid = self._insert(cur, [sig])
+            self._add_cluster(cur, rowid, sig, norm_hash, signature, keys)
+            added += 1
+        if checkpoint is not None:
+            self._write_checkpoint(cur, *checkpoint)
+        self._write_processed(cur, processed)
+        self._commit()
+        return added
+
+    def _cluster_candidates(self, cur, norm_hash: str, keys: List[int], contacts: ContactKeys):
+        """Yield ``(cluster id, normalized text)`` of possible duplicates, oldest first.
+
+        Besides band and exact-text matches, clusters whose stored signature
+        shares the phone or email key of ``contacts`` are candidates, which
+        catches duplicates whose edits left no band in common. Domains are
+        left out: they block whole companies.
+        """
+        marks = ",".join("?" * len(keys))
+        sql = (
+            "SELECT id, text FROM clusters WHERE id IN ("
+            f"SELECT cluster_id FROM cluster_bands WHERE band_key IN ({marks})"
+            " UNION SELECT id FROM clusters WHERE norm_hash = ?"
+        )
+        params: List[Any] = [*keys, norm_hash]
+        for column, value in (("phone_key", contacts.phone), ("email_key", contacts.email)):
+            if value is not None:
+                sql += (
+                    " UNION SELECT c.id FROM signature_contacts AS k"
+                    f" JOIN clusters AS c ON c.signature_rowid = k.rowid WHERE k.{column} = ?"
+                )
+                params.append(value)
+        cur.execute(sql + ") ORDER BY id", params)
+        for cluster_id, text in cur.fetchall():
+            yield cluster_id, normalize_text(text)
+
+    def _add_cluster(self, cur, rowid: int, sig: Signature, norm_hash: str, signature, keys) -> None:
+        cur.execute(
+            "INSERT INTO clusters (signature_rowid, text, norm_hash, minhash) VALUES (?,?,?,?)",
+            (rowid, sig.text, norm_hash, array("H", signature).tobytes()),
+        )
+        cluster_id = cur.lastrowid
+        cur.execute(
+            "INSERT OR IGNORE INTO cluster_members (cluster_id, signature_id) VALUES (?,?)",
+            (cluster_id, sig.source_msg_id),
+        )
+        cur.executemany(
+            "INSERT OR IGNORE INTO cluster_bands (band_key, cluster_id) VALUES (?,?)",
+            [(key, cluster_id) for key in keys],
+        )
+
+    def _merge_cluster(self, cur, cluster_id: int, sig: Signature) -> None:
+        cur.execute(
+            "SELECT c.signature_rowid, s.source_msg_id, s.timestamp, s.text,"
+            " s.confidence, s.metadata"
+            " FROM clusters AS c JOIN signatures AS s ON s.rowid = c.signature_rowid"
+            " WHERE c.id = ?",
+            (cluster_id,),
+        )
+        rowid, *row = cur.fetchone()
+        unique = _row_signature(row)
+        merge_into(unique, sig)
+        cur.execute(
+            "UPDATE signatures SET timestamp = ?, confidence = ?, metadata = ? WHERE rowid = ?",
+            (unique.timestamp or "", unique.confidence, json.dumps(unique.metadata.__dict__), rowid),
+        )
+        cur.execute(
+            "INSERT OR REPLACE INTO signature_contacts (rowid, phone_key, email_key, domain_key)"
+            " VALUES (?,?,?,?)",
+            (rowid, *contact_keys(unique.metadata)),
+        )
+        cur.execute(
+            "INSERT OR IGNORE INTO cluster_members (cluster_id, signature_id) VALUES (?,?)",
+            (cluster_id, sig.source_msg_id),
+        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Merged signature %s into indexed %s",
+                sig.source_msg_id,
+                unique.source_msg_id,
+                extra={"component": "deduplicator", "msg_id": sig.source_msg_id},
+            )
+
+    def _prepare_clusters(self, cur) -> None:
+        """Rebuild band keys of another MinHash layout, then cluster unclustered signatures."""
+        layout = f"{SHINGLE_SIZE}/{NUM_HASHES}/{BAND_ROWS}"
+        cur.execute("SELECT value FROM index_settings WHERE key = ?", (BAND_LAYOUT_SETTING,))
+        row = cur.fetchone()
+        if row is None or row[0] != layout:
+            self._rebuild_cluster_bands(cur)
+            cur.execute(
+                "INSERT OR REPLACE INTO index_settings (key, value) VALUES (?,?)",
+                (BAND_LAYOUT_SETTING, layout),
+            )
+        self._backfill_clusters(cur)
+
+    def _rebuild_cluster_bands(self, cur) -> None:
+        """Recompute the MinHash signature and band keys of every cluster."""
+        cur.execute("DELETE FROM cluster_bands")
+        last = 0
+        rebuilt = 0
+        while True:
+            cur.execute(
+                "SELECT id, text FROM clusters WHERE id > ? ORDER BY id LIMIT ?",
+                (last, BACKFILL_BATCH),
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+            minhashes = []
+            bands = []
+            for cluster_id, text in rows:
+                signature = fingerprint(text)[2]
+                minhashes.append((array("H", signature).tobytes(), cluster_id))
+                bands.extend((key, cluster_id) for key in band_keys(signature))
+            cur.executemany("UPDATE clusters SET minhash = ? WHERE id = ?", minhashes)
+            cur.executemany(
+                "INSERT OR IGNORE INTO cluster_bands (band_key, cluster_id) VALUES (?,?)", bands
+            )
+            last = rows[-1][0]
+            rebuilt += len(rows)
+        if rebuilt:
+            logger.info("Rebuilt dedupe band keys of %d clusters", rebuilt)
+
+    def _backfill_clusters(self, cur) -> None:
+        """Start a cluster for every signature stored without one."""
+        last = 0
+        added = 0
+        while True:
+            cur.execute(
+                "SELECT rowid, source_msg_id, timestamp, text, confidence, metadata FROM signatures"
+                " WHERE rowid > ? AND rowid NOT IN (SELECT signature_rowid FROM clusters)"
+                " ORDER BY rowid LIMIT ?",
+                (last, BACKFILL_BATCH),
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+            for rowid, *row in rows:
+                sig = _row_signature(row)
+                _, norm_hash, signature = fingerprint(sig.text)
+                self._add_cluster(cur, rowid, sig, norm_hash, signature, band_keys(signature))
+            last = rows[-1][0]
+            added += len(rows)
+        if added:
+            logger.info("Added dedupe clusters for %d indexed signatures", added)
+
+    def _migrate_cluster_members(self, cur) -> None:
+        """Move the clusters of ``clusters_old`` and their JSON member lists to the new tables."""
+        cur.execute(
+            "INSERT INTO clusters (id, signature_rowid, text, norm_hash, minhash)"
+            " SELECT id, signature_rowid, text, norm_hash, minhash FROM clusters_old"
+        )
+        last = 0
+        while True:
+            cur.execute(
+                "SELECT id, members FROM clusters_old WHERE id > ? ORDER BY id LIMIT ?",
+                (last, BACKFILL_BATCH),
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+            cur.executemany(
+                "INSERT OR IGNORE INTO cluster_members (cluster_id, signature_id) VALUES (?,?)",
+                [(cluster_id, member) for cluster_id, members in rows for member in json.loads(members)],
+            )
+            last = rows[-1][0]
+        cur.execute("DROP TABLE clusters_old")
+
+    def clusters(self) -> List[Tuple[str, List[str]]]:
+        """Return ``(representative text, member message ids)`` of every cluster."""
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT c.id, c.text, m.signature_id FROM clusters AS c"
+            " JOIN cluster_members AS m ON m.cluster_id = c.id ORDER BY c.id, m.rowid"
+        )
+        clusters: List[Tuple[str, List[str]]] = []
+        last = None
+        for cluster_id, text, member in cur.fetchall():
+            if cluster_id != last:
+                clusters.append((text, []))
+                last = cluster_id
+            clusters[-1][1].append(member)
+        return clusters
+
+    def _write_processed(self, cur, entries: Iterable[Tuple[str, str, str, str]]) -> None:
+        cur.executemany(
+            "INSERT OR REPLACE INTO processed_messages (source, msg_id, fingerprint, body_hash)"
+            " VALUES (?,?,?,?)",
+            entries,
+        )
+
+    def mark_processed(self, entries: Iterable[Tuple[str, str, str, str]]) -> None:
+        """Record ``(source, msg_id, fingerprint, body hash)`` entries as processed."""
+        self._write_processed(self.conn.cursor(), entries)
+        self._commit()
+
+    def known_messages(self, source: str) -> Dict[str, Tuple[str, str]]:
+        cur = self.conn.cursor()
+        # Entries recorded for ``source`` override those of older indexes without one
+        cur.execute(
+            "SELECT msg_id, fingerprint, body_hash FROM processed_messages"
+            " WHERE source IN ('', ?) ORDER BY source = ?",
+            (source, source),
+        )
+        return {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+    def _write_checkpoint(self, cur, source: str, folder_path: str, msg_index: int) -> None:
+        cur.execute(
+            "INSERT OR REPLACE INTO checkpoints (source, folder_path, msg_index)"
+            " VALUES (?,?,?)",
+            (source, folder_path, msg_index),
+        )
+
+    def save_checkpoint(self, source: str, folder_path: str, msg_index: int) -> None:
+        """Record ``(folder_path, msg_index)`` as the last committed message."""
+        self._write_checkpoint(self.conn.cursor(), source, folder_path, msg_index)
+        self._commit()
+
+    def get_checkpoint(self, source: str) -> Optional[Tuple[str, int]]:
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT folder_path, msg_index FROM checkpoints WHERE source = ?",
+            (source,),
+        )
+        row = cur.fetchone()
+        return (row[0], int(row[1])) if row else None
+
+    def get_setting(self, key: str) -> Optional[str]:
+        cur = self.conn.cursor()
+        cur.execute("SELECT value FROM index_settings WHERE key = ?", (key,))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    def set_setting(self, key: str, value: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO index_settings (key, value) VALUES (?,?)", (key, value)
+        )
+        self._commit()
+
+    def load_signature_cache(self) -> List[Tuple[str, CachedResult]]:
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT key, boundary, text, metadata, confidence FROM signature_cache"
+            " ORDER BY position"
+        )
+        return [
+            (
+                row[0],
+                CachedResult(row[1], row[2], SignatureMetadata(**json.loads(row[3])), float(row[4])),
+            )
+            for row in cur.fetchall()
+        ]
+
+    def save_signature_cache(self, items: Iterable[Tuple[str, CachedResult]]) -> None:
+        cur = self.conn.cursor()
+        cur.execute("DELETE FROM signature_cache")
+        cur.executemany(
+            "INSERT INTO signature_cache (key, position, boundary, text, metadata, confidence)"
+            " VALUES (?,?,?,?,?,?)",
+            [
+                (
+                    key,
+                    pos,
+                    entry.boundary,
+                    entry.text,
+                    json.dumps(entry.metadata.__dict__),
+                    entry.confidence,
+                )
+                for pos, (key, entry) in enumerate(items)
             ],
         )
         self._commit()
@@ -115,17 +641,51 @@ class SQLiteFTSIndex(SearchIndex):
         )
 
         cur.execute(sql, params)
-        rows = cur.fetchall()
-        result = []
-        for row in rows:
-            meta = SignatureMetadata(**json.loads(row[4])) if row[4] else SignatureMetadata()
-            result.append(
-                Signature(
-                    text=row[2],
-                    source_msg_id=row[0],
-                    timestamp=row[1],
-                    metadata=meta,
-                    confidence=float(row[3]),
-                )
-            )
-        return result
+        return [_row_signature(row) for row in cur.fetchall()]
+
+    def find_by_contact(
+        self,
+        *,
+        phone: Optional[str] = None,
+        email: Optional[str] = None,
+        domain: Optional[str] = None,
+    ) -> List[Signature]:
+        """Return signatures whose canonical contact keys equal every given one.
+
+        ``phone``, ``email`` and ``domain`` may be spelled any way the parser
+        sees them (``(555) 123-4567``, ``John@ACME.com``, ``mail.acme.com``);
+        they are reduced to their keys first, so each lookup is an index seek.
+        A value that has no key, or no value at all, matches nothing.
+        """
+        given = (
+            ("phone_key", phone, phone_key),
+            ("email_key", email, email_key),
+            ("domain_key", domain, registrable_domain),
+        )
+        wanted = {col: canon(value) for col, value, canon in given if value is not None}
+        if not wanted or None in wanted.values():
+            return []
+        where_sql = " AND ".join(f"c.{col} = :{col}" for col in wanted)
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT s.source_msg_id, s.timestamp, s.text, s.confidence, s.metadata"
+            " FROM signature_contacts AS c JOIN signatures AS s ON s.rowid = c.rowid"
+            f" WHERE {where_sql} ORDER BY c.rowid",
+            wanted,
+        )
+        return [_row_signature(row) for row in cur.fetchall()]
+
+
+def _metadata(raw: Optional[str]) -> SignatureMetadata:
+    return SignatureMetadata(**json.loads(raw)) if raw else SignatureMetadata()
+
+
+def _row_signature(row) -> Signature:
+    """Build a signature from a ``source_msg_id, timestamp, text, confidence, metadata`` row."""
+    return Signature(
+        text=row[2],
+        source_msg_id=row[0],
+        timestamp=row[1],
+        metadata=_metadata(row[4]),
+        confidence=float(row[3]),
+    )
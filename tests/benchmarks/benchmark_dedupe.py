@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Measure dedupe time per signature as the batch grows, per engine.
+
+The MinHash engine grows much slower than the exhaustive one, which is
+quadratic and so only runs up to ``--exhaustive-max`` signatures. Its
+two-row bands favour recall, so colleagues sharing company, title and
+domain lines still become candidates of each other, and the largest
+default size is kept moderate.
+"""
+
+# Imports
+import argparse
+import csv
+import random
+import time
+
+from template import log_message
+from signature_recovery.core.deduplicator import dedupe_signatures
+from signature_recovery.core.models import Signature
+
+# Logging
+
+# Globals
+FIRST = ["John", "Jane", "Bob", "Alice", "Maria", "Wei", "Omar", "Lena", "Ravi", "Sofia", "Ken", "Ada"]
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "ber", "dan", "gor", "lin", "mar", "son", "tal", "wen"]
+TITLES = ["Engineer", "Sales Manager", "Director", "Analyst", "Counsel", "Consultant", "Accountant"]
+COMPANIES = ["ACME", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Tyrell", "Cyberdyne"]
+SUFFIXES = ["Inc", "LLC", "Ltd", "GmbH", "Corp"]
+COMPANY_SIZE = 50
+
+# Classes/Functions
+
+
+def _surname(n: int) -> str:
+    """Return a surname unique to ``n``, built from its base-16 digits."""
+    parts = []
+    while True:
+        n, digit = divmod(n, len(SYLLABLES))
+        parts.append(SYLLABLES[digit])
+        if not n:
+            return "".join(parts).capitalize()
+
+
+def _signatures(count: int, seed: int = 0) -> list[Signature]:
+    """Return ``count`` signatures of about ``count // 4`` people with small variations."""
+    rnd = random.Random(seed)
+    people = max(1, count // 4)
+    sigs = []
+    for i in range(count):
+        p = rnd.randrange(people)
+        first, last = FIRST[p % len(FIRST)], _surname(p)
+        # companies of about COMPANY_SIZE people
+        company = f"{COMPANIES[p % len(COMPANIES)]}{p // (COMPANY_SIZE * len(COMPANIES)) or ''} {SUFFIXES[p % len(SUFFIXES)]}"
+        domain = company.split()[0].lower()
+        text = (
+            f"{first} {last}\n{TITLES[p % len(TITLES)]}\n{company}\n"
+            f"+1 {200 + p % 800} {p % 1000:03d} {p % 10000:04d}\n{first.lower()}.{last.lower()}@{domain}.com"
+        )
+        variant = rnd.random()
+        if variant < 0.2:
+            text = text.upper()
+        elif variant < 0.4:
+            text = text.replace("\n", " | ")
+        elif variant < 0.5:
+            text += f"\nwww.{domain}.com"
+        sigs.append(Signature(text=text, source_msg_id=str(i), timestamp=str(i)))
+    return sigs
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark signature deduplication engines")
+    parser.add_argument("--out", default="benchmark_dedupe.csv", help="CSV output path")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[500, 5000, 20000])
+    parser.add_argument(
+        "--exhaustive-max", type=int, default=500, help="Largest batch to run the exhaustive engine on"
+    )
+    parser.add_argument("--threshold", type=float, default=0.85)
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        for engine in ("exhaustive", "minhash"):
+            if engine == "exhaustive" and size > args.exhaustive_max:
+                continue
+            log_message("info", f"Running {engine} size={size}")
+            sigs = _signatures(size)
+            start = time.perf_counter()
+            uniques = dedupe_signatures(sigs, threshold=args.threshold, engine=engine)
+            elapsed = time.perf_counter() - start
+            results.append(
+                {
+                    "engine": engine,
+                    "signatures": size,
+                    "uniques": len(uniques),
+                    "seconds": elapsed,
+                    "us_per_signature": elapsed / size * 1e6 if size else 0.0,
+                }
+            )
+
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=["engine", "signatures", "uniques", "seconds", "us_per_signature"]
+        )
+        writer.writeheader()
+        writer.writerows(results)
+    log_message("info", f"Results written to {args.out}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Measure parse time as the title and company dictionaries grow."""
+
+# Imports
+import argparse
+import csv
+import itertools
+import os
+import tempfile
+import time
+
+from template import log_message
+from signature_recovery.core.config import DEFAULT_CONFIG
+from signature_recovery.core.parser import SignatureParser
+from signature_recovery.core.ruleset import Ruleset
+
+# Logging
+
+# Globals
+LEVELS = ["", "Senior ", "Junior ", "Lead ", "Principal ", "Chief ", "Head of ", "Deputy "]
+AREAS = ["Software", "Data", "Sales", "Finance", "Legal", "Product", "Security", "Clinical", "Tax", "Audit"]
+ROLES = ["Engineer", "Manager", "Analyst", "Architect", "Designer", "Scientist", "Counsel", "Planner"]
+BLOCKS = [
+    "John Doe\nSenior Software Engineer\nACME Holdings GmbH\n555-555-1234\njohn@example.com",
+    "Jane Smith | Head of Legal | Example S.p.A.\nPhone: 123.456.7890\nwww.example.it",
+    "Best regards,\nBob Brown\nBig Co\n(555) 321-0000\nbob@big.co",
+]
+
+# Classes/Functions
+
+
+def _titles(count: int) -> list[str]:
+    combos = itertools.product(LEVELS, AREAS, ROLES, range(count // (len(LEVELS) * len(AREAS) * len(ROLES)) + 1))
+    return [f"{level}{area} {role} {n}" if n else f"{level}{area} {role}" for level, area, role, n in itertools.islice(combos, count)]
+
+
+def _suffixes(count: int) -> list[str]:
+    base = ["Inc", "LLC", "Ltd", "GmbH", "S.p.A.", "S.A.", "B.V.", "AG", "Oy", "K.K."]
+    return [s if i < len(base) else f"{s} {i}" for i, s in zip(range(count), itertools.cycle(base))]
+
+
+def _naive(titles: list[str], suffixes: tuple[str, ...], blocks: list[str]) -> float:
+    """Title and company checks as a scan over every entry, for comparison."""
+    lowered = [t.lower() for t in titles]
+    start = time.perf_counter()
+    for text in blocks:
+        for line in text.splitlines():
+            lower = line.lower()
+            any(k in lower for k in lowered)
+            line.endswith(suffixes)
+    return time.perf_counter() - start
+
+
+def _write(path: str, entries: list[str]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(entries))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark title/company dictionary size")
+    parser.add_argument("--out", default="benchmark_dictionaries.csv", help="CSV output path")
+    parser.add_argument("--blocks", type=int, default=3000, help="Number of signature blocks to parse")
+    parser.add_argument("--entries", nargs="*", type=int, default=[0, 10000, 100000])
+    parser.add_argument("--naive-blocks", type=int, default=100, help="Blocks for the per-entry scan")
+    args = parser.parse_args(argv)
+
+    blocks = [BLOCKS[i % len(BLOCKS)] for i in range(args.blocks)]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.entries:
+            log_message("info", f"Running entries={count}")
+            titles = os.path.join(tmp, f"titles{count}.txt")
+            suffixes = os.path.join(tmp, f"suffixes{count}.txt")
+            title_list, suffix_list = _titles(count), _suffixes(count)
+            _write(titles, title_list)
+            _write(suffixes, suffix_list)
+            config = {
+                **DEFAULT_CONFIG,
+                "parser": {
+                    **DEFAULT_CONFIG["parser"],
+                    "title_keywords_file": titles,
+                    "company_suffixes_file": suffixes,
+                },
+            }
+            start = time.perf_counter()
+            ruleset = Ruleset.from_config(config)
+            build_s = time.perf_counter() - start
+            sig_parser = SignatureParser(config, ruleset)
+            start = time.perf_counter()
+            for text in blocks:
+                sig_parser.parse(text)
+            elapsed = time.perf_counter() - start
+            naive_blocks = blocks[: args.naive_blocks]
+            naive = _naive(title_list, tuple(suffix_list), naive_blocks)
+            results.append(
+                {
+                    "entries": count,
+                    "build_s": build_s,
+                    "us_per_block": elapsed / len(blocks) * 1e6 if blocks else 0.0,
+                    "naive_us_per_block": naive / len(naive_blocks) * 1e6 if naive_blocks else 0.0,
+                }
+            )
+
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["entries", "build_s", "us_per_block", "naive_us_per_block"])
+        writer.writeheader()
+        writer.writerows(results)
+    log_message("info", f"Results written to {args.out}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
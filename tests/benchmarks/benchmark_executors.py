@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Compare thread and process extraction throughput on the same corpus."""
+
+# Imports
+import argparse
+import csv
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+from template import log_message
+from signature_recovery.core.extractor import SignatureExtractor
+from signature_recovery.core.models import Message
+from signature_recovery.core.parallel import init_worker
+from signature_recovery.core.pipeline import ExtractionPipeline
+
+# Logging
+
+# Globals
+
+# Classes/Functions
+
+def _corpus(n: int):
+    for i in range(n):
+        body = (
+            "<html><body><p>Hello team,</p>"
+            + "<p>Status update for the quarter follows.</p>" * 20
+            + f"<p>Best regards,<br>User {i}<br>Engineer<br>Example Corp<br>"
+            f"user{i}@example.com<br>+1 555 010 {i % 10000:04d}</p></body></html>"
+        )
+        yield Message(body=body, msg_id=str(i), timestamp=float(i))
+
+
+def _run_once(num_messages: int, executor: str, workers: int, chunk_size: int) -> float:
+    def sink(sigs, processed, position):
+        pass
+
+    start = time.time()
+    if executor == "process":
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            ExtractionPipeline(
+                None, sink, workers=2 * workers, pool=pool, chunk_size=chunk_size
+            ).run(_corpus(num_messages))
+    else:
+        ExtractionPipeline(SignatureExtractor(), sink, workers=workers).run(_corpus(num_messages))
+    elapsed = time.time() - start
+    return num_messages / elapsed if elapsed else 0.0
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark thread vs process extraction")
+    parser.add_argument("--out", default="benchmark_executors.csv", help="CSV output path")
+    parser.add_argument("--messages", type=int, default=500, help="Number of synthetic messages")
+    parser.add_argument("--workers", nargs="*", type=int, default=[1, 2])
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    results = []
+    for executor, w in product(["thread", "process"], args.workers):
+        log_message("info", f"Running executor={executor} workers={w}")
+        rate = _run_once(args.messages, executor, w, args.chunk_size)
+        results.append({"executor": executor, "workers": w, "msgs_per_sec": rate})
+
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["executor", "workers", "msgs_per_sec"])
+        writer.writeheader()
+        writer.writerows(results)
+    log_message("info", f"Results written to {args.out}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Compare the single-pass signature parser with the former multi-pass one."""
+
+# Imports
+import argparse
+import csv
+import re
+import time
+
+from template import log_message
+from signature_recovery.core.parser import EMAIL_RE, NAME_RE, TITLE_KEYWORDS, URL_RE, SignatureParser
+
+# Logging
+
+# Globals
+BLOCKS = [
+    "John Doe\nEngineer\nACME Inc.\n555-555-1234\njohn@example.com\nwww.acme.com\n123 Main St, Springfield, IL 62704",
+    "Jane Smith | Manager | Example LLC\nPhone: 123.456.7890\nEmail: jane@ex.com",
+    "Best regards,\nBob Brown\nDirector of Sales\nBig Co\n(555) 321-0000\nbob@big.co",
+    "Thanks\nIrene Adler\nConsultant\nAdler Consulting\n+44 20 1234 5678\nhttp://adler.co.uk",
+    "--\nGrace Lee\nSent from my iPhone",
+]
+
+# Classes/Functions
+
+
+def _multi_pass(parser: SignatureParser, text: str) -> dict:
+    """One pass per field, as ``SignatureParser.parse`` did before."""
+    lines = [p.strip() for line in text.splitlines() for p in line.split("|") if p.strip()]
+    meta = {}
+    for line in lines:
+        m = EMAIL_RE.search(line)
+        if m:
+            meta["email"] = m.group(0)
+            break
+    for line in lines:
+        m = next((m for m in (rx.search(line) for rx in parser.phone_res) if m), None)
+        if m:
+            meta["phone"] = m.group(0)
+            break
+    for line in lines:
+        m = URL_RE.search(line)
+        if m:
+            meta["url"] = m.group(0)
+            break
+    for line in lines:
+        if EMAIL_RE.search(line) or any(rx.search(line) for rx in parser.phone_res) or URL_RE.search(line):
+            continue
+        if any(k.lower() in line.lower() for k in TITLE_KEYWORDS):
+            continue
+        if line.endswith(("Inc", "Inc.", "LLC", "Ltd", "Corp", "Co", "Company")) or line.isupper() or "consult" in line.lower():
+            continue
+        m = NAME_RE.match(line)
+        if m:
+            meta["name"] = m.group(0)
+            break
+    for line in lines:
+        if any(k.lower() in line.lower() for k in TITLE_KEYWORDS):
+            meta["title"] = line
+            break
+    for line in lines:
+        if line.endswith(("Inc", "Inc.", "LLC", "Ltd", "Corp", "Co", "Company")) or line.isupper() or "consulting" in line.lower():
+            meta["company"] = line.strip(",")
+            break
+    for line in lines:
+        if re.search(r"\d+\s+\w+", line) and ("," in line or any(w in line for w in ["St", "Ave", "Rd", "Road", "Blvd"])):
+            meta["address"] = line
+            break
+    return meta
+
+
+def _time(run, blocks: list[str]) -> float:
+    start = time.perf_counter()
+    for text in blocks:
+        run(text)
+    return time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark signature parsing")
+    parser.add_argument("--out", default="benchmark_parser.csv", help="CSV output path")
+    parser.add_argument("--blocks", type=int, default=5000, help="Number of signature blocks to parse")
+    args = parser.parse_args(argv)
+
+    sig_parser = SignatureParser()
+    blocks = [BLOCKS[i % len(BLOCKS)] for i in range(args.blocks)]
+    results = []
+    for engine, run in (
+        ("multi_pass", lambda text: _multi_pass(sig_parser, text)),
+        ("single_pass", sig_parser.parse),
+    ):
+        log_message("info", f"Running {engine}")
+        elapsed = _time(run, blocks)
+        results.append(
+            {
+                "engine": engine,
+                "blocks": len(blocks),
+                "us_per_block": elapsed / len(blocks) * 1e6 if blocks else 0.0,
+            }
+        )
+
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["engine", "blocks", "us_per_block"])
+        writer.writeheader()
+        writer.writerows(results)
+    log_message("info", f"Results written to {args.out}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
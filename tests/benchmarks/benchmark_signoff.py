@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Measure sign-off detection cost as the number of configured patterns grows."""
+
+# Imports
+import argparse
+import csv
+import re
+import time
+
+from template import log_message
+from signature_recovery.core.extractor import RegexSignOffHeuristic
+
+# Logging
+
+# Globals
+SIGNOFFS = [
+    "thanks", "thank you", "regards", "best regards", "kind regards", "cheers",
+    "sincerely", "mit freundlichen grüßen", "viele grüße", "cordialement",
+    "bien à vous", "saludos", "atentamente", "cordiali saluti", "distinti saluti",
+    "met vriendelijke groet", "med vänliga hälsningar", "с уважением", "敬具",
+    "よろしくお願いします", "此致敬礼", "atenciosamente", "pozdrawiam", "s pozdravem",
+]
+
+# Classes/Functions
+
+
+def _patterns(count: int) -> list[str]:
+    patterns = [r"--\s*$"]
+    i = 0
+    while len(patterns) < count:
+        base = SIGNOFFS[i % len(SIGNOFFS)]
+        patterns.append(base if i < len(SIGNOFFS) else f"{base} {i}")
+        i += 1
+    return patterns
+
+
+def _bodies(n: int) -> list[list[str]]:
+    return [
+        ["Hello team,"] + [f"Status line {j} for item {i}." for j in range(30)]
+        + ["Best regards,", f"User {i}", "Engineer", f"user{i}@example.com"]
+        for i in range(n)
+    ]
+
+
+def _naive(patterns: list[str], bodies: list[list[str]]) -> float:
+    """Per-pattern search as done before the compiled matcher."""
+    compiled = [re.compile(p, re.IGNORECASE) for p in patterns]
+    start = time.perf_counter()
+    for lines in bodies:
+        for line in reversed(lines):
+            if any(p.search(line.strip()) for p in compiled):
+                break
+    return time.perf_counter() - start
+
+
+def _compiled(patterns: list[str], bodies: list[list[str]]) -> float:
+    heuristic = RegexSignOffHeuristic(patterns)
+    start = time.perf_counter()
+    for lines in bodies:
+        heuristic.detect_boundary(lines, "")
+    return time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark sign-off matching")
+    parser.add_argument("--out", default="benchmark_signoff.csv", help="CSV output path")
+    parser.add_argument("--messages", type=int, default=200, help="Number of synthetic messages")
+    parser.add_argument("--patterns", nargs="*", type=int, default=[5, 50, 500])
+    args = parser.parse_args(argv)
+
+    bodies = _bodies(args.messages)
+    results = []
+    for count in args.patterns:
+        log_message("info", f"Running patterns={count}")
+        patterns = _patterns(count)
+        for matcher, run in (("naive", _naive), ("compiled", _compiled)):
+            elapsed = run(patterns, bodies)
+            results.append(
+                {
+                    "matcher": matcher,
+                    "patterns": count,
+                    "us_per_message": elapsed / len(bodies) * 1e6 if bodies else 0.0,
+                }
+            )
+
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["matcher", "patterns", "us_per_message"])
+        writer.writeheader()
+        writer.writerows(results)
+    log_message("info", f"Results written to {args.out}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -8,6 +8,11 @@ def test_benchmark_scripts(tmp_path):
     scripts = [
         "benchmark_large_pst.py",
         "benchmark_index_growth.py",
+        "benchmark_executors.py",
+        "benchmark_signoff.py",
+        "benchmark_parser.py",
+        "benchmark_dictionaries.py",
+        "benchmark_dedupe.py",
     ]
     try:
         import pypff  # type: ignore
@@ -20,6 +25,11 @@ def test_benchmark_scripts(tmp_path):
         name_map = {
             "benchmark_large_pst.py": "large.csv",
             "benchmark_index_growth.py": "growth.csv",
+            "benchmark_executors.py": "executors.csv",
+            "benchmark_signoff.py": "signoff.csv",
+            "benchmark_parser.py": "parser.csv",
+            "benchmark_dictionaries.py": "dictionaries.csv",
+            "benchmark_dedupe.py": "dedupe.csv",
             "profile_run.py": "profile.html",
         }
         out = Path(out_dir) / name_map.get(script, f"{script}.out")
@@ -32,7 +42,7 @@ def test_benchmark_scripts(tmp_path):
         assert res.returncode == 0
         assert out.exists()
 
-    for expected in ["large.csv", "growth.csv", "profile.html"]:
+    for expected in ["large.csv", "growth.csv", "executors.csv", "signoff.csv", "parser.csv", "dictionaries.csv", "dedupe.csv", "profile.html"]:
         p = Path(out_dir) / expected
         if not p.exists():
             p.touch()
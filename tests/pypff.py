@@ -1,9 +1,12 @@
 class FakeMessage:
-    def __init__(self, body, ts, ident):
+    def __init__(self, body, ts, ident, sender=""):
         self._body = body
         self.html_body = ""
         self.client_submit_time = ts
         self.identifier = ident.to_bytes(4, "big")
+        self.sender_name = sender
+        address = sender.lower().replace(" ", ".") + "@example.com" if sender else ""
+        self.transport_headers = f"Subject: hi\r\nFrom: {sender} <{address}>\r\n" if sender else ""
 
     @property
     def plain_text_body(self):
@@ -31,8 +34,8 @@ class FakeFolder:
 class FakePst:
     def __init__(self):
         msgs = [
-            FakeMessage("Hi\n--\nJohn Doe\nEngineer", 100.0, 1),
-            FakeMessage("Hello\n--\nJane Smith\nManager", 200.0, 2),
+            FakeMessage("Hi\n--\nJohn Doe\nEngineer", 100.0, 1, "John Doe"),
+            FakeMessage("Hello\n--\nJane Smith\nManager", 200.0, 2, "Jane Smith"),
         ]
         inbox = FakeFolder("Inbox", msgs)
         self.root = FakeFolder("root", [], [inbox])
@@ -40,6 +43,9 @@ class FakePst:
     def open(self, path):
         pass
 
+    def close(self):
+        pass
+
     def get_root_folder(self):
         return self.root
 
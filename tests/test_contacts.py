@@ -0,0 +1,116 @@
+"""Canonical contact keys and indexed contact lookups."""
+
+import json
+import sqlite3
+
+from signature_recovery.core.contacts import (
+    ContactKeys,
+    contact_keys,
+    email_key,
+    phone_key,
+    registrable_domain,
+    url_domain,
+)
+from signature_recovery.core.models import Signature, SignatureMetadata
+from signature_recovery.core.parser import SignatureParser
+from signature_recovery.index.search_index import SQLiteFTSIndex
+
+
+def test_phone_key():
+    assert phone_key("(555) 123-4567") == "+15551234567"
+    assert phone_key("+1 555.123.4567") == "+15551234567"
+    assert phone_key("555-123-4567 ext. 12") == "+15551234567"
+    assert phone_key("+44 20 7946 0958") == "+442079460958"
+    assert phone_key("0044 20 7946 0958") == "+442079460958"
+    assert phone_key("12-34") is None
+    assert phone_key(None) is None
+
+
+def test_email_and_domain_keys():
+    assert email_key(" John.Doe@ACME.com ") == "john.doe@acme.com"
+    assert email_key("mailto:j@acme.com") == "j@acme.com"
+    assert email_key("not an email") is None
+    assert registrable_domain("Mail.Acme.COM") == "acme.com"
+    assert registrable_domain("mail.acme.co.uk") == "acme.co.uk"
+    assert registrable_domain("localhost") is None
+    assert url_domain("https://www.acme.com/contact") == "acme.com"
+    assert url_domain("www.acme.com.au") == "acme.com.au"
+
+
+def test_contact_keys_fall_back_to_url_domain():
+    meta = SignatureMetadata(phone="555 123 4567", url="http://shop.example.org")
+    assert contact_keys(meta) == ContactKeys("+15551234567", None, "example.org")
+    meta.email = "Jane@Sales.Acme.com"
+    assert contact_keys(meta).domain == "acme.com"
+
+
+def test_contact_keys_of_parsed_metadata():
+    meta = SignatureParser().parse("John Doe\nEngineer\n(555) 123-4567\nJohn@Example.com")
+    assert contact_keys(meta) == ContactKeys("+15551234567", "john@example.com", "example.com")
+
+
+def test_find_by_contact(tmp_path):
+    index = SQLiteFTSIndex(str(tmp_path / "idx.db"))
+    index.add(
+        Signature(
+            "John", "1", metadata=SignatureMetadata(phone="(555) 123-4567", email="J@mail.acme.com")
+        )
+    )
+    index.add_batch(
+        [
+            Signature("John D", "2", metadata=SignatureMetadata(phone="+1 555.123.4567")),
+            Signature("Jane", "3", metadata=SignatureMetadata(url="www.acme.com")),
+            Signature("Nobody", "4"),
+        ]
+    )
+
+    def ids(**keys):
+        return [s.source_msg_id for s in index.find_by_contact(**keys)]
+
+    assert ids(phone="555-123-4567") == ["1", "2"]
+    assert ids(email="j@MAIL.acme.com") == ["1"]
+    assert ids(domain="www.acme.com") == ["1", "3"]
+    assert ids(phone="5551234567", domain="acme.com") == ["1"]
+    assert ids(phone="12") == []
+    assert ids() == []
+    plan = index.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT rowid FROM signature_contacts WHERE email_key = ?", ("x",)
+    ).fetchall()
+    assert "signature_contacts_email_key" in plan[0][-1]
+
+
+def test_contact_keys_backfilled_for_old_index(tmp_path):
+    db = tmp_path / "old.db"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE VIRTUAL TABLE signatures USING fts5("
+        "source_msg_id, timestamp, text, confidence UNINDEXED, metadata UNINDEXED)"
+    )
+    conn.execute(
+        "INSERT INTO signatures VALUES (?,?,?,?,?)",
+        ("1", "", "John", 0.9, json.dumps({"email": "John@Example.com"})),
+    )
+    conn.commit()
+    conn.close()
+    index = SQLiteFTSIndex(str(db))
+    assert [s.source_msg_id for s in index.find_by_contact(email="john@example.com")] == ["1"]
+    index.add(Signature("Jane", "2", metadata=SignatureMetadata(email="jane@example.com")))
+    assert [s.source_msg_id for s in index.find_by_contact(domain="example.com")] == ["1", "2"]
+
+
+def test_add_clustered_blocks_on_contact_keys(tmp_path, monkeypatch):
+    from signature_recovery.index import search_index
+
+    index = SQLiteFTSIndex(str(tmp_path / "idx.db"))
+    john = Signature(
+        "John Doe\nEngineer\nAcme Corp", "1", metadata=SignatureMetadata(email="john@acme.com")
+    )
+    assert index.add_clustered([john]) == 1
+    # without a band in common only the email key makes John's cluster a candidate
+    monkeypatch.setattr(search_index, "band_keys", lambda signature: [])
+    typo = Signature(
+        "John Doe\nEngneer\nAcme Corp", "2", metadata=SignatureMetadata(email="JOHN@Acme.com")
+    )
+    assert index.add_clustered([typo]) == 0
+    assert index.add_clustered([Signature("John Doe\nEngneer\nAcme Corp", "3")]) == 1
+    assert [members for _, members in index.clusters()] == [["1", "2"], ["3"]]
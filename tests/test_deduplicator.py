@@ -1,3 +1,5 @@
+import pytest
+
 from signature_recovery.core.deduplicator import dedupe_signatures
 from signature_recovery.core.models import Signature
 
@@ -72,3 +74,185 @@ def test_large_list_performance():
     sigs.append(base)
     uniques = dedupe_signatures(sigs, threshold=0.8)
     assert len(uniques) <= 5
+
+
+def test_minhash_bands_shared_by_near_duplicates():
+    from signature_recovery.core.deduplicator import NUM_HASHES, band_keys, minhash, minhash_batch
+
+    a = minhash("john doe engineer acme corp 5551234567")
+    b = minhash("john doe  engineer  acme corp 5551234567")
+    c = minhash("jane smith manager initech llc 5559876543")
+    assert len(a) == NUM_HASHES
+    assert a == b
+    assert set(band_keys(a)) & set(band_keys(minhash("john doe engineer acme corp 555123456")))
+    assert not set(band_keys(a)) & set(band_keys(c))
+    assert minhash_batch(["john doe", "jd"]) == [minhash("john doe"), minhash("jd")]
+
+
+def test_minhash_engine_matches_exhaustive():
+    import copy
+
+    people = ["John Doe\nEngineer\nAcme Corp", "Jane Smith\nManager\nInitech LLC", "Bob Brown\nCFO\nHooli"]
+    sigs = [
+        Signature(
+            text=(people[i % 3].upper() if i % 2 else people[i % 3]) + ("\nwww.acme.com" if i % 5 == 0 else ""),
+            source_msg_id=str(i),
+            timestamp=str(1000 - i),
+        )
+        for i in range(30)
+    ]
+    exhaustive = dedupe_signatures(copy.deepcopy(sigs), threshold=0.85, engine="exhaustive")
+    minhashed = dedupe_signatures(copy.deepcopy(sigs), threshold=0.85, engine="minhash")
+    assert [s.source_msg_id for s in minhashed] == [s.source_msg_id for s in exhaustive]
+    assert [s.timestamp for s in minhashed] == [s.timestamp for s in exhaustive]
+
+
+def _edited_signatures(count, max_edits, seed=0):
+    """Return ``count`` signatures of 60 people, each with 1..``max_edits`` character edits."""
+    import random
+
+    rnd = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    titles = ["Engineer", "Sales Manager", "Director", "Analyst", "Counsel"]
+    companies = ["Acme Corp", "Globex Inc", "Initech LLC", "Hooli Ltd"]
+    people = []
+    for p in range(60):
+        first, last = ("".join(rnd.choice(letters) for _ in range(rnd.randint(4, 9))) for _ in "fl")
+        company = companies[p % len(companies)]
+        people.append(
+            f"{first.title()} {last.title()}\n{titles[p % len(titles)]}\n{company}\n"
+            f"+1 {rnd.randint(200, 999)} {rnd.randint(100, 999)} {rnd.randint(1000, 9999)}\n"
+            f"{first}.{last}@{company.split()[0].lower()}.com"
+        )
+    sigs = []
+    for i in range(count):
+        text = list(rnd.choice(people))
+        for _ in range(rnd.randint(1, max_edits)):
+            pos = rnd.randrange(len(text))
+            op = rnd.randrange(3)
+            if op == 0:
+                text[pos] = rnd.choice("abcdefghijklmnopqrstuvwxyz0123456789")
+            elif op == 1:
+                text.insert(pos, rnd.choice("abcdefghijklmnopqrstuvwxyz0123456789"))
+            else:
+                del text[pos]
+        sigs.append(Signature(text="".join(text), source_msg_id=str(i), timestamp=str(i)))
+    return sigs
+
+
+def test_minhash_recall_matches_exhaustive_with_character_edits():
+    import copy
+
+    from signature_recovery.core import deduplicator
+
+    sigs = _edited_signatures(deduplicator.MINHASH_MIN_BATCH + 64, max_edits=3)
+    exhaustive = dedupe_signatures(copy.deepcopy(sigs), engine="exhaustive")
+    auto = dedupe_signatures(copy.deepcopy(sigs))
+    assert len(exhaustive) == 60
+    assert [s.source_msg_id for s in auto] == [s.source_msg_id for s in exhaustive]
+
+
+def test_auto_engine_uses_minhash_for_large_batches(monkeypatch):
+    from signature_recovery.core import deduplicator
+
+    batches = []
+    real = deduplicator.minhash_batch
+    monkeypatch.setattr(deduplicator, "minhash_batch", lambda norms: batches.append(len(norms)) or real(norms))
+    sigs = [Signature(text=f"Person {i}", source_msg_id=str(i)) for i in range(deduplicator.MINHASH_MIN_BATCH + 1)]
+    dedupe_signatures(sigs[:3])
+    assert batches == []
+    dedupe_signatures(sigs)
+    assert batches == [len(sigs)]
+    with pytest.raises(ValueError):
+        dedupe_signatures(sigs, engine="fuzzy")
+
+
+def test_add_clustered_merges_across_batches(tmp_path):
+    from signature_recovery.core.models import SignatureMetadata
+    from signature_recovery.index.search_index import SQLiteFTSIndex
+
+    db = str(tmp_path / "idx.db")
+    index = SQLiteFTSIndex(db)
+    first = [
+        Signature(text="John Doe\nEngineer\nAcme Corp", source_msg_id="1", timestamp="2000", confidence=0.5),
+        Signature(text="Jane Smith\nManager\nInitech LLC", source_msg_id="2", timestamp="2100"),
+        Signature(text="JOHN DOE\nEngineer\nAcme Corp", source_msg_id="3", timestamp="2200"),
+    ]
+    assert index.add_clustered(first, checkpoint=("src", "Inbox", 2), processed=[("src", "3", "f", "h")]) == 2
+    # a later batch (or run) on a reopened index
+    index = SQLiteFTSIndex(db)
+    later = Signature(
+        text="john doe | Engineer | Acme Corp",
+        source_msg_id="4",
+        timestamp="1000",
+        metadata=SignatureMetadata(email="john@acme.com"),
+        confidence=0.9,
+    )
+    assert index.add_clustered([later]) == 0
+    sigs = index.query(None)
+    assert [s.source_msg_id for s in sigs] == ["1", "2"]
+    john = sigs[0]
+    assert (john.timestamp, john.confidence, john.metadata.email) == ("1000", 0.9, "john@acme.com")
+    assert [s.source_msg_id for s in index.find_by_contact(email="JOHN@acme.com")] == ["1"]
+    assert index.clusters() == [
+        ("John Doe\nEngineer\nAcme Corp", ["1", "3", "4"]),
+        ("Jane Smith\nManager\nInitech LLC", ["2"]),
+    ]
+    assert index.get_checkpoint("src") == ("Inbox", 2)
+
+
+def test_add_clustered_backfills_plain_signatures(tmp_path, monkeypatch):
+    from signature_recovery.index import search_index
+    from signature_recovery.index.search_index import SQLiteFTSIndex
+
+    monkeypatch.setattr(search_index, "BACKFILL_BATCH", 2)
+    index = SQLiteFTSIndex(str(tmp_path / "idx.db"))
+    index.add_batch(
+        [
+            Signature(text="John Doe\nEngineer", source_msg_id="1"),
+            Signature(text="Jane Smith\nManager", source_msg_id="2"),
+            Signature(text="Bob Brown\nCFO", source_msg_id="3"),
+        ]
+    )
+    assert index.add_clustered([Signature(text="john doe\nengineer", source_msg_id="4")]) == 0
+    assert index.clusters() == [
+        ("John Doe\nEngineer", ["1", "4"]),
+        ("Jane Smith\nManager", ["2"]),
+        ("Bob Brown\nCFO", ["3"]),
+    ]
+    bands = index.conn.execute("SELECT COUNT(*) FROM cluster_bands").fetchone()[0]
+    assert bands > 0
+
+
+def test_clusters_of_old_index_are_migrated(tmp_path):
+    import json
+
+    from signature_recovery.core.deduplicator import fingerprint
+    from signature_recovery.index.search_index import SQLiteFTSIndex
+
+    db = str(tmp_path / "idx.db")
+    text = "John Doe\nSenior Engineer\nAcme Corp\n+1 555 123 4567"
+    index = SQLiteFTSIndex(db)
+    index.add_batch([Signature(text=text, source_msg_id="1")])
+    # clusters as older versions stored them: JSON member lists and band
+    # keys of another MinHash layout
+    conn = index.conn
+    conn.execute("DROP TABLE cluster_members")
+    conn.execute("DROP TABLE clusters")
+    conn.execute(
+        "CREATE TABLE clusters (id INTEGER PRIMARY KEY, signature_rowid INTEGER NOT NULL UNIQUE,"
+        " text TEXT NOT NULL, norm_hash TEXT NOT NULL, minhash BLOB NOT NULL, members TEXT NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO clusters VALUES (1, 1, ?, ?, ?, ?)",
+        (text, fingerprint(text)[1], b"", json.dumps(["1", "3"])),
+    )
+    conn.execute("INSERT INTO cluster_bands VALUES (42, 1)")
+    conn.commit()
+
+    index = SQLiteFTSIndex(db)
+    assert index.clusters() == [(text, ["1", "3"])]
+    typo = Signature(text=text.replace("Engineer", "Engneer"), source_msg_id="4")
+    assert index.add_clustered([typo]) == 0
+    assert index.clusters() == [(text, ["1", "3", "4"])]
+    assert index.conn.execute("SELECT COUNT(*) FROM cluster_bands WHERE band_key = 42").fetchone() == (0,)
@@ -19,6 +19,9 @@ def _setup_fake_pst(monkeypatch):
         def open(self, path):
             pass
 
+        def close(self):
+            pass
+
         def get_root_folder(self):
             class Folder:
                 name = "Inbox"
@@ -58,3 +58,220 @@ def test_html_nested_entities():
     sig = extractor.extract_from_body(body)
     assert sig is not None
     assert "John & Co." in sig.text
+
+
+def _tail_config(**extraction):
+    from signature_recovery.core.config import DEFAULT_CONFIG
+
+    return {**DEFAULT_CONFIG, "extraction": {**DEFAULT_CONFIG["extraction"], **extraction}}
+
+
+def _extract_counters(metrics):
+    return {k: v for k, v in metrics.summarize()["counters"].items() if k.startswith("extract.")}
+
+
+def test_tail_window_matches_full_body():
+    from signature_recovery.core.metrics import MetricsCollector
+
+    filler = "<p>" + "newsletter text " * 20 + "</p>\n"
+    body = (
+        "<html><head><style>p { color: red; }</style></head><body>"
+        + filler * 500
+        + "<p>Best regards,<br>John Doe<br>john@example.com</p></body></html>"
+    )
+    metrics = MetricsCollector()
+    tail = SignatureExtractor(_tail_config(tail_window_kb=4, cache_size=0), metrics=metrics)
+    sig = tail.extract_from_body(body)
+    full = SignatureExtractor().extract_from_body(body)
+    assert sig is not None and sig.text == full.text
+    counters = _extract_counters(metrics)
+    assert counters == {"extract.tail_window": 1}
+
+
+def test_tail_window_falls_back_to_full_body():
+    from signature_recovery.core.metrics import MetricsCollector
+
+    body = "Hello\n--\nJohn Doe\n" + " \n" * 500
+    metrics = MetricsCollector()
+    extractor = SignatureExtractor(_tail_config(tail_window_lines=50, cache_size=0), metrics=metrics)
+    sig = extractor.extract_from_body(body)
+    assert sig is not None and sig.text == "--\nJohn Doe"
+    counters = _extract_counters(metrics)
+    assert counters == {"extract.tail_window": 1, "extract.tail_fallback": 1}
+
+
+def test_tail_window_falls_back_for_signature_longer_than_window():
+    from signature_recovery.core.metrics import MetricsCollector
+
+    body = "Hi,\nsee the report.\n\n" + "\n".join(
+        [
+            "Best regards,",
+            "John Doe",
+            "Senior Engineer",
+            "ACME Corp",
+            "+1 555 123 4567",
+            "john@acme.com",
+            "www.acme.com",
+        ]
+    )
+    metrics = MetricsCollector()
+    tail = SignatureExtractor(_tail_config(tail_window_lines=4, cache_size=0), metrics=metrics)
+    sig = tail.extract_from_body(body)
+    full = SignatureExtractor(_tail_config(cache_size=0)).extract_from_body(body)
+    assert sig.text == full.text and sig.text.startswith("Best regards,")
+    assert sig.confidence == full.confidence
+    counters = _extract_counters(metrics)
+    assert counters == {"extract.tail_window": 1, "extract.tail_fallback": 1}
+
+
+def test_tail_start_skips_script_blocks():
+    from signature_recovery.core.normalizer import tail_start
+
+    body = "<html><body><script>" + "var x = 1;\n" * 100 + "</script><p>Jane</p></body></html>"
+    start = tail_start(body, max_chars=200, html=True)
+    assert body[start:] == "<p>Jane</p></body></html>"
+    assert tail_start(body, max_chars=10_000, html=True) == 0
+
+
+def test_extract_many_batches(caplog):
+    import logging
+
+    from signature_recovery.core.metrics import MetricsCollector
+    from signature_recovery.core.models import Message
+
+    class Unreadable:
+        msg_id = "3"
+        timestamp = 3
+
+        @property
+        def body(self):
+            raise IOError("corrupt")
+
+    messages = [
+        Message(body="Hi\n--\nJohn Doe\njohn@ex.com", msg_id="1", timestamp=1),
+        Message(body="", msg_id="2", timestamp=2),
+        Unreadable(),
+        Message(body="Hey\n--\nJane Smith\njane@ex.com", msg_id="4", timestamp=4),
+    ]
+    metrics = MetricsCollector()
+    extractor = SignatureExtractor(metrics=metrics)
+    with caplog.at_level(logging.INFO, logger="signature_recovery.core.extractor"):
+        sigs = extractor.extract_many(messages)
+    assert [s.metadata.name if s else None for s in sigs] == ["John Doe", None, None, "Jane Smith"]
+    assert sigs[0].text == extractor.extract_from_body(messages[0].body).text
+    info = [r for r in caplog.records if r.levelno == logging.INFO]
+    assert [r.getMessage() for r in info] == ["extracted 2 signatures from 4 messages (1 errors)"]
+    summary = metrics.summarize()
+    assert _extract_counters(metrics) == {
+        "extract.messages": 4,
+        "extract.signatures": 2,
+        "extract.errors": 1,
+        "extract.cache_misses": 2,
+        "extract.cache_hits": 1,
+    }
+    assert summary["timings"]["extract.batch"]["count"] == 1
+
+
+def test_signature_cache_replays_repeated_tails(tmp_path):
+    from signature_recovery.core.metrics import MetricsCollector
+    from signature_recovery.index.search_index import SQLiteFTSIndex
+
+    tail = "Best regards,\nJohn Doe\nEngineer\njohn@example.com"
+    metrics = MetricsCollector()
+    extractor = SignatureExtractor(metrics=metrics)
+    first = extractor.extract_signature(f"Status one\n{tail}", "1")
+    calls = metrics.summarize()["heuristics"]["RegexSignOffHeuristic"]["calls"]
+    second = extractor.extract_signature(f"Another body\nmore text\n{tail}", "2")
+    assert second.text == first.text and second.source_msg_id == "2"
+    assert second.metadata == first.metadata and second.metadata is not first.metadata
+    # a hit skips boundary detection
+    assert metrics.summarize()["heuristics"]["RegexSignOffHeuristic"]["calls"] == calls
+    # bodies without a sign-off near the end take the normal path
+    other = extractor.extract_from_body(tail.replace("Best regards,", "<hr>"))
+    assert other.confidence != first.confidence
+    assert extractor.extract_from_body("Body\nThanks") is None
+    counters = metrics.summarize()["counters"]
+    assert counters["extract.cache_hits"] == 1
+    assert counters["extract.cache_misses"] == 2
+    assert extractor.cache.hit_rate == 1 / 3
+    assert len(extractor.cache) == 1
+    assert extractor.cache.items()[0][1].text == first.text
+
+    index = SQLiteFTSIndex(str(tmp_path / "cache.db"))
+    index.save_signature_cache(extractor.cache.items())
+    restored = SignatureExtractor()
+    restored.cache.load(index.load_signature_cache())
+    assert restored.cache.items() == extractor.cache.items()
+    assert restored.extract_signature(f"x\n{tail}", "3").metadata.email == "john@example.com"
+    assert restored.cache.hits == 1
+
+
+def test_signature_cache_table_of_old_index_is_replaced(tmp_path):
+    import sqlite3
+
+    from signature_recovery.index.search_index import SQLiteFTSIndex
+
+    db = tmp_path / "old.db"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE signature_cache (key TEXT PRIMARY KEY, position INTEGER NOT NULL,"
+        " metadata TEXT NOT NULL, confidence REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO signature_cache VALUES ('k', 0, '{}', 0.9)")
+    conn.commit()
+    conn.close()
+    index = SQLiteFTSIndex(str(db))
+    assert index.load_signature_cache() == []
+    extractor = SignatureExtractor()
+    extractor.extract_from_body("Hi\nBest regards,\nJohn Doe\nEngineer")
+    index.save_signature_cache(extractor.cache.items())
+    assert index.load_signature_cache() == extractor.cache.items()
+
+
+def test_signature_cache_is_bounded():
+    from signature_recovery.core.cache import CachedResult, SignatureCache
+    from signature_recovery.core.models import SignatureMetadata
+
+    cache = SignatureCache(2)
+    for key in "abc":
+        cache.put(key, CachedResult(0, key, SignatureMetadata(name=key), 0.9))
+    assert [k for k, _ in cache.items()] == ["b", "c"]
+    cache.get("b")
+    cache.put("d", CachedResult(0, "d", SignatureMetadata(name="d"), 0.9))
+    assert [k for k, _ in cache.items()] == ["b", "d"]
+    disabled = SignatureCache(0)
+    disabled.put("a", CachedResult(0, "a", SignatureMetadata(), 0.9))
+    assert len(disabled) == 0
+
+
+def test_heuristic_metrics(tmp_path):
+    import json
+
+    from signature_recovery.core.metrics import MetricsCollector
+
+    class Broken:
+        def detect_boundary(self, lines, raw_body):
+            raise ValueError("boom")
+
+    metrics = MetricsCollector()
+    extractor = SignatureExtractor(metrics=metrics)
+    extractor.heuristics.insert(1, Broken())
+    extractor.extract_from_body("Hi\nThanks,\nJohn")
+    extractor.extract_from_body("Hi there\nJohn Doe\njohn@example.com")
+    heuristics = metrics.summarize()["heuristics"]
+    assert heuristics["RegexSignOffHeuristic"]["calls"] == 2
+    assert heuristics["RegexSignOffHeuristic"]["hits"] == 1
+    assert heuristics["Broken"] == {
+        "calls": 1,
+        "hits": 0,
+        "errors": 1,
+        "latency": heuristics["Broken"]["latency"],
+    }
+    assert heuristics["TrailingLinesHeuristic"]["hits"] == 1
+    latency = heuristics["TrailingLinesHeuristic"]["latency"]
+    assert latency["count"] == 1 and sum(latency["buckets"].values()) == 1
+    assert 0 < latency["p50_ms"] <= latency["max_ms"]
+
+    out = tmp_path / "m.json"
+    metrics.dump(str(out))
+    assert json.loads(out.read_text())["summary"]["heuristics"]["Broken"]["errors"] == 1
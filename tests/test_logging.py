@@ -0,0 +1,149 @@
+"""Queued logging with per-component sampling and rate limits."""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from signature_recovery.core.logging import (
+    ComponentSampler,
+    DroppingQueueHandler,
+    setup_logging,
+    stop_logging,
+)
+
+
+@pytest.fixture
+def restore_root():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    stop_logging()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    for h in handlers:
+        root.addHandler(h)
+    root.setLevel(level)
+
+
+def _record(component, level=logging.INFO, name="signature_recovery.core.extractor"):
+    record = logging.LogRecord(name, level, __file__, 1, "msg", None, None)
+    if component:
+        record.component = component
+    return record
+
+
+def test_sampler_keeps_every_nth_record_and_all_warnings():
+    sampler = ComponentSampler(sample={"extractor": 0.25, "pipeline": 0})
+    kept = [sampler.filter(_record("extractor")) for _ in range(8)]
+    assert kept == [True, False, False, False, True, False, False, False]
+    assert sampler.filter(_record("extractor", logging.WARNING))
+    assert not sampler.filter(_record("pipeline"))
+    assert sampler.filter(_record("indexer"))
+    # falls back to the logger name when no component is given
+    assert sampler.filter(_record("", name="signature_recovery.core.extractor"))
+    assert sampler.suppressed == {"extractor": 6, "pipeline": 1}
+
+
+def test_sampler_rate_limit():
+    sampler = ComponentSampler(rate_limit={"deduplicator": 3})
+    kept = [sampler.filter(_record("deduplicator")) for _ in range(10)]
+    assert kept.count(True) == 3
+    assert sampler.suppressed == {"deduplicator": 7}
+
+
+def test_queue_handler_drops_when_full():
+    import queue
+
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for _ in range(5):
+        handler.handle(_record("extractor"))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_queue_handler_waits_for_room_for_warnings():
+    import queue
+    import threading
+
+    handler = DroppingQueueHandler(queue.Queue(1))
+    handler.handle(_record("extractor"))
+    drain = threading.Timer(0.1, handler.queue.get)
+    drain.start()
+    handler.handle(_record("extractor", logging.WARNING))
+    drain.join()
+    assert handler.queue.get_nowait().levelno == logging.WARNING
+    assert handler.dropped == 0
+
+
+def test_direct_logging_reports_suppressed_records(tmp_path, restore_root):
+    log_file = tmp_path / "run.log"
+    setup_logging(log_file=str(log_file), sample={"extractor": 0})
+    log = logging.getLogger("signature_recovery.core.extractor")
+    for i in range(3):
+        log.info("extracted signature", extra={"component": "extractor", "msg_id": str(i)})
+    # once per record, however many handlers filter it
+    assert [len(h.filters) for h in logging.getLogger().handlers] == [1, 1]
+    stop_logging()
+    stop_logging()
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert len(records) == 1
+    assert "suppressed 3" in records[0]["message"]
+
+
+def test_queued_logging_writes_from_listener(tmp_path, restore_root):
+    log_file = tmp_path / "run.log"
+    setup_logging(log_file=str(log_file), queued=True, sample={"extractor": 0.5})
+    root = logging.getLogger()
+    assert [type(h) for h in root.handlers] == [DroppingQueueHandler]
+    log = logging.getLogger("signature_recovery.core.extractor")
+    for i in range(4):
+        log.info("extracted signature", extra={"component": "extractor", "msg_id": str(i)})
+    log.warning("heuristic error", extra={"component": "extractor", "msg_id": "4"})
+    stop_logging()
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [r["msg_id"] for r in records[:3]] == ["0", "2", "4"]
+    assert records[-1]["component"] == "logging"
+    assert "suppressed 2" in records[-1]["message"]
+    assert root.handlers == []
+
+
+def test_cli_async_logging(tmp_path):
+    mbox = tmp_path / "mail.mbox"
+    mbox.write_text(
+        "From sender@ex.com Thu Jan  1 00:00:00 1970\n"
+        "Message-ID: <1@ex.com>\nSubject: Update\n\n"
+        "Thanks for the update.\n--\nJohn Doe\njohn@example.com\n\n"
+    )
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"logging": {"sample": {"deduplicator": 0}}}))
+    env = os.environ.copy()
+    env["PYTHONPATH"] = f"{Path(__file__).parent.parent}:{env.get('PYTHONPATH', '')}"
+    res = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "signature_recovery.cli.main",
+            "--async-logging",
+            "--config",
+            str(config),
+            "extract",
+            "--input",
+            str(mbox),
+            "--index",
+            str(tmp_path / "out.db"),
+        ],
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+        env=env,
+    )
+    assert res.returncode == 0, res.stderr
+    records = [json.loads(line) for line in (tmp_path / "recovery.log").read_text().splitlines()]
+    assert any(r["message"] == "extracted 1 signatures from 1 messages (0 errors)" for r in records)
+    assert not any(r["component"] == "deduplicator" for r in records[:-1])
+    assert "suppressed 1 " in records[-1]["message"]
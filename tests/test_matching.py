@@ -0,0 +1,89 @@
+"""Compiled pattern matching used by the sign-off heuristic."""
+
+import random
+import re
+
+import pytest
+
+from signature_recovery.core.extractor import RegexSignOffHeuristic
+from signature_recovery.core.matching import PatternMatcher, trie_regex
+
+PATTERNS = [
+    r"--\s*$",
+    "thanks",
+    "Thank you",
+    "regards",
+    "best regards",
+    "mit freundlichen Grüßen",
+    "с уважением",
+    r"^cheers\b",
+    r"(\w)\1{3}",  # backreference, kept as a separate regex
+    "(?i)sincerely",  # global flag, kept as a separate regex
+    "a.b",
+]
+
+LINES = [
+    "",
+    "--",
+    "-- ",
+    "Thanks!",
+    "THANK YOU so much",
+    "Best Regards,",
+    "Mit freundlichen GRÜSSEN",
+    "Mit freundlichen Grüßen",
+    "С уважением,",
+    "cheers mate",
+    "well, cheers",
+    "zzzz",
+    "Sincerely",
+    "a-b",
+    "nothing here",
+]
+
+
+def _legacy(patterns, line):
+    return any(re.compile(p, re.IGNORECASE).search(line) for p in patterns)
+
+
+@pytest.mark.parametrize("line", LINES)
+def test_pattern_matcher_matches_per_pattern_search(line):
+    assert PatternMatcher(PATTERNS).search(line) == _legacy(PATTERNS, line)
+
+
+def test_pattern_matcher_random_subsets():
+    rng = random.Random(7)
+    for _ in range(200):
+        patterns = rng.sample(PATTERNS, rng.randint(0, len(PATTERNS)))
+        matcher = PatternMatcher(patterns)
+        for line in LINES:
+            assert matcher.search(line) == _legacy(patterns, line), (patterns, line)
+
+
+def test_trie_regex_shares_prefixes():
+    source = trie_regex(["thanks", "Thank you", "thx"])
+    assert source == "th(?:ank(?:\\ you|s)|x)"
+    assert re.fullmatch(source, "THANKS", re.IGNORECASE)
+
+
+def test_invalid_pattern_still_raises():
+    with pytest.raises(re.error):
+        PatternMatcher(["("])
+
+
+def test_signoff_heuristic_finds_last_match():
+    heuristic = RegexSignOffHeuristic(["thanks", "regards"])
+    lines = ["Thanks for the update", "Body", "Regards,", "John Doe", "thanks again"]
+    assert heuristic.detect_boundary(lines, "") == (4, 0.9)
+    assert heuristic.detect_boundary(lines[:4], "") == (2, 0.9)
+    assert heuristic.detect_boundary(["Body"], "") is None
+    assert RegexSignOffHeuristic([]).detect_boundary(lines, "") is None
+
+
+def test_suffix_matcher():
+    from signature_recovery.core.matching import SuffixMatcher
+
+    matcher = SuffixMatcher(["Inc", "Inc.", "GmbH", "S.A.", ""])
+    assert len(matcher) == 4
+    assert matcher.matches("ACME Inc.") and matcher.matches("Foo GmbH")
+    assert not matcher.matches("ACME inc") and not matcher.matches("S.A")
+    assert not SuffixMatcher([]).matches("ACME Inc")
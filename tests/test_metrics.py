@@ -49,4 +49,42 @@ def test_cli_dump_metrics(tmp_path):
     assert res.returncode == 0
     assert metrics_path.exists()
     data = json.loads(metrics_path.read_text())
-    assert "summary" in data and "per_message" in data
\ No newline at end of file
+    assert "summary" in data and "per_message" in data
+
+def test_metrics_counters_and_timings():
+    collector = MetricsCollector()
+    collector.incr("skipped")
+    collector.incr("skipped", 2)
+    collector.observe("fetch", 2.0)
+    collector.observe("fetch", 4.0)
+
+    other = MetricsCollector()
+    other.merge_stats(collector.export_stats(reset=True))
+    other.observe("fetch", 6.0)
+    summary = other.summarize()
+    assert summary["counters"] == {"skipped": 3}
+    assert summary["timings"]["fetch"]["count"] == 3
+    assert summary["timings"]["fetch"]["avg_ms"] == 4.0
+    assert summary["timings"]["fetch"]["max_ms"] == 6.0
+    assert collector.summarize()["counters"] == {}
+
+
+def test_metrics_histograms_merge():
+    collector = MetricsCollector()
+    for ms in (0.005, 0.3, 0.4, 2000.0):
+        collector.histogram("heuristic.Fake", ms)
+    collector.incr("heuristic.Fake.calls", 4)
+    other = MetricsCollector()
+    other.histogram("heuristic.Fake", 0.2)
+    other.merge_stats(collector.export_stats(reset=True))
+    latency = other.summarize()["histograms"]["heuristic.Fake"]
+    assert latency["count"] == 5
+    assert latency["max_ms"] == 2000.0
+    assert latency["buckets"]["le_0.01ms"] == 1
+    assert latency["buckets"]["le_0.25ms"] == 1
+    assert latency["buckets"]["le_0.5ms"] == 2
+    assert latency["buckets"]["gt_1000ms"] == 1
+    assert latency["p50_ms"] == 0.5
+    assert latency["p99_ms"] == 2000.0
+    heuristics = other.summarize()["heuristics"]
+    assert heuristics == {"Fake": {"calls": 4, "hits": 0, "errors": 0, "latency": latency}}
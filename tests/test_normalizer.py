@@ -0,0 +1,134 @@
+"""Equivalence of single-pass normalization with the previous implementation."""
+
+import random
+import re
+from html import unescape
+from html.parser import HTMLParser
+from pathlib import Path
+
+import pytest
+
+from signature_recovery.core.extractor import HtmlDividerHeuristic
+from signature_recovery.core.normalizer import normalize_body
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html_bodies"
+
+
+def _legacy_normalize(body):
+    """``SignatureExtractor._normalize_body`` before single-pass normalization."""
+
+    class _Stripper(HTMLParser):
+        def __init__(self):
+            super().__init__()
+            self._parts = []
+            self._skip = False
+
+        def handle_starttag(self, tag, attrs):
+            t = tag.lower()
+            if t in {"br", "p", "div", "li", "tr"}:
+                self._parts.append("\n")
+            if t in {"style", "script"}:
+                self._skip = True
+
+        def handle_startendtag(self, tag, attrs):
+            self.handle_starttag(tag, attrs)
+
+        def handle_endtag(self, tag):
+            t = tag.lower()
+            if t in {"style", "script"}:
+                self._skip = False
+            if t in {"p", "div", "li", "tr"}:
+                self._parts.append("\n")
+
+        def handle_data(self, data):
+            if not self._skip:
+                self._parts.append(data)
+
+        def handle_entityref(self, name):
+            self._parts.append(unescape(f"&{name};"))
+
+        def handle_charref(self, name):
+            self._parts.append(unescape(f"&#{name};"))
+
+    if "<html" in body.lower() or "<body" in body.lower():
+        stripper = _Stripper()
+        stripper.feed(body)
+        text = "".join(stripper._parts)
+    else:
+        text = body
+    collapsed = re.sub(r"[ \t]+", " ", text)
+    collapsed = re.sub(r"\r\n?", "\n", collapsed)
+    collapsed = re.sub(r"\n+", "\n", collapsed).strip()
+    return "\n".join(line.strip() for line in collapsed.splitlines() if line.strip())
+
+
+def _legacy_divider(body):
+    """``HtmlDividerHeuristic`` boundary before single-pass normalization."""
+    match = re.search(r'<hr\b|<div\s+class=\"signature\"', body, re.IGNORECASE)
+    if not match:
+        return None
+    before = _legacy_normalize(body[: match.start()])
+    return len(before.split("\n")) if before else 0
+
+
+EDGE_CASES = [
+    "",
+    "plain text\n--\nJohn Doe",
+    "plain text mentioning <hr> inline\nJohn Doe\nEngineer",
+    "<html><body><p>Hi</p><hr><p>John Doe<br>Engineer</p></body></html>",
+    "<HTML><BODY>Hi<HR SIZE=1>John</BODY></HTML>",
+    "<html><body>Thanks<br/>AT&T<hr>John Doe</body></html>",
+    "<html><body>Q&A session&nbsp<hr>John Doe</body></html>",
+    "<html><body>fish &amp; chips<hr/>John</body></html>",
+    "<hr><html><body>Hi<br>John</body></html>",
+    "<div><hr></div><body>Late body tag<br>John</body>",
+    '<html><body><p>Body</p><div class="signature">John<br>CEO</div></body></html>',
+    "<html><body><p>Body</p><div class='signature'>John</div><hr></body></html>",
+    "<html><body><script>var a = '<hr>';</script>Text<hr>Sig</body></html>",
+    "<html><body><!-- <hr> -->Text<br>More<hr>Sig</body></html>",
+    '<html><body><p title="<hr>">Para</p>Next<hr>Sig</body></html>',
+    "<html><body>a < b<br>c<hr>Sig</body></html>",
+    "<html><body>line one\r\nline two\r\n<hr>\r\nJohn</body></html>",
+    "<html><body><style>p{}</style><p>   </p>\t<p>x</p><hr-ish>y<hr>z</body></html>",
+    "<html><body>café © 2024 next<hr>Sig</body></html>",
+    "<html><body>unterminated &#12<hr>Sig</body></html>",
+    "<html><body>Text<hr",
+]
+
+
+def _fixture_bodies():
+    return [p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("*.html"))]
+
+
+def _random_bodies(n, seed=1234):
+    rng = random.Random(seed)
+    pieces = [
+        "<p>", "</p>", "<br>", "<br/>", "<div>", "</div>", "<hr>", "<HR/>",
+        '<div class="signature">', "<li>", "<tr>", "<span>", "</span>",
+        "<script>x<hr></script>", "<style>.a{}</style>", "<!-- c -->",
+        "&amp;", "&nbsp;", "AT&T", "&#169;", " ", "\t", "\n", "\r\n",
+        "Best regards,", "John Doe", "john@example.com", "+1 555 0100",
+        "Hello", "a < b", "x&y", "<b>", "</b>",
+    ]
+    bodies = []
+    for _ in range(n):
+        middle = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+        wrapper = rng.choice([("<html><body>", "</body></html>"), ("", ""), ("<body>", "")])
+        bodies.append(wrapper[0] + middle + wrapper[1])
+    return bodies
+
+
+@pytest.mark.parametrize("body", EDGE_CASES + _fixture_bodies() + _random_bodies(300))
+def test_normalize_matches_legacy(body):
+    result = normalize_body(body)
+    assert result.text == _legacy_normalize(body)
+    assert result.divider_line == _legacy_divider(body)
+
+
+def test_divider_heuristic_uses_annotations():
+    body = "<html><body><p>Hi</p><hr><p>John Doe<br>Engineer</p></body></html>"
+    lines = normalize_body(body)
+    assert lines == ["Hi", "John Doe", "Engineer"]
+    assert HtmlDividerHeuristic().detect_boundary(lines, body) == (1, 0.7)
+    # plain lists still work for callers that do not normalize first
+    assert HtmlDividerHeuristic().detect_boundary(list(lines), body) == (1, 0.7)
@@ -106,3 +106,24 @@ def test_parser_examples():
         meta = parser.parse(text)
         for key, val in expected.items():
             assert getattr(meta, key) == val
+
+
+def test_parser_golden_corpus():
+    """Single-pass parsing matches the output recorded from the multi-pass parser."""
+    import json
+    from dataclasses import asdict
+    from pathlib import Path
+
+    corpus = json.loads((Path(__file__).parent / "fixtures" / "parser_golden.json").read_text())
+    parser = SignatureParser()
+    for case in corpus:
+        meta = parser.parse(case["text"])
+        assert {k: v for k, v in asdict(meta).items() if v is not None} == case["metadata"], case["text"]
+        assert round(parser.last_score, 6) == case["score"]
+
+
+def test_classify_line():
+    cls = SignatureParser().classify("Jane Smith")
+    assert cls.name == "Jane Smith" and not (cls.title or cls.company or cls.address)
+    cls = SignatureParser().classify("12 Main St, ACME Inc")
+    assert cls.company and cls.address and cls.name is None
@@ -23,6 +23,8 @@ def _mock_parser(monkeypatch):
     class FakePst:
         def open(self, path):
             pass
+        def close(self):
+            pass
         def get_root_folder(self):
             return None
 
@@ -48,3 +50,152 @@ def test_pipeline(monkeypatch):
     names = sorted(s.metadata.name for s in deduped)
     assert names == ["Jane Smith", "John Doe"]
 
+
+
+def _numbered(n):
+    for i in range(n):
+        yield Message(
+            body=f"hi\n--\nUser {i}\nuser{i}@ex.com",
+            msg_id=str(i),
+            timestamp=i,
+            folder_path="root/Inbox",
+            msg_index=i,
+        )
+
+
+def test_streaming_pipeline_batches_and_checkpoints():
+    from signature_recovery.core.metrics import MetricsCollector
+    from signature_recovery.core.pipeline import ExtractionPipeline
+
+    batches = []
+    metrics = MetricsCollector()
+    pipeline = ExtractionPipeline(
+        SignatureExtractor(),
+        lambda sigs, processed, pos: batches.append((len(sigs), len(processed), pos)),
+        workers=3,
+        queue_size=4,
+        batch_size=10,
+        metrics=metrics,
+    )
+    assert pipeline.run(_numbered(25)) == 25
+    assert sum(b[1] for b in batches) == 25
+    assert batches[-1][2] == ("root/Inbox", 24)
+    # checkpoints only ever move forward
+    positions = [b[2][1] for b in batches]
+    assert positions == sorted(positions)
+    summary = metrics.summarize()
+    assert summary["total_messages"] == 25
+    assert summary["gauges"]["pipeline.read.depth"]["max"] <= 4
+    assert "pipeline.extract.get_wait" in summary["timings"]
+
+
+def test_streaming_pipeline_backpressure():
+    from signature_recovery.core.pipeline import ExtractionPipeline
+
+    read = [0]
+    in_flight = []
+
+    def source():
+        for msg in _numbered(50):
+            read[0] += 1
+            yield msg
+
+    def sink(sigs, processed, pos):
+        in_flight.append(read[0] - pos[1])
+
+    pipeline = ExtractionPipeline(
+        SignatureExtractor(), sink, workers=2, queue_size=2, batch_size=1
+    )
+    pipeline.run(source())
+    # the reader never runs further ahead of the writer than the queues and
+    # the items held by each stage allow
+    assert max(in_flight) <= 12
+
+
+def test_streaming_pipeline_propagates_sink_errors():
+    import pytest
+    from signature_recovery.core.pipeline import ExtractionPipeline
+
+    def sink(sigs, processed, pos):
+        raise RuntimeError("disk full")
+
+    pipeline = ExtractionPipeline(SignatureExtractor(), sink, batch_size=1)
+    with pytest.raises(RuntimeError, match="disk full"):
+        pipeline.run(_numbered(100))
+
+
+def test_process_batch_does_not_record_failures(monkeypatch):
+    from signature_recovery.core.parallel import process_batch
+    from signature_recovery.core.sources import LazyMessage
+
+    def unreadable():
+        raise OSError("corrupt item")
+
+    extractor = SignatureExtractor()
+    extract = extractor._extract
+
+    def flaky(body, message_id, *args):
+        if message_id == "2":
+            raise ValueError("boom")
+        return extract(body, message_id, *args)
+
+    monkeypatch.setattr(extractor, "_extract", flaky)
+    messages = [
+        Message(body="hi\n--\nJohn Doe\njohn@ex.com", msg_id="1", timestamp=1),
+        Message(body="hello\n--\nJane Smith\njane@ex.com", msg_id="2", timestamp=2),
+        LazyMessage(unreadable, "3", 3.0),
+    ]
+    results = process_batch(extractor, messages)
+    assert [entry[0] if entry else None for _, _, entry in results] == ["1", None, None]
+    assert [metric.extracted for _, metric, _ in results] == [True, False, False]
+
+
+def test_extract_file_ends_queued_results_with_marker(tmp_path):
+    import queue
+
+    import pytest
+    from signature_recovery.core.parallel import extract_file
+
+    mbox = tmp_path / "mail.mbox"
+    mbox.write_text(
+        "".join(
+            f"From sender@ex.com Thu Jan  1 00:00:00 1970\nMessage-ID: <{i}@ex.com>\n\n"
+            f"hi\n--\nJohn Doe\njohn{i}@ex.com\n\n"
+            for i in range(2)
+        )
+    )
+    results = queue.Queue()
+    result = extract_file(str(mbox), chunk_size=1, results=results)
+    items = [results.get_nowait() for _ in range(results.qsize())]
+    assert [part is None for _, part, _ in items] == [False, False, True]
+    assert items[-1] == (str(mbox), None, result.position)
+
+    missing = str(tmp_path / "missing.mbox")
+    with pytest.raises(FileNotFoundError):
+        extract_file(missing, results=results)
+    assert results.get_nowait() == (missing, None, None)
+
+
+def test_pool_pipeline_logs_unreadable_bodies(caplog):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from signature_recovery.core.pipeline import ExtractionPipeline
+    from signature_recovery.core.sources import LazyMessage
+
+    def unreadable():
+        raise OSError("corrupt item")
+
+    messages = [
+        Message(body="hi\n--\nJohn Doe\njohn@ex.com", msg_id="1", timestamp=1),
+        LazyMessage(unreadable, "2", 2.0),
+    ]
+    batches = []
+    with ThreadPoolExecutor(1) as pool:
+        pipeline = ExtractionPipeline(
+            None, lambda sigs, processed, pos: batches.append(processed), pool=pool
+        )
+        with caplog.at_level("ERROR"):
+            assert pipeline.run(messages) == 2
+    assert [entry[0] for batch in batches for entry in batch] == ["1"]
+    errors = [r for r in caplog.records if r.getMessage() == "worker error"]
+    assert [r.exc_info[0] for r in errors] == [OSError]
@@ -0,0 +1,158 @@
+"""Pre-filtering of automated and near-empty messages before extraction."""
+
+import json
+import pickle
+import subprocess
+import sys
+
+from signature_recovery.core.config import DEFAULT_CONFIG
+from signature_recovery.core.extractor import SignatureExtractor
+from signature_recovery.core.metrics import MetricsCollector
+from signature_recovery.core.models import Message
+from signature_recovery.core.parallel import process_batch
+from signature_recovery.core.prefilter import PreFilter, key_headers, message_class_for
+from signature_recovery.core.sources import MboxSource
+from signature_recovery.index.search_index import SQLiteFTSIndex
+
+BODY = "Thanks for the update.\n--\nJohn Doe\njohn@example.com"
+
+AUTOMATED = [
+    (
+        "Subject: Meeting\nContent-Type: text/calendar; method=REQUEST\n",
+        "BEGIN:VCALENDAR\n--\nJohn Doe\njohn@example.com",
+    ),
+    (
+        "Subject: Undeliverable: Meeting\n"
+        "Content-Type: multipart/report; report-type=delivery-status; boundary=x\n",
+        BODY,
+    ),
+    ("Subject: Automatic reply: Meeting\nAuto-Submitted: auto-replied\n", BODY),
+    ("Subject: Out of Office\n", BODY),
+    ("Subject: Ok\n", "Ok"),
+]
+
+
+def _write_mbox(path):
+    parts = [
+        f"From sender@ex.com Thu Jan  1 00:00:00 1970\n"
+        f"Message-ID: <{i}@ex.com>\nFrom: John Doe <john@example.com>\n{head}\n{body}\n\n"
+        for i, (head, body) in enumerate([("Subject: Meeting\n", BODY)] + AUTOMATED)
+    ]
+    path.write_text("".join(parts))
+    return path
+
+
+def test_prefilter_reasons():
+    prefilter = PreFilter(DEFAULT_CONFIG["extraction"])
+    assert prefilter.reason(Message(BODY, "1", 1.0, subject="Re: Meeting")) is None
+    assert prefilter.reason(Message(BODY, "1", 1.0, message_class="IPM.Appointment")) == "message_class"
+    assert prefilter.reason(Message(BODY, "1", 1.0, message_class="REPORT.IPM.Note.NDR")) == "message_class"
+    assert prefilter.reason(Message(BODY, "1", 1.0, headers={"precedence": "bulk"})) == "auto_header"
+    assert prefilter.reason(Message(BODY, "1", 1.0, headers={"auto-submitted": "no"})) is None
+    assert prefilter.reason(Message(BODY, "1", 1.0, subject="Accepted: Meeting")) == "subject"
+    assert prefilter.reason(Message("Sounds good", "1", 1.0)) == "short_body"
+    assert PreFilter({"prefilter": False}).reason(Message("", "1", 1.0)) is None
+
+
+def test_key_headers_and_message_class():
+    headers = key_headers("From: a@ex.com\nX-Autoreply: yes\nContent-Type: text/calendar\n\n")
+    assert headers == {"x-autoreply": "yes", "content-type": "text/calendar"}
+    assert message_class_for(headers) == "IPM.Schedule.Meeting.Request"
+    assert message_class_for({}) == "IPM.Note"
+
+
+def test_mbox_messages_carry_prefilter_fields(tmp_path):
+    messages = list(MboxSource(str(_write_mbox(tmp_path / "mail.mbox"))).iter_messages(lazy=True))
+    assert [m.message_class for m in messages[:3]] == [
+        "IPM.Note",
+        "IPM.Schedule.Meeting.Request",
+        "REPORT.IPM.Note.NDR",
+    ]
+    assert messages[3].subject == "Automatic reply: Meeting"
+    assert messages[3].headers == {"auto-submitted": "auto-replied"}
+    plain = pickle.loads(pickle.dumps(messages[3]))
+    assert (plain.subject, plain.headers) == (messages[3].subject, messages[3].headers)
+
+
+def test_process_batch_counts_skipped_messages(tmp_path):
+    messages = list(MboxSource(str(_write_mbox(tmp_path / "mail.mbox"))).iter_messages())
+    metrics = MetricsCollector()
+    results = process_batch(SignatureExtractor(metrics=metrics), messages)
+    assert [len(sigs) for sigs, _, _ in results] == [1, 0, 0, 0, 0, 0]
+    assert all(metric is None for _, metric, _ in results[1:])
+    assert [entry[0] for _, _, entry in results] == [m.msg_id for m in messages]
+    counters = metrics.summarize()["counters"]
+    assert counters["prefilter.message_class"] == 2
+    assert counters["prefilter.auto_header"] == 1
+    assert counters["prefilter.subject"] == 1
+    assert counters["prefilter.short_body"] == 1
+
+
+def test_extract_no_prefilter(tmp_path):
+    mbox = _write_mbox(tmp_path / "mail.mbox")
+    totals = []
+    for flags in ([], ["--no-prefilter"]):
+        db = tmp_path / f"out{len(flags)}.db"
+        metrics = tmp_path / f"metrics{len(flags)}.json"
+        res = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "signature_recovery.cli.main",
+                "--dump-metrics",
+                str(metrics),
+                "extract",
+                "--input",
+                str(mbox),
+                "--index",
+                str(db),
+                *flags,
+            ],
+            capture_output=True,
+            text=True,
+        )
+        assert res.returncode == 0, res.stderr
+        totals.append(json.loads(metrics.read_text())["summary"]["total_messages"])
+        assert len(SQLiteFTSIndex(str(db)).query(None)) >= 1
+    assert totals == [1, 6]
+
+
+def test_no_prefilter_incremental_audits_skipped_messages(tmp_path):
+    mbox = _write_mbox(tmp_path / "mail.mbox")
+    db = tmp_path / "out.db"
+    metrics = tmp_path / "metrics.json"
+    totals = []
+    for flags in ([], ["--no-prefilter"], ["--no-prefilter"]):
+        res = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "signature_recovery.cli.main",
+                "--dump-metrics",
+                str(metrics),
+                "extract",
+                "--input",
+                str(mbox),
+                "--index",
+                str(db),
+                "--incremental",
+                *flags,
+            ],
+            capture_output=True,
+            text=True,
+        )
+        assert res.returncode == 0, res.stderr
+        totals.append(json.loads(metrics.read_text())["summary"]["total_messages"])
+    assert totals == [1, 6, 0]
+
+
+def test_prefilter_settings_change_the_extraction_digest():
+    def digest(**options):
+        extraction = {**DEFAULT_CONFIG["extraction"], **options}
+        return SignatureExtractor({**DEFAULT_CONFIG, "extraction": extraction}).digest
+
+    base = digest()
+    assert digest(prefilter=False) != base
+    assert digest(prefilter_min_body_chars=4) != base
+    assert digest(prefilter_subjects=[]) != base
+    assert digest(prefilter=False, prefilter_subjects=[]) == digest(prefilter=False)
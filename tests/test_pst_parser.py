@@ -68,6 +68,8 @@ def _setup_fake_pst(monkeypatch):
             self.client_submit_time = ts
             self.identifier = b"id"
             self.bad = bad
+            self.sender_name = f"Sender {body}"
+            self.transport_headers = f"Subject: x\r\nFrom: Sender <{body.lower()}@ex.com>\r\n"
 
         @property
         def plain_text_body(self):
@@ -105,8 +107,176 @@ def _setup_fake_pst(monkeypatch):
         def open(self, path):
             pass
 
+        def close(self):
+            self.closed = True
+
         def get_root_folder(self):
             return root
 
     monkeypatch.setitem(sys.modules, "pypff", types.SimpleNamespace(file=lambda: FakePst()))
 
+
+
+def test_list_folders_and_work_units(monkeypatch, tmp_path):
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    _setup_fake_pst(monkeypatch)
+    pst_module = importlib.reload(importlib.import_module("signature_recovery.core.pst_parser"))
+
+    parser = pst_module.PSTParser(str(pst))
+    folders = parser.list_folders()
+    assert [(f.path, f.message_count) for f in folders] == [
+        ("root", 0),
+        ("root/Inbox", 3),
+        ("root/Other", 1),
+    ]
+
+    units = pst_module.plan_work_units(folders, unit_size=2)
+    assert [(u.folder_path, u.start, u.stop) for u in units] == [
+        ("root/Inbox", 0, 2),
+        ("root/Inbox", 2, 3),
+        ("root/Other", 0, 1),
+    ]
+    bodies = [m.body for u in units for m in parser.iter_unit(u)]
+    # the corrupt message in the second Inbox unit is skipped
+    assert bodies == ["A", "B", "D"]
+
+
+def test_iter_messages_resume(monkeypatch, tmp_path):
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    _setup_fake_pst(monkeypatch)
+    pst_module = importlib.reload(importlib.import_module("signature_recovery.core.pst_parser"))
+
+    parser = pst_module.PSTParser(str(pst))
+    msgs = list(parser.iter_messages(resume_after=("root/Inbox", 0)))
+    assert [(m.body, m.folder_path, m.msg_index) for m in msgs] == [
+        ("B", "root/Inbox", 1),
+        ("D", "root/Other", 0),
+    ]
+    # an unknown checkpoint folder restarts from the beginning
+    msgs = list(parser.iter_messages(resume_after=("root/Gone", 5)))
+    assert [m.body for m in msgs] == ["A", "B", "D"]
+
+    units = pst_module.plan_work_units(
+        parser.list_folders(), unit_size=10, resume_after=("root/Inbox", 1)
+    )
+    assert [(u.folder_path, u.start, u.stop) for u in units] == [
+        ("root/Inbox", 2, 3),
+        ("root/Other", 0, 1),
+    ]
+
+
+def test_close_closes_pst_file(monkeypatch, tmp_path):
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    _setup_fake_pst(monkeypatch)
+    pst_module = importlib.reload(importlib.import_module("signature_recovery.core.pst_parser"))
+
+    parser = pst_module.PSTParser(str(pst))
+    handle = parser._pst
+    parser.close()
+    parser.close()
+    assert handle.closed
+
+
+def test_iter_messages_skips_known(monkeypatch, tmp_path):
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    _setup_fake_pst(monkeypatch)
+    pst_module = importlib.reload(importlib.import_module("signature_recovery.core.pst_parser"))
+
+    parser = pst_module.PSTParser(str(pst))
+    first = list(parser.iter_messages(folders=["Other"]))
+    assert first[0].fingerprint
+    known = {first[0].msg_id: (first[0].fingerprint, first[0].body_hash())}
+    assert list(parser.iter_messages(folders=["Other"], known=known)) == []
+    # a changed fingerprint brings the message back
+    known = {first[0].msg_id: ("stale", first[0].body_hash())}
+    assert len(list(parser.iter_messages(folders=["Other"], known=known))) == 1
+
+
+def test_fingerprint_is_read_only_for_known_check(monkeypatch, tmp_path):
+    from signature_recovery.core.metrics import MetricsCollector
+
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    _setup_fake_pst(monkeypatch)
+    pst_module = importlib.reload(importlib.import_module("signature_recovery.core.pst_parser"))
+
+    metrics = MetricsCollector()
+    parser = pst_module.PSTParser(str(pst), metrics=metrics)
+    msgs = list(parser.iter_messages(lazy=True))
+    assert "pst_fetch.modification_time" not in metrics.summarize()["timings"]
+    known = {msgs[0].msg_id: (msgs[0].fingerprint, "")}
+    assert metrics.summarize()["timings"]["pst_fetch.modification_time"]["count"] == 1
+    list(parser.iter_messages(lazy=True, known=known))
+    assert metrics.summarize()["timings"]["pst_fetch.modification_time"]["count"] == 5
+
+
+def test_lazy_messages_fetch_body_on_demand(monkeypatch, tmp_path):
+    import pickle
+
+    from signature_recovery.core.metrics import MetricsCollector
+    from signature_recovery.core.models import Message
+
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    _setup_fake_pst(monkeypatch)
+    pst_module = importlib.reload(importlib.import_module("signature_recovery.core.pst_parser"))
+
+    metrics = MetricsCollector()
+    parser = pst_module.PSTParser(str(pst), metrics=metrics)
+    msgs = list(parser.iter_messages(start=150, end=350, lazy=True))
+    timings = metrics.summarize()["timings"]
+    # the date filter ran on every message, no body was read yet
+    assert timings["pst_fetch.client_submit_time"]["count"] == 4
+    assert "pst_fetch.plain_text_body" not in timings
+    # the change stamp is only read for the known check, the sender name on use
+    assert "pst_fetch.modification_time" not in timings
+    assert "pst_fetch.sender_name" not in timings
+    assert [m.msg_index for m in msgs] == [1, 2]
+
+    assert msgs[0].body == "B"
+    with pytest.raises(ValueError):
+        msgs[1].body
+    timings = metrics.summarize()["timings"]
+    assert timings["pst_fetch.plain_text_body"]["count"] == 2
+
+    copy = pickle.loads(pickle.dumps(msgs[0]))
+    assert type(copy) is Message
+    assert copy.body == "B" and copy.msg_id == msgs[0].msg_id
+    assert (copy.sender_name, copy.sender_email) == ("Sender B", "b@ex.com")
+    # the sender address is read from the transport headers only on demand
+    assert metrics.summarize()["timings"]["pst_fetch.sender_name"]["count"] == 1
+    assert "pst_fetch.transport_headers" not in timings
+
+
+def test_scan_manifest_skips_folders(monkeypatch, tmp_path):
+    from signature_recovery.core.metrics import MetricsCollector
+
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    _setup_fake_pst(monkeypatch)
+    pst_module = importlib.reload(importlib.import_module("signature_recovery.core.pst_parser"))
+
+    parser = pst_module.PSTParser(str(pst))
+    folders = parser.scan()
+    inbox = next(f for f in folders if f.path == "root/Inbox")
+    assert (inbox.min_time, inbox.max_time, inbox.undated) == (100, 300, 0)
+    assert Path(parser.manifest_path).is_file()
+
+    metrics = MetricsCollector()
+    cached = pst_module.PSTParser(str(pst), metrics=metrics)
+    assert cached.load_manifest() == folders
+    msgs = list(cached.iter_messages(start=350))
+    assert [m.body for m in msgs] == ["D"]
+    # Inbox was skipped without opening any of its messages
+    assert metrics.summarize()["timings"]["pst_fetch.client_submit_time"]["count"] == 1
+
+    units = pst_module.plan_work_units(folders, end=250, workers=2)
+    assert [(u.folder_path, u.start, u.stop) for u in units] == [
+        ("root/Inbox", 0, 1),
+        ("root/Inbox", 1, 2),
+        ("root/Inbox", 2, 3),
+    ]
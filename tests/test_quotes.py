@@ -0,0 +1,89 @@
+"""Quoted reply history detection and quote-aware extraction."""
+
+import pytest
+
+from signature_recovery.core.config import DEFAULT_CONFIG
+from signature_recovery.core.extractor import SignatureExtractor
+from signature_recovery.core.metrics import MetricsCollector
+from signature_recovery.core.models import Message
+from signature_recovery.core.parallel import process_batch
+from signature_recovery.core.quotes import QUOTE_HINT_RE, quote_start, quoted_blocks
+from signature_recovery.core.normalizer import normalize_body
+
+NEWEST = "Sounds good, see you then.\nBest regards,\nJane Smith\njane@example.com\n"
+
+REPLIES = {
+    "angle": NEWEST + "> Can we meet on Monday?\n> Thanks,\n> John Doe\n> john@example.com\n",
+    "attribution": NEWEST
+    + "On Mon, Jan 1, 2024 at 9:00 AM John Doe <john@example.com> wrote:\n"
+    + "Can we meet on Monday?\nThanks,\nJohn Doe\njohn@example.com\n",
+    "wrapped_attribution": NEWEST
+    + "On Mon, Jan 1, 2024 at 9:00 AM John Doe\n<john@example.com> wrote:\n"
+    + "> Can we meet on Monday?\n> Thanks,\n> John Doe\n",
+    "original": NEWEST
+    + "-----Original Message-----\nFrom: John Doe\nSent: Monday, January 1, 2024\n"
+    + "To: Jane Smith\nSubject: Meeting\nCan we meet on Monday?\nThanks,\nJohn Doe\njohn@example.com\n",
+    "outlook": "<html><body><p>Sounds good, see you then.</p><p>Best regards,<br>Jane Smith<br>"
+    + "jane@example.com</p><hr><p><b>From:</b> John Doe<br><b>Sent:</b> Monday<br>"
+    + "<b>Subject:</b> Meeting</p><p>Can we meet on Monday?<br>Thanks,<br>John Doe<br>"
+    + "john@example.com</p></body></html>",
+}
+
+
+@pytest.mark.parametrize("name", sorted(REPLIES))
+def test_quote_start_finds_history(name):
+    body = REPLIES[name]
+    assert QUOTE_HINT_RE.search(body)
+    lines = normalize_body(body)
+    assert lines[: quote_start(lines)] == [
+        "Sounds good, see you then.",
+        "Best regards,",
+        "Jane Smith",
+        "jane@example.com",
+    ]
+
+
+def test_quote_start_ignores_plain_messages():
+    lines = normalize_body("Hi,\nThe report is attached.\nFrom the team\nRegards,\nJohn")
+    assert quote_start(lines) is None
+    assert quote_start(["Status: > 90% done"]) is None
+
+
+def test_quoted_blocks_split_nested_history():
+    lines = [
+        "Yes.",
+        "On Tue, Jane Smith wrote:",
+        "> Are you sure?",
+        "> Jane",
+        "> On Mon, John Doe wrote:",
+        ">> Can we meet?",
+        ">> John",
+    ]
+    assert quoted_blocks(lines) == [["Are you sure?", "Jane"], ["Can we meet?", "John"]]
+    assert quoted_blocks(["No history here"]) == []
+
+
+@pytest.mark.parametrize("name", sorted(REPLIES))
+def test_extractor_skips_quoted_history(name):
+    metrics = MetricsCollector()
+    extractor = SignatureExtractor(metrics=metrics)
+    sig = extractor.extract_signature(REPLIES[name], "1")
+    assert sig.metadata.email == "jane@example.com"
+    assert metrics.summarize()["counters"]["extract.quoted"] == 1
+    quoted = extractor.extract_quoted(REPLIES[name], "1")
+    assert [s.metadata.name for s in quoted] == ["John Doe"]
+
+
+def test_skip_quoted_can_be_disabled():
+    config = {**DEFAULT_CONFIG, "extraction": {**DEFAULT_CONFIG["extraction"], "skip_quoted": False}}
+    sig = SignatureExtractor(config).extract_signature(REPLIES["angle"], "1")
+    assert sig.text.startswith("> Thanks")
+
+
+def test_process_batch_mines_quoted_signatures():
+    extraction = {**DEFAULT_CONFIG["extraction"], "mine_quoted": True, "prefilter": False}
+    config = {**DEFAULT_CONFIG, "extraction": extraction}
+    messages = [Message(REPLIES["original"], "1", 1.0), Message("Hello", "2", 2.0)]
+    results = process_batch(SignatureExtractor(config), messages)
+    assert [[s.metadata.name for s in sigs] for sigs, _, _ in results] == [["Jane Smith", "John Doe"], []]
+    assert results[0][1].extracted and not results[1][1].extracted
@@ -85,7 +85,9 @@ def test_extract_query_export_flow(tmp_path):
     data = json.loads(metrics.read_text())
     assert data["summary"]["total_messages"] == 2
     assert data["summary"]["signatures_extracted"] >= 2
+    assert data["summary"]["heuristics"]["RegexSignOffHeuristic"]["calls"] == 2
     assert "Processed" in res.stdout
+    assert "RegexSignOffHeuristic: 2 calls" in res.stdout
 
     res = _run([
         sys.executable,
@@ -117,6 +119,262 @@ def test_extract_query_export_flow(tmp_path):
     assert "source_msg_id" in content
 
 
+def test_extract_sharded(tmp_path):
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    db = tmp_path / "out.db"
+    metrics = tmp_path / "metrics.json"
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = f"{Path(__file__).parent}:{env.get('PYTHONPATH','')}"
+
+    res = _run([
+        sys.executable,
+        "-m",
+        "signature_recovery.cli.main",
+        "--dump-metrics",
+        str(metrics),
+        "extract",
+        "--input",
+        str(pst),
+        "--index",
+        str(db),
+        "--sharded",
+        "--workers",
+        "2",
+        "--unit-size",
+        "1",
+    ], env=env)
+    assert res.returncode == 0
+    data = json.loads(metrics.read_text())
+    assert data["summary"]["total_messages"] == 2
+    index = SQLiteFTSIndex(str(db))
+    names = sorted(s.metadata.name for s in index.query(None))
+    assert names == ["Jane Smith", "John Doe"]
+
+
+def test_extract_process_executor(tmp_path):
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    db = tmp_path / "out.db"
+    metrics = tmp_path / "metrics.json"
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = f"{Path(__file__).parent}:{env.get('PYTHONPATH','')}"
+
+    res = _run([
+        sys.executable,
+        "-m",
+        "signature_recovery.cli.main",
+        "--dump-metrics",
+        str(metrics),
+        "extract",
+        "--input",
+        str(pst),
+        "--index",
+        str(db),
+        "--executor",
+        "process",
+        "--workers",
+        "2",
+        "--chunk-size",
+        "1",
+    ], env=env)
+    assert res.returncode == 0
+    data = json.loads(metrics.read_text())
+    assert data["summary"]["total_messages"] == 2
+    index = SQLiteFTSIndex(str(db))
+    names = sorted(s.metadata.name for s in index.query(None))
+    assert names == ["Jane Smith", "John Doe"]
+    assert index.get_checkpoint(str(pst)) == ("root/Inbox", 1)
+
+
+def test_extract_multiple_inputs(tmp_path):
+    (tmp_path / "a.pst").write_text("dummy")
+    (tmp_path / "b.pst").write_text("larger dummy")
+    db = tmp_path / "out.db"
+    metrics = tmp_path / "metrics.json"
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = f"{Path(__file__).parent}:{env.get('PYTHONPATH','')}"
+
+    res = _run([
+        sys.executable,
+        "-m",
+        "signature_recovery.cli.main",
+        "--dump-metrics",
+        str(metrics),
+        "extract",
+        "--input",
+        str(tmp_path / "*.pst"),
+        "--index",
+        str(db),
+        "--workers",
+        "2",
+    ], env=env)
+    assert res.returncode == 0
+    data = json.loads(metrics.read_text())
+    assert data["summary"]["total_messages"] == 4
+    files = data["summary"]["files"]
+    assert sorted(Path(p).name for p in files) == ["a.pst", "b.pst"]
+    assert all(f["messages"] == 2 for f in files.values())
+    index = SQLiteFTSIndex(str(db))
+    for name in ("a.pst", "b.pst"):
+        assert index.get_checkpoint(str(tmp_path / name)) == ("root/Inbox", 1)
+
+    # chunks are committed as they arrive rather than once per file
+    res = _run([
+        sys.executable,
+        "-m",
+        "signature_recovery.cli.main",
+        "--batch-size",
+        "1",
+        "extract",
+        "--input",
+        str(tmp_path / "*.pst"),
+        "--index",
+        str(tmp_path / "chunked.db"),
+        "--chunk-size",
+        "1",
+    ], env=env)
+    assert res.returncode == 0
+    assert (res.stdout + res.stderr).count("Committed") >= 4
+
+    # options of single-input extraction are rejected rather than ignored
+    cli = [sys.executable, "-m", "signature_recovery.cli.main"]
+    extract = ["extract", "--input", str(tmp_path / "*.pst"), "--index", str(db)]
+    for args in (extract + ["--sharded"], extract + ["--executor", "thread"], ["--threads", "2"] + extract):
+        res = _run(cli + args, env=env)
+        assert res.returncode == 1
+        assert "only apply to a single input" in res.stdout + res.stderr
+
+
+def test_extract_resume(tmp_path):
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    db = tmp_path / "out.db"
+    metrics = tmp_path / "metrics.json"
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = f"{Path(__file__).parent}:{env.get('PYTHONPATH','')}"
+    cmd = [
+        sys.executable,
+        "-m",
+        "signature_recovery.cli.main",
+        "--batch-size",
+        "1",
+        "--dump-metrics",
+        str(metrics),
+        "extract",
+        "--input",
+        str(pst),
+        "--index",
+        str(db),
+    ]
+
+    res = _run(cmd, env=env)
+    assert res.returncode == 0
+    index = SQLiteFTSIndex(str(db))
+    assert index.get_checkpoint(os.path.abspath(pst)) == ("root/Inbox", 1)
+    assert len(index.query(None)) == 2
+
+    res = _run(cmd + ["--resume"], env=env)
+    assert res.returncode == 0
+    data = json.loads(metrics.read_text())
+    assert data["summary"]["total_messages"] == 0
+    assert len(index.query(None)) == 2
+
+
+def test_extract_incremental(tmp_path):
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    db = tmp_path / "out.db"
+    metrics = tmp_path / "metrics.json"
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = f"{Path(__file__).parent}:{env.get('PYTHONPATH','')}"
+    cmd = [
+        sys.executable,
+        "-m",
+        "signature_recovery.cli.main",
+        "--dump-metrics",
+        str(metrics),
+        "extract",
+        "--input",
+        str(pst),
+        "--index",
+        str(db),
+        "--incremental",
+    ]
+
+    res = _run(cmd, env=env)
+    assert res.returncode == 0
+    index = SQLiteFTSIndex(str(db))
+    assert len(index.known_messages(str(pst))) == 2
+    assert index.known_messages(str(tmp_path / "other.pst")) == {}
+
+    res = _run(cmd, env=env)
+    assert res.returncode == 0
+    data = json.loads(metrics.read_text())
+    assert data["summary"]["total_messages"] == 0
+    assert len(index.query(None)) == 2
+
+    # changed rules make earlier results stale
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"extraction": {"signoff_patterns": ["--", "best"]}}))
+    res = _run(cmd[:3] + ["--config", str(config)] + cmd[3:], env=env)
+    assert res.returncode == 0
+    assert json.loads(metrics.read_text())["summary"]["total_messages"] == 2
+    assert "Extraction rules or options changed" in res.stdout + res.stderr
+
+    # so do changed extraction options
+    config.write_text(
+        json.dumps({"extraction": {"signoff_patterns": ["--", "best"], "max_fallback_lines": 3}})
+    )
+    res = _run(cmd[:3] + ["--config", str(config)] + cmd[3:], env=env)
+    assert res.returncode == 0
+    assert json.loads(metrics.read_text())["summary"]["total_messages"] == 2
+
+
+def test_extract_scan_only(tmp_path):
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = f"{Path(__file__).parent}:{env.get('PYTHONPATH','')}"
+    res = _run([
+        sys.executable,
+        "-m",
+        "signature_recovery.cli.main",
+        "extract",
+        "--input",
+        str(pst),
+        "--scan-only",
+    ], env=env)
+    assert res.returncode == 0
+    assert "root/Inbox\t2" in res.stdout
+    manifest = json.loads((tmp_path / "dummy.pst.manifest.json").read_text())
+    inbox = next(f for f in manifest["folders"] if f["path"] == "root/Inbox")
+    assert (inbox["min_time"], inbox["max_time"]) == (100.0, 200.0)
+
+    db = tmp_path / "out.db"
+    res = _run([
+        sys.executable,
+        "-m",
+        "signature_recovery.cli.main",
+        "extract",
+        "--input",
+        str(pst),
+        "--index",
+        str(db),
+        "--since",
+        "150",
+    ], env=env)
+    assert res.returncode == 0
+    names = [s.metadata.name for s in SQLiteFTSIndex(str(db)).query(None)]
+    assert names == ["Jane Smith"]
+
+
 def test_cli_error_conditions(tmp_path):
     db = _build_index(tmp_path)
     res = _run([sys.executable, "-m", "signature_recovery.cli.main", "extract", "--index", str(db)], env=os.environ)
@@ -164,3 +422,132 @@ def test_internal_error_exit_code(tmp_path):
     res = subprocess.run([sys.executable, "-c", script], text=True, capture_output=True)
     assert res.returncode == 2
 
+
+def test_extract_closes_input_on_error(tmp_path):
+    mbox = tmp_path / "mail.mbox"
+    mbox.write_text("From a@ex.com Thu Jan  1 00:00:00 1970\nMessage-ID: <1@ex.com>\n\nHi\n")
+    script = "\n".join(
+        [
+            "import atexit, signature_recovery.cli.main as m",
+            "opened = []",
+            "real = m.open_source",
+            "m.open_source = lambda *a, **k: opened.append(real(*a, **k)) or opened[-1]",
+            "m._extract_inline = lambda *a: (_ for _ in ()).throw(RuntimeError('boom'))",
+            "atexit.register(lambda: print([s._file.closed for s in opened]))",
+            f"m.main(['extract','--input','{mbox}','--index','{tmp_path}/x.db'])",
+        ]
+    )
+    res = subprocess.run([sys.executable, "-c", script], text=True, capture_output=True)
+    assert res.returncode == 2
+    assert res.stdout.strip() == "[True]", res.stderr
+
+
+
+def test_extract_persists_signature_cache(tmp_path):
+    pst = tmp_path / "dummy.pst"
+    pst.write_text("dummy")
+    db = tmp_path / "out.db"
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"extraction": {"cache_persist": True}}))
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = f"{Path(__file__).parent}:{env.get('PYTHONPATH','')}"
+
+    counters = []
+    for run in range(2):
+        metrics = tmp_path / f"metrics{run}.json"
+        res = _run([
+            sys.executable,
+            "-m",
+            "signature_recovery.cli.main",
+            "--config",
+            str(config),
+            "--dump-metrics",
+            str(metrics),
+            "extract",
+            "--input",
+            str(pst),
+            "--index",
+            str(db),
+        ], env=env)
+        assert res.returncode == 0, res.stderr
+        counters.append(json.loads(metrics.read_text())["summary"]["counters"])
+    assert counters[0]["extract.cache_misses"] == 2
+    assert counters[1]["extract.cache_hits"] == 2
+    assert len(SQLiteFTSIndex(str(db)).load_signature_cache()) == 2
+
+    # worker processes do not save their caches, and say so
+    res = _run([
+        sys.executable,
+        "-m",
+        "signature_recovery.cli.main",
+        "--config",
+        str(config),
+        "extract",
+        "--input",
+        str(pst),
+        "--index",
+        str(db),
+        "--executor",
+        "process",
+        "--workers",
+        "1",
+    ], env=env)
+    assert res.returncode == 0, res.stderr
+    assert "only applies to the thread executor" in res.stdout + res.stderr
+
+
+def test_extract_global_dedupe(tmp_path):
+    body = "Thanks for the update.\n--\nJohn Doe\nEngineer\njohn@example.com\n\n"
+    for name, ids in (("a.mbox", (1, 2)), ("b.mbox", (3,))):
+        (tmp_path / name).write_text(
+            "".join(
+                f"From sender@ex.com Thu Jan  1 00:00:00 1970\nMessage-ID: <{i}@ex.com>\n"
+                f"Subject: Update {i}\n\n{body.upper() if i == 2 else body}"
+                for i in ids
+            )
+        )
+    counts = []
+    for flags in ([], ["--global-dedupe"]):
+        db = tmp_path / f"out{len(flags)}.db"
+        for name in ("a.mbox", "b.mbox"):
+            cmd = [
+                sys.executable,
+                "-m",
+                "signature_recovery.cli.main",
+                "--batch-size",
+                "1",
+                "extract",
+                "--input",
+                str(tmp_path / name),
+                "--index",
+                str(db),
+                *flags,
+            ]
+            res = _run(cmd)
+            assert res.returncode == 0, res.stderr
+        counts.append(len(SQLiteFTSIndex(str(db)).query(None)))
+    assert counts == [3, 1]
+    members = SQLiteFTSIndex(str(tmp_path / "out1.db")).clusters()[0][1]
+    assert members == ["1@ex.com", "2@ex.com", "3@ex.com"]
+
+
+def test_processed_messages_keyed_by_source(tmp_path):
+    import sqlite3
+
+    db = tmp_path / "old.db"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE processed_messages ("
+        "msg_id TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, body_hash TEXT NOT NULL)"
+    )
+    conn.execute("INSERT INTO processed_messages VALUES ('1', 'old', 'h0')")
+    conn.commit()
+    conn.close()
+    index = SQLiteFTSIndex(str(db))
+    # rows of an index without sources apply to every source
+    assert index.known_messages("a.pst") == {"1": ("old", "h0")}
+    index.mark_processed([("a.pst", "1", "fa", "ha"), ("b.pst", "1", "fb", "hb")])
+    assert index.known_messages("a.pst") == {"1": ("fa", "ha")}
+    assert index.known_messages("b.pst") == {"1": ("fb", "hb")}
+    assert index.known_messages("c.pst") == {"1": ("old", "h0")}
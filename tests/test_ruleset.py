@@ -0,0 +1,90 @@
+"""The shared, immutable ruleset compiled from the config."""
+
+import dataclasses
+import pickle
+
+import pytest
+
+from signature_recovery.core.config import DEFAULT_CONFIG
+from signature_recovery.core.extractor import SignatureExtractor
+from signature_recovery.core.parser import SignatureParser
+from signature_recovery.core.ruleset import Ruleset
+
+
+def _config(**parser):
+    return {**DEFAULT_CONFIG, "parser": {**DEFAULT_CONFIG["parser"], **parser}}
+
+
+def test_ruleset_is_shared_and_immutable():
+    rules = Ruleset.from_config(DEFAULT_CONFIG)
+    assert Ruleset.from_config(_config()) is rules
+    assert rules.signoff_patterns == tuple(DEFAULT_CONFIG["extraction"]["signoff_patterns"])
+    assert len(rules.phone_res) == len(DEFAULT_CONFIG["parser"]["phone_patterns"])
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        rules.phone_patterns = ()
+    assert rules.signoff.search("Best regards,")
+
+
+def test_ruleset_pickles_to_its_sources():
+    rules = Ruleset.from_config(_config(title_keywords=["Founder"]))
+    copy = pickle.loads(pickle.dumps(rules))
+    assert copy == rules and copy.digest == rules.digest
+    assert copy.title_re.search("co-founder") and not copy.title_re.search("engineer")
+
+
+def test_digest_tracks_rule_changes():
+    base = Ruleset.from_config(DEFAULT_CONFIG)
+    changed = Ruleset.from_config(_config(company_suffixes=["GmbH"]))
+    assert changed.digest != base.digest
+    assert Ruleset.from_config(_config(company_suffixes=["GmbH"])).digest == changed.digest
+
+
+def test_extractor_digest_tracks_extraction_options():
+    base = SignatureExtractor(DEFAULT_CONFIG).digest
+    assert SignatureExtractor(DEFAULT_CONFIG).digest == base
+    assert SignatureExtractor(_config(company_suffixes=["GmbH"])).digest != base
+    for option, value in [
+        ("max_fallback_lines", 3),
+        ("tail_window_kb", 4),
+        ("tail_window_lines", 40),
+        ("skip_quoted", False),
+        ("mine_quoted", True),
+        ("sender_templates", False),
+        ("template_min_confidence", 0.8),
+    ]:
+        config = {**DEFAULT_CONFIG, "extraction": {**DEFAULT_CONFIG["extraction"], option: value}}
+        assert SignatureExtractor(config).digest != base, option
+
+
+def test_extractor_and_parser_share_the_ruleset():
+    extractor = SignatureExtractor(DEFAULT_CONFIG)
+    rules = Ruleset.from_config(DEFAULT_CONFIG)
+    assert extractor.ruleset is rules
+    assert extractor.heuristics[0].matcher is rules.signoff
+    assert SignatureParser(DEFAULT_CONFIG).phone_res is rules.phone_res
+    meta = SignatureParser(_config(company_suffixes=["GmbH"])).parse("Jane Smith\nExample GmbH")
+    assert meta.company == "Example GmbH"
+    # cached signatures are keyed by the ruleset, so changed rules never hit them
+    other = SignatureExtractor(_config(company_suffixes=["GmbH"]))
+    assert other._cache_key("x", False) != extractor._cache_key("x", False)
+
+
+def test_dictionaries_load_from_files(tmp_path):
+    titles = tmp_path / "titles.txt"
+    titles.write_text("# job titles\nHead of Growth\n\nStaff Scientist\n", encoding="utf-8")
+    suffixes = tmp_path / "suffixes.txt"
+    suffixes.write_text("GmbH\nS.p.A.\n", encoding="utf-8")
+    config = _config(
+        title_keywords=[], title_keywords_file=str(titles), company_suffixes_file=str(suffixes)
+    )
+    rules = Ruleset.from_config(config)
+    assert rules.title_keywords == ("Head of Growth", "Staff Scientist")
+    assert rules.company_suffixes[-2:] == ("GmbH", "S.p.A.")
+    assert Ruleset.from_config(config) is rules
+    meta = SignatureParser(config, rules).parse("Jane Smith\nVP, head of growth\nExample S.p.A.")
+    assert meta.title == "VP, head of growth" and meta.company == "Example S.p.A."
+    assert not rules.title_re.search("engineer")
+
+    titles.write_text("Head of Growth\nChief of Staff\n", encoding="utf-8")
+    changed = Ruleset.from_config(config)
+    assert changed is not rules and changed.digest != rules.digest
@@ -0,0 +1,156 @@
+import json
+import pickle
+import subprocess
+import sys
+
+from signature_recovery.core.metrics import ProgressReporter
+from signature_recovery.core.models import Message
+from signature_recovery.core.sources import (
+    EmlDirectorySource,
+    MaildirSource,
+    MboxSource,
+    open_source,
+    plan_work_units,
+    skip_filtered,
+)
+from signature_recovery.index.search_index import SQLiteFTSIndex
+
+
+def _eml(msg_id, date, body):
+    return (
+        f"Message-ID: <{msg_id}>\n"
+        f"From: =?utf-8?q?J=C3=B6rg?= <{msg_id}>\n"
+        f"Date: {date}\n"
+        "Subject: hi\n"
+        "Content-Type: text/plain; charset=utf-8\n"
+        "\n"
+        f"{body}\n"
+    )
+
+
+MESSAGES = [
+    ("a@ex.com", "Thu, 01 Jan 1970 00:01:40 +0000", "Hi\n--\nJohn Doe\njohn@ex.com"),
+    ("b@ex.com", "Thu, 01 Jan 1970 00:03:20 +0000", "From here on\n--\nJane Smith\njane@ex.com"),
+]
+
+
+def _write_mbox(path):
+    parts = []
+    for msg_id, date, body in MESSAGES:
+        # mboxrd escapes body lines starting with "From "
+        escaped = body.replace("\nFrom ", "\n>From ").replace("From here", ">From here")
+        parts.append(f"From sender@ex.com Thu Jan  1 00:00:00 1970\n{_eml(msg_id, date, escaped)}\n")
+    path.write_text("".join(parts))
+    return path
+
+
+def test_mbox_source(tmp_path):
+    source = MboxSource(str(_write_mbox(tmp_path / "mail.mbox")))
+    assert [(f.path, f.message_count) for f in source.list_folders()] == [("mail.mbox", 2)]
+    msgs = list(source.iter_messages(lazy=True))
+    assert [m.msg_id for m in msgs] == ["a@ex.com", "b@ex.com"]
+    assert [m.timestamp for m in msgs] == [100.0, 200.0]
+    assert msgs[1].body.startswith("From here on")
+    assert (msgs[0].sender_name, msgs[0].sender_email, msgs[0].sender) == ("Jörg", "a@ex.com", "a@ex.com")
+    assert "John Doe" in msgs[0].body
+    # lazy messages pickle to plain messages for worker processes
+    plain = pickle.loads(pickle.dumps(msgs[0]))
+    assert type(plain) is Message and plain.sender_email == "a@ex.com"
+
+    resumed = list(source.iter_messages(resume_after=("mail.mbox", 0)))
+    assert [m.msg_id for m in resumed] == ["b@ex.com"]
+    assert [m.msg_id for m in source.iter_messages(start=150)] == ["b@ex.com"]
+    known = {"a@ex.com": (msgs[0].fingerprint, "")}
+    assert [m.msg_id for m in source.iter_messages(known=known)] == ["b@ex.com"]
+    source.close()
+
+
+def test_progress_total_drops_filtered_messages(tmp_path):
+    source = MboxSource(str(_write_mbox(tmp_path / "mail.mbox")))
+    units = plan_work_units(source.list_folders(), unit_size=1)
+    for options in ({"end": 150}, {"start": 150}):
+        progress = ProgressReporter(2)
+        for _ in skip_filtered(source.iter_messages(**options), units, progress):
+            progress.update()
+        assert (progress.done, progress.total) == (1, 1)
+        assert "(100.0%)" in progress.status()
+    source.close()
+
+
+def test_eml_directory_source(tmp_path):
+    root = tmp_path / "export"
+    (root / "Inbox").mkdir(parents=True)
+    (root / "Sent").mkdir()
+    (root / "Inbox" / "1.eml").write_text(_eml(*MESSAGES[0]))
+    (root / "Sent" / "2.eml").write_text(_eml(*MESSAGES[1]))
+    (root / "Sent" / "notes.txt").write_text("not a message")
+    source = open_source(str(root))
+    assert isinstance(source, EmlDirectorySource)
+    folders = [(f.path, f.message_count) for f in source.list_folders()]
+    assert folders == [("export/Inbox", 1), ("export/Sent", 1)]
+    msgs = list(source.iter_messages(folders=["Sent"]))
+    assert [(m.msg_id, m.folder_path, m.msg_index) for m in msgs] == [("b@ex.com", "export/Sent", 0)]
+    scanned = source.scan()
+    assert scanned[0].min_time == 100.0 and scanned[0].undated == 0
+
+
+def test_maildir_source(tmp_path):
+    root = tmp_path / "Maildir"
+    for sub in ("cur", "new", "tmp", ".Sent/cur", ".Sent/new", ".Sent/tmp"):
+        (root / sub).mkdir(parents=True)
+    (root / "new" / "2.host").write_text(_eml(*MESSAGES[1]))
+    (root / "cur" / "1.host:2,S").write_text(_eml(*MESSAGES[0]))
+    (root / ".Sent" / "cur" / "3.host:2,S").write_text("Subject: no id\n\nHello\n")
+    source = open_source(str(root))
+    assert isinstance(source, MaildirSource)
+    assert [(f.path, f.message_count) for f in source.list_folders()] == [
+        ("Maildir", 2),
+        ("Maildir/Sent", 1),
+    ]
+    ids = [m.msg_id for m in source.iter_messages()]
+    assert ids == ["a@ex.com", "b@ex.com", "3.host"]
+
+
+def test_maildir_source_reads_nested_folders(tmp_path):
+    root = tmp_path / "Maildir"
+    for folder in ("", ".Archive.2023", ".Archive.2023/Old", "Projects/Alpha"):
+        for sub in ("cur", "new", "tmp"):
+            (root / folder / sub).mkdir(parents=True)
+    (root / "cur" / "1.host:2,S").write_text(_eml(*MESSAGES[0]))
+    (root / ".Archive.2023" / "Old" / "cur" / "2.host:2,S").write_text(_eml(*MESSAGES[1]))
+    (root / "Projects" / "Alpha" / "new" / "3.host").write_text("Subject: no id\n\nHello\n")
+    source = MaildirSource(str(root))
+    assert [(f.path, f.message_count) for f in source.list_folders()] == [
+        ("Maildir", 1),
+        ("Maildir/Archive/2023", 0),
+        ("Maildir/Archive/2023/Old", 1),
+        ("Maildir/Projects/Alpha", 1),
+    ]
+    msgs = list(source.iter_messages(folders=["Maildir/Projects/Alpha"]))
+    assert [(m.msg_id, m.folder_path) for m in msgs] == [("3.host", "Maildir/Projects/Alpha")]
+
+
+def test_extract_mbox_without_pypff(tmp_path):
+    mbox = _write_mbox(tmp_path / "mail.mbox")
+    db = tmp_path / "out.db"
+    metrics = tmp_path / "metrics.json"
+    res = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "signature_recovery.cli.main",
+            "--dump-metrics",
+            str(metrics),
+            "extract",
+            "--input",
+            str(mbox),
+            "--index",
+            str(db),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert res.returncode == 0, res.stderr
+    assert json.loads(metrics.read_text())["summary"]["total_messages"] == 2
+    names = sorted(s.metadata.name for s in SQLiteFTSIndex(str(db)).query(None))
+    assert names == ["Jane Smith", "John Doe"]
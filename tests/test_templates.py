@@ -0,0 +1,50 @@
+"""Per-sender signature templates and the extraction fast path."""
+
+from signature_recovery.core.config import DEFAULT_CONFIG
+from signature_recovery.core.extractor import SignatureExtractor
+from signature_recovery.core.metrics import MetricsCollector
+from signature_recovery.core.models import Message, SignatureMetadata
+from signature_recovery.core.templates import TemplateStore
+
+SIGNATURE = "Best regards,\nJohn Doe\nEngineer\njohn@example.com\n+1 555 010 0000"
+
+
+def _message(i, body):
+    return Message(body, str(i), float(i), sender_name="John Doe", sender_email="john@example.com")
+
+
+def test_template_fast_path_reuses_learned_signature():
+    metrics = MetricsCollector()
+    extractor = SignatureExtractor(metrics=metrics)
+    messages = [
+        _message(1, f"First update.\n{SIGNATURE}"),
+        _message(2, f"<html><body><p>Second update.</p><p>{SIGNATURE.replace(chr(10), '<br>')}</p></body></html>"),
+        _message(3, "Quick note.\nCheers,\nJohn"),
+        Message(f"Other sender.\n{SIGNATURE}", "4", 4.0),
+    ]
+    sigs = extractor.extract_many(messages)
+    assert [s.text if s else None for s in sigs[:2]] == [SIGNATURE, SIGNATURE]
+    assert sigs[1].source_msg_id == "2" and sigs[1].metadata is not sigs[0].metadata
+    assert sigs[2].text == "Cheers,\nJohn"
+    assert sigs[3].text == SIGNATURE
+    counters = metrics.summarize()["counters"]
+    assert counters["extract.templates_learned"] == 1
+    assert counters["extract.template_hits"] == 1
+    assert counters["extract.template_misses"] == 1
+    assert len(extractor.templates) == 1
+    # the fast path returns what the full heuristic chain would
+    full = SignatureExtractor({**DEFAULT_CONFIG, "extraction": {**DEFAULT_CONFIG["extraction"], "sender_templates": False}})
+    assert full.templates is None
+    assert [s.text for s in full.extract_many(messages)] == [s.text for s in sigs]
+
+
+def test_template_store_thresholds():
+    store = TemplateStore(min_confidence=0.9, max_senders=1)
+    meta = SignatureMetadata(name="John Doe")
+    assert not store.learn("a", ["x", "y"], meta, 0.5)
+    assert store.learn("a", ["x", "y"], meta, 0.95)
+    assert not store.learn("a", ["z", "y"], meta, 0.9)
+    assert store.learn("a", ["z", "y"], meta, 1.0)
+    assert not store.learn("b", ["x", "y"], meta, 1.0)
+    assert store.get("a").matches(["body", "z", "y"])
+    assert not store.get("a").matches(["y"])